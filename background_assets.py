@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Fondo de ResonanciaEterica: escalado una vez al instalar, cargado en un hilo.
+
+La imagen original (2084x1308, ~3.5MB) se decodificaba y reescalaba con
+SmoothTransformation en el hilo de la UI al construir la ventana: ~11MB
+de ARGB más la copia escalada, y segundos de arranque en la BeagleBone.
+
+- install.sh corre este módulo: genera la imagen ya al tamaño de la
+  escena (la vista la dibuja 1:1, sin escalar) en
+  ~/.cache/ytplayer/backgrounds, con nombre <hash de la fuente>-<WxH>.png.
+  Si la fuente cambia, el hash cambia y las variantes viejas se borran.
+- manifest.json guarda el hash (para no releer la fuente si tamaño y
+  mtime no cambiaron) y el color medio de la imagen.
+- Al arrancar se muestra ese color plano y la variante se carga en un
+  hilo; si falta, se genera ahí mismo y queda en caché.
+
+Uso: python3 background_assets.py
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+from PyQt5.QtCore import Qt, QCoreApplication
+from PyQt5.QtGui import QImage
+
+BACKGROUND_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "Gemini_Generated_Image_4rngoi4rngoi4rng.png")
+BACKGROUND_CACHE_DIR = os.path.expanduser('~/.cache/ytplayer/backgrounds')
+SCENE_SIZE = (1280, 720)
+# Color mientras carga si todavía no hay manifiesto
+PLACEHOLDER_COLOR = '#0f1428'
+
+
+def _manifest_path(cache_dir):
+    return os.path.join(cache_dir, 'manifest.json')
+
+
+def read_manifest(cache_dir=BACKGROUND_CACHE_DIR):
+    try:
+        with open(_manifest_path(cache_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest, cache_dir):
+    tmp = _manifest_path(cache_dir) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, _manifest_path(cache_dir))
+
+
+def source_digest(source=BACKGROUND_SOURCE, cache_dir=BACKGROUND_CACHE_DIR):
+    """sha1 de la fuente; se relee solo si cambió su tamaño o mtime."""
+    stat = os.stat(source)
+    manifest = read_manifest(cache_dir)
+    known = manifest.get('source', {})
+    if known.get('size') == stat.st_size and known.get('mtime_ns') == stat.st_mtime_ns:
+        return known['sha1']
+    sha = hashlib.sha1()
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest['source'] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': digest}
+    _write_manifest(manifest, cache_dir)
+    return digest
+
+
+def variant_path(digest, size, cache_dir=BACKGROUND_CACHE_DIR):
+    return os.path.join(cache_dir, f"{digest[:16]}-{size[0]}x{size[1]}.png")
+
+
+def placeholder_color(cache_dir=BACKGROUND_CACHE_DIR):
+    return read_manifest(cache_dir).get('placeholder', PLACEHOLDER_COLOR)
+
+
+def generate_variant(size, source=BACKGROUND_SOURCE, cache_dir=BACKGROUND_CACHE_DIR):
+    """Escala la fuente a size y la guarda. Devuelve la QImage escalada."""
+    digest = source_digest(source, cache_dir)
+    image = QImage(source)
+    if image.isNull():
+        raise ValueError(f"no se pudo leer {source}")
+    scaled = image.scaled(size[0], size[1], Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    del image
+    path = variant_path(digest, size, cache_dir)
+    tmp = path + '.tmp.png'
+    if not scaled.save(tmp, 'PNG'):
+        raise OSError(f"no se pudo escribir {path}")
+    os.replace(tmp, path)
+
+    manifest = read_manifest(cache_dir)
+    if 'placeholder' not in manifest or manifest.get('placeholder_sha1') != digest:
+        manifest['placeholder'] = scaled.scaled(1, 1, Qt.IgnoreAspectRatio,
+                                                Qt.SmoothTransformation).pixelColor(0, 0).name()
+        manifest['placeholder_sha1'] = digest
+        _write_manifest(manifest, cache_dir)
+    return scaled
+
+
+def load_variant(size, source=BACKGROUND_SOURCE, cache_dir=BACKGROUND_CACHE_DIR):
+    """QImage del fondo al tamaño pedido (fuera del hilo de la UI)."""
+    digest = source_digest(source, cache_dir)
+    path = variant_path(digest, size, cache_dir)
+    if os.path.exists(path):
+        image = QImage(path)
+        if not image.isNull():
+            return image
+    print(f"[ASSETS] Sin variante {size[0]}x{size[1]}: generando", flush=True)
+    return generate_variant(size, source, cache_dir)
+
+
+def prune(digest, cache_dir=BACKGROUND_CACHE_DIR):
+    """Borra variantes de versiones anteriores de la fuente."""
+    for name in os.listdir(cache_dir):
+        if name.endswith('.png') and not name.startswith(digest[:16]):
+            os.remove(os.path.join(cache_dir, name))
+
+
+def main(argv):
+    QCoreApplication(argv)
+    if not os.path.exists(BACKGROUND_SOURCE):
+        print(f"[ASSETS] No existe {BACKGROUND_SOURCE}", flush=True)
+        return 1
+    os.makedirs(BACKGROUND_CACHE_DIR, exist_ok=True)
+    digest = source_digest()
+    prune(digest)
+    size = SCENE_SIZE
+    path = variant_path(digest, size)
+    if os.path.exists(path):
+        print(f"[ASSETS] {size[0]}x{size[1]} ya estaba", flush=True)
+        return 0
+    started = time.time()
+    generate_variant(size)
+    print(f"[ASSETS] {size[0]}x{size[1]} en {time.time() - started:.1f}s → "
+          f"{os.path.getsize(path) // 1024}KB", flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tiempo por cuadro de ResonanciaEterica, sin pantalla (QT_QPA_PLATFORM=offscreen).
+
+Congela las animaciones (ResonanciaEterica.animaciones) y las avanza a
+mano a 60 cuadros por segundo de tiempo simulado; cada paso se pinta en
+el momento con la región que pidió la escena (si no pidió nada, se
+fuerza un repintado completo y se cuenta). Así cada modo pinta
+exactamente los mismos cuadros. Mide paintEvent de la vista (ver
+ResonanciaEterica.paintEvent) y falla si no hubo un cuadro por paso.
+
+Uso: python3 bench_resonancia.py [cuadros]
+"""
+
+import os
+import sys
+import time
+from collections import deque
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QApplication, QGraphicsView
+from resonancia_eterica import ResonanciaEterica
+
+FRAMES = 600
+FRAME_MS = 1000 / 60
+BACKGROUND_TIMEOUT_S = 30
+
+MODES = [
+    ('sin caché', False, QGraphicsView.MinimalViewportUpdate),
+    ('caché', True, QGraphicsView.MinimalViewportUpdate),
+    ('caché + BoundingRect', True, QGraphicsView.BoundingRectViewportUpdate),
+]
+
+
+def run(app, cache, update_mode, frames):
+    started = time.perf_counter()
+    view = ResonanciaEterica(cache_escena=cache)
+    view.setViewportUpdateMode(update_mode)
+    view.show()
+    # Esperar el fondo (se carga en un hilo) para medir la escena final
+    deadline = time.time() + BACKGROUND_TIMEOUT_S
+    while not view.fondo_listo and time.time() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    app.processEvents()
+    startup_ms = (time.perf_counter() - started) * 1000
+
+    for animation in view.animaciones:
+        animation.pause()
+    view.frame_times = deque()
+    forced = 0
+
+    for frame in range(frames):
+        painted = len(view.frame_times)
+        elapsed = int(frame * FRAME_MS)
+        for animation in view.animaciones:
+            animation.setCurrentTime(elapsed % max(1, animation.duration()))
+        # Regiones de la escena → update() del viewport → pintar ya (región mínima)
+        app.processEvents()
+        app.sendPostedEvents(view, QEvent.UpdateRequest)
+        if len(view.frame_times) == painted:
+            view.viewport().repaint()
+            forced += 1
+
+    if len(view.frame_times) != frames:
+        raise RuntimeError(f"{len(view.frame_times)} cuadros pintados de {frames}")
+    summary = view.resumen_cuadros()
+    total = sum(view.frame_times)
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return startup_ms, summary, total, forced
+
+
+def main(argv):
+    frames = int(argv[1]) if len(argv) > 1 else FRAMES
+    app = QApplication(argv)
+    print(f"{frames} cuadros simulados a 60fps ({app.platformName()})")
+    for name, cache, update_mode in MODES:
+        startup_ms, summary, total, forced = run(app, cache, update_mode, frames)
+        print(f"{name:22s} arranque {startup_ms:6.0f}ms | {summary} | "
+              f"total pintando {total:.0f}ms ({forced} repintados forzados)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,115 @@
+"""
+Detección barata del estado de la red para el modo sin conexión.
+
+Dos niveles, de más barato a más caro:
+  1. /proc/net/route: sin ruta por defecto no hay red (instantáneo).
+  2. Conexión TCP no bloqueante (QTcpSocket) a www.youtube.com:443 con
+     plazo PROBE_TIMEOUT_MS. No transfiere datos.
+
+Con red se prueba cada ONLINE_CHECK_MS; sin red cada OFFLINE_CHECK_MS
+para detectar el regreso pronto. report_failure() fuerza una prueba
+inmediata cuando yt-dlp/mpv fallan.
+"""
+
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtNetwork import QTcpSocket
+
+PROBE_HOST = 'www.youtube.com'
+PROBE_PORT = 443
+PROBE_TIMEOUT_MS = 2500
+ONLINE_CHECK_MS = 15000
+OFFLINE_CHECK_MS = 3000
+
+RTF_UP = 0x0001
+
+
+def has_default_route(path='/proc/net/route'):
+    """True si hay una ruta IPv4 por defecto activa."""
+    try:
+        with open(path) as f:
+            next(f)  # Encabezado
+            for line in f:
+                fields = line.split()
+                if len(fields) > 3 and fields[1] == '00000000' and int(fields[3], 16) & RTF_UP:
+                    return True
+    except (OSError, ValueError, StopIteration):
+        # Sin /proc/net/route (no Linux): no descartar la red por esto
+        return True
+    return False
+
+
+class ConnectivityMonitor(QObject):
+    """Mantiene online/offline y emite changed(online) al cambiar."""
+
+    changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.online = True        # Optimista hasta la primera prueba
+        self.changed_at = time.time()
+        self.socket = None
+        self.probe_started = None
+        self.last_probe_ms = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(ONLINE_CHECK_MS)
+        self.timer.timeout.connect(self.probe)
+
+        self.deadline = QTimer(self)
+        self.deadline.setSingleShot(True)
+        self.deadline.setInterval(PROBE_TIMEOUT_MS)
+        self.deadline.timeout.connect(
+            lambda: self._on_probe(self.socket, False, f"{PROBE_HOST} no responde"))
+
+    def start(self):
+        self.probe()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self._end_probe()
+
+    def report_failure(self):
+        """Algo de red falló: verificar ya en vez de esperar al timer."""
+        self.probe()
+
+    def probe(self):
+        if self.socket:
+            return  # Prueba en curso
+        if not has_default_route():
+            self._set_online(False, "sin ruta por defecto")
+            return
+        sock = QTcpSocket(self)
+        sock.connected.connect(lambda: self._on_probe(sock, True))
+        sock.error.connect(lambda _error: self._on_probe(sock, False, sock.errorString()))
+        self.socket = sock
+        self.probe_started = time.time()
+        self.deadline.start()
+        sock.connectToHost(PROBE_HOST, PROBE_PORT)
+
+    def _on_probe(self, sock, ok, reason=''):
+        if sock is None or sock is not self.socket:
+            return
+        self.last_probe_ms = (time.time() - self.probe_started) * 1000
+        self._end_probe()
+        self._set_online(ok, reason)
+
+    def _end_probe(self):
+        self.deadline.stop()
+        if self.socket:
+            sock, self.socket = self.socket, None
+            sock.abort()
+            sock.deleteLater()
+
+    def _set_online(self, online, reason=''):
+        self.timer.setInterval(ONLINE_CHECK_MS if online else OFFLINE_CHECK_MS)
+        if online == self.online:
+            return
+        self.online = online
+        self.changed_at = time.time()
+        if online:
+            print(f"[NET] Red disponible (conexión en {self.last_probe_ms:.0f}ms)", flush=True)
+        else:
+            print(f"[NET] Sin red: {reason}", flush=True)
+        self.changed.emit(online)
@@ -0,0 +1,274 @@
+"""
+Cookies de YouTube: carga única, recarga al cambiar y aviso temprano.
+
+El archivo (formato Netscape, ver export_cookies.sh) se lee y valida una
+vez; yt-dlp recibe --cookies sin volver a consultar el disco. Un
+QFileSystemWatcher (inotify en Linux) observa el directorio, así que se
+detecta tanto una edición como un reemplazo por scp; los cambios se
+agrupan COOKIE_RELOAD_DEBOUNCE_MS antes de recargar. yt-dlp reescribe
+el archivo después de cada corrida rotando SIDCC, YSC, etc.: el hash
+cubre solo las cookies de sesión (AUTH_COOKIES), así que esas
+reescrituras actualizan los valores sin tocar el estado.
+
+Estados:
+  missing   no hay archivo (o no tiene cookies de YouTube)
+  ok        cookies de sesión presentes y vigentes
+  expiring  alguna cookie de sesión vence en menos de COOKIE_WARN_DAYS
+  expired   alguna cookie de sesión ya venció
+  rejected  la prueba de autenticación volvió sin sesión
+
+La prueba es un GET a /account sin seguir redirecciones: con sesión
+responde 200, sin sesión redirige al login. Solo se leen los
+encabezados. Corre en la primera carga, cuando cambian las cookies de
+sesión, cada COOKIE_PROBE_INTERVAL_MS, al volver la red si estaban
+rechazadas y cuando yt-dlp/mpv informan detección de bot.
+'rejected' se mantiene hasta que las cookies cambian de verdad.
+"""
+
+import os
+import time
+import hashlib
+from PyQt5.QtCore import QObject, QTimer, QUrl, QFileSystemWatcher, pyqtSignal
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+
+# Cookies que indican sesión iniciada en YouTube
+AUTH_COOKIES = ('SAPISID', '__Secure-3PAPISID', '__Secure-3PSID', 'SID', 'LOGIN_INFO')
+
+# Avisar cuando la sesión vence en menos de esto
+COOKIE_WARN_DAYS = 3
+COOKIE_RELOAD_DEBOUNCE_MS = 500
+COOKIE_PROBE_INTERVAL_MS = 6 * 3600 * 1000
+COOKIE_PROBE_TIMEOUT_MS = 8000
+COOKIE_PROBE_URL = 'https://www.youtube.com/account'
+
+# Texto de yt-dlp cuando YouTube pide iniciar sesión
+BOT_MARKERS = ('confirm you', 'sign in to confirm', 'not a bot', 'cookies')
+
+
+def parse_cookie_file(path):
+    """Lee un cookies.txt Netscape. Lista de dicts (domain, name, value, expires...)."""
+    cookies = []
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('#HttpOnly_'):
+                line = line[len('#HttpOnly_'):]
+            elif not line.strip() or line.startswith('#'):
+                continue
+            fields = line.split('\t')
+            if len(fields) != 7:
+                continue
+            domain, _subdomains, path_, secure, expires, name, value = fields
+            try:
+                expires = int(expires)
+            except ValueError:
+                expires = 0
+            cookies.append({'domain': domain, 'path': path_, 'secure': secure == 'TRUE',
+                            'expires': expires, 'name': name, 'value': value})
+    return cookies
+
+
+def is_youtube(cookie):
+    return cookie['domain'].lstrip('.').endswith('youtube.com')
+
+
+def is_auth(cookie):
+    return is_youtube(cookie) and cookie['name'] in AUTH_COOKIES
+
+
+def cookie_digest(cookies):
+    """Hash de las cookies de sesión (ignora el orden y las cookies que rotan)."""
+    items = sorted((c['domain'], c['name'], c['value'], c['expires'])
+                   for c in cookies if is_auth(c))
+    return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+
+def assess(cookies, now=None):
+    """Estado y vencimiento más próximo de las cookies de sesión."""
+    now = now or time.time()
+    auth = [c for c in cookies if is_auth(c)]
+    if not auth:
+        return 'missing', None
+    # expires 0: cookie de sesión del navegador (sin vencimiento)
+    expiries = [c['expires'] for c in auth if c['expires'] > 0]
+    soonest = min(expiries) if expiries else None
+    if soonest is not None and soonest <= now:
+        return 'expired', soonest
+    if soonest is not None and soonest - now < COOKIE_WARN_DAYS * 86400:
+        return 'expiring', soonest
+    return 'ok', soonest
+
+
+class CookieManager(QObject):
+    """Cookies cargadas en memoria; emite changed(estado, mensaje) al cambiar."""
+
+    changed = pyqtSignal(str, str)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.cookies = []
+        self.state = 'missing'
+        self.expires = None
+        self.loaded_at = None
+        self.reloads = 0
+        self.digest = None
+        self.online = True
+        self.reply = None
+        self.last_probe = None    # (timestamp, ok)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_fs_change)
+        self.watcher.fileChanged.connect(self._on_fs_change)
+
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(COOKIE_RELOAD_DEBOUNCE_MS)
+        self.reload_timer.timeout.connect(self.load)
+
+        self.probe_timer = QTimer(self)
+        self.probe_timer.setInterval(COOKIE_PROBE_INTERVAL_MS)
+        self.probe_timer.timeout.connect(self.probe)
+
+        self.probe_deadline = QTimer(self)
+        self.probe_deadline.setSingleShot(True)
+        self.probe_deadline.setInterval(COOKIE_PROBE_TIMEOUT_MS)
+        self.probe_deadline.timeout.connect(self._abort_probe)
+
+        self.network = QNetworkAccessManager(self)
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        self.watcher.addPath(directory)
+        self.load()
+        self.probe_timer.start()
+
+    def stop(self):
+        self.probe_timer.stop()
+        self.reload_timer.stop()
+        self._abort_probe()
+
+    # --- Carga ---
+
+    def load(self):
+        started = time.time()
+        try:
+            cookies = parse_cookie_file(self.path)
+        except OSError:
+            cookies = []
+        # El archivo reemplazado es otro inode: volver a observarlo
+        if os.path.exists(self.path) and self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+        self.cookies = [c for c in cookies if is_youtube(c)]
+        digest = cookie_digest(self.cookies)
+        if digest == self.digest:
+            return  # yt-dlp rotó cookies secundarias: la sesión es la misma
+        self.digest = digest
+        self.loaded_at = time.time()
+        self.reloads += 1
+        state, expires = assess(self.cookies)
+        self.expires = expires
+        print(f"[COOKIES] {len(self.cookies)} cookies de YouTube, {state} "
+              f"(leídas en {(self.loaded_at - started) * 1000:.1f}ms)", flush=True)
+        self._set_state(state, force=self.reloads == 1)
+        # Primera carga o sesión nueva: verificarla ya, no al fallar una canción
+        self.probe()
+
+    def _on_fs_change(self, _path):
+        # yt-dlp reescribe el archivo al terminar: agrupar y recargar una vez
+        self.reload_timer.start()
+
+    def auth_args(self):
+        """Argumentos de yt-dlp (sin tocar el disco)."""
+        if self.state == 'missing':
+            return []
+        return ['--cookies', self.path]
+
+    def valid(self):
+        return self.state in ('ok', 'expiring')
+
+    # --- Prueba de autenticación ---
+
+    def set_online(self, online):
+        self.online = online
+        if online and self.state == 'rejected':
+            self.probe()
+
+    def report_failure(self, error):
+        """yt-dlp/mpv falló: si parece detección de bot, verificar la sesión ya."""
+        text = error.lower()
+        if any(marker in text for marker in BOT_MARKERS):
+            print(f"[COOKIES] Posible detección de bot: {error[:60]}", flush=True)
+            self.probe()
+
+    def probe(self):
+        if self.reply or not self.online or self.state == 'missing':
+            return
+        request = QNetworkRequest(QUrl(COOKIE_PROBE_URL))
+        request.setAttribute(QNetworkRequest.RedirectPolicyAttribute,
+                             QNetworkRequest.ManualRedirectPolicy)
+        request.setRawHeader(b'Cookie', self._cookie_header().encode('utf-8'))
+        request.setRawHeader(b'User-Agent', b'Mozilla/5.0 (X11; Linux) ytplayer')
+        self.probe_started = time.time()
+        self.reply = self.network.get(request)
+        self.reply.metaDataChanged.connect(self._on_probe_headers)
+        self.reply.finished.connect(self._on_probe_headers)
+        self.probe_deadline.start()
+
+    def _cookie_header(self):
+        now = time.time()
+        return '; '.join(f"{c['name']}={c['value']}" for c in self.cookies
+                         if not c['expires'] or c['expires'] > now)
+
+    def _on_probe_headers(self):
+        reply = self.reply
+        if reply is None:
+            return
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status is None:
+            if reply.isFinished():
+                # Error de red: no dice nada de las cookies
+                print(f"[COOKIES] Prueba sin respuesta: {reply.errorString()}", flush=True)
+                self._abort_probe()
+            return
+        location = bytes(reply.rawHeader(b'Location')).decode('utf-8', errors='ignore')
+        elapsed = (time.time() - self.probe_started) * 1000
+        self._abort_probe()
+        logged_in = status == 200 or (300 <= status < 400 and 'accounts.google' not in location)
+        self.last_probe = (time.time(), logged_in)
+        print(f"[COOKIES] Prueba de sesión: HTTP {status} en {elapsed:.0f}ms → "
+              f"{'con sesión' if logged_in else 'sin sesión'}", flush=True)
+        if logged_in:
+            self._set_state(assess(self.cookies)[0])
+        else:
+            self._set_state('rejected')
+
+    def _abort_probe(self):
+        self.probe_deadline.stop()
+        if self.reply:
+            reply, self.reply = self.reply, None
+            reply.abort()
+            reply.deleteLater()
+
+    # --- Estado ---
+
+    def _set_state(self, state, force=False):
+        if state == self.state and not force:
+            return
+        previous, self.state = self.state, state
+        message = self.message()
+        print(f"[COOKIES] {previous} → {state}: {message}", flush=True)
+        self.changed.emit(state, message)
+
+    def message(self):
+        if self.state == 'missing':
+            return "Faltan cookies (ver export_cookies.sh)"
+        if self.state == 'expired':
+            return "Cookies vencidas: volver a exportarlas"
+        if self.state == 'rejected':
+            return "YouTube no acepta las cookies: volver a exportarlas"
+        if self.state == 'expiring':
+            days = max(0.0, (self.expires - time.time()) / 86400)
+            return f"Cookies vencen en {days:.1f} días"
+        return "Cookies válidas"
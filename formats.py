@@ -0,0 +1,141 @@
+"""
+Selección del formato de audio más liviano que cumple un piso de calidad,
+y registro de bytes transferidos por canción.
+
+Con Wi-Fi débil 'bestaudio' elige el stream más grande (Opus/M4A ~130kbps).
+Aquí se elige, de la lista de formatos de una sola consulta a yt-dlp, el
+de menor bitrate dentro de [AUDIO_MIN_ABR, AUDIO_MAX_ABR] con el codec
+preferido.
+"""
+
+import os
+import json
+import time
+from urllib.parse import urlparse, parse_qs
+
+# Techo y piso de bitrate de audio (kbps)
+AUDIO_MAX_ABR = 96
+AUDIO_MIN_ABR = 48
+
+# Opus da mejor calidad por bit; M4A como alternativa
+AUDIO_CODEC_PREFERENCE = ['opus', 'mp4a', 'vorbis']
+
+# Registro de bytes por canción (una línea JSON por reproducción)
+TRANSFER_LOG_FILE = os.path.expanduser('~/.config/ytplayer/transfer_log.jsonl')
+
+
+def _abr(fmt):
+    return fmt.get('abr') or fmt.get('tbr') or 0
+
+
+def _codec_rank(fmt, codecs):
+    acodec = (fmt.get('acodec') or '').lower()
+    for rank, codec in enumerate(codecs):
+        if acodec.startswith(codec):
+            return rank
+    return len(codecs)
+
+
+def select_audio_format(info, max_abr=AUDIO_MAX_ABR, min_abr=AUDIO_MIN_ABR,
+                        codecs=AUDIO_CODEC_PREFERENCE):
+    """Elige un formato de solo audio de info['formats'], o None.
+
+    1. Dentro de [min_abr, max_abr]: codec preferido, luego menor bitrate.
+    2. Si no hay: el menor bitrate por encima del piso.
+    3. Si tampoco: el mayor bitrate disponible (mejor esfuerzo).
+    """
+    audio = [f for f in info.get('formats') or []
+             if f.get('vcodec') == 'none'
+             and f.get('acodec') not in (None, 'none')
+             and f.get('url')
+             and f.get('protocol') != 'm3u8_native']
+    if not audio:
+        return None
+
+    in_window = [f for f in audio if min_abr <= _abr(f) <= max_abr]
+    if in_window:
+        return min(in_window, key=lambda f: (_codec_rank(f, codecs), _abr(f)))
+
+    above_floor = [f for f in audio if _abr(f) >= min_abr]
+    if above_floor:
+        return min(above_floor, key=lambda f: (_abr(f), _codec_rank(f, codecs)))
+
+    return max(audio, key=_abr)
+
+
+def format_selector(max_abr=AUDIO_MAX_ABR, min_abr=AUDIO_MIN_ABR,
+                    codecs=AUDIO_CODEC_PREFERENCE):
+    """Selector -f y orden -S de yt-dlp equivalentes a select_audio_format().
+
+    Para cuando yt-dlp elige el formato (batch con --print) y no hay lista
+    de formatos local. Con -S +abr, 'ba' es el de MENOR bitrate.
+    """
+    window = f"[abr>={min_abr}][abr<={max_abr}][protocol!=m3u8_native]"
+    options = [f"ba{window}[acodec^={codec}]" for codec in codecs]
+    options += [f"ba{window}", f"ba[abr>={min_abr}]", "ba", "b"]
+    return '/'.join(options), '+abr'
+
+
+def expected_bytes(fmt, duration):
+    """Tamaño esperado del stream en bytes (exacto si yt-dlp lo conoce)."""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return int(size)
+    if duration and _abr(fmt):
+        return int(_abr(fmt) * 1000 / 8 * duration)
+    return None
+
+
+def url_expiry(url):
+    """Timestamp de expiración de una URL de googlevideo (parámetro expire)."""
+    try:
+        return int(parse_qs(urlparse(url).query)['expire'][0])
+    except (KeyError, ValueError, IndexError):
+        return None
+
+
+def media_from_info(info):
+    """Construye el dict de medio a partir del JSON de yt-dlp (-J)."""
+    fmt = select_audio_format(info)
+    if fmt is None:
+        # Sin lista de formatos: usar la selección hecha por -f
+        fmt = info
+    url = fmt.get('url') or ''
+    duration = info.get('duration')
+    return {
+        'url': url,
+        'format_id': fmt.get('format_id'),
+        'acodec': fmt.get('acodec'),
+        'abr': _abr(fmt),
+        'duration': duration,
+        'expected_bytes': expected_bytes(fmt, duration),
+        'expires': url_expiry(url),
+    }
+
+
+def read_process_bytes(pid):
+    """Bytes leídos por un proceso (incluye sockets) según /proc/<pid>/io."""
+    try:
+        with open(f'/proc/{pid}/io') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class TransferLog:
+    """Registra bytes transferidos por canción en un archivo JSONL."""
+
+    def __init__(self, path=TRANSFER_LOG_FILE):
+        self.path = path
+
+    def record(self, entry):
+        entry = dict(entry, timestamp=int(time.time()))
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        except OSError as e:
+            print(f"[FORMATS] No se pudo registrar transferencia: {e}", flush=True)
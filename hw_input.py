@@ -0,0 +1,281 @@
+"""
+Entrada por botones físicos (evdev / GPIO sysfs) para el reproductor.
+
+Lee eventos de forma asíncrona con QSocketNotifier (sin hilos ni polling)
+y los traduce a las mismas acciones que los atajos de teclado.
+"""
+
+import os
+import glob
+import struct
+import time
+from PyQt5.QtCore import QObject, QSocketNotifier, pyqtSignal
+
+# struct input_event de linux/input.h: timeval (sec, usec), type, code, value
+EVENT_FORMAT = 'llHHi'
+EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+EV_KEY = 0x01
+
+# Keycodes de linux/input-event-codes.h (mismas letras que los atajos)
+KEY_R = 19
+KEY_P = 25
+KEY_S = 31
+
+# Keycode -> acción (ver BBBPlayer.setup_shortcuts)
+DEFAULT_KEYMAP = {
+    KEY_S: 'next',   # Siguiente
+    KEY_P: 'stop',   # Parar
+    KEY_R: 'play',   # Reproducir
+}
+
+# Los botones baratos rebotan ~5-20ms; 30ms filtra sin notar retraso
+DEBOUNCE_MS = 30
+
+# Dispositivos evdev a usar. Vacío = autodetectar los de gpio-keys
+# (NO el teclado: Qt ya lo lee y los atajos se dispararían dos veces)
+HW_INPUT_DEVICES = []
+
+# Autodetección: nombre exacto del dispositivo (nodo gpio-keys del device
+# tree) o, si no coincide, uno que reporte alguna tecla del keymap y
+# tenga menos de KEYBOARD_MIN_KEYS teclas (un teclado tiene ~100)
+HW_INPUT_NAMES = ('gpio-keys', 'gpio_keys')
+KEYBOARD_MIN_KEYS = 32
+
+# Pines GPIO sysfs -> acción, p.ej. {60: 'next', 48: 'stop', 49: 'play'}
+HW_GPIO_PINS = {}
+GPIO_CODE_BASE = 0x10000
+
+
+class Debouncer:
+    """Descarta pulsaciones repetidas del mismo botón dentro de la ventana."""
+
+    def __init__(self, window_ms=DEBOUNCE_MS):
+        self.window = window_ms / 1000.0
+        self.last_press = {}  # {code: timestamp}
+        self.rejected = 0
+
+    def accept(self, code, timestamp):
+        last = self.last_press.get(code)
+        if last is not None and timestamp - last < self.window:
+            self.rejected += 1
+            return False
+        self.last_press[code] = timestamp
+        return True
+
+
+class EvdevSource:
+    """Fuente de eventos de un /dev/input/eventN."""
+
+    notifier_type = QSocketNotifier.Read
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        self._pending = b''
+
+    def fileno(self):
+        return self.fd
+
+    def read_events(self):
+        """Retorna lista de (code, value, timestamp) de teclas."""
+        try:
+            self._pending += os.read(self.fd, EVENT_SIZE * 64)
+        except BlockingIOError:
+            return []
+
+        events = []
+        while len(self._pending) >= EVENT_SIZE:
+            chunk = self._pending[:EVENT_SIZE]
+            self._pending = self._pending[EVENT_SIZE:]
+            sec, usec, ev_type, code, value = struct.unpack(EVENT_FORMAT, chunk)
+            if ev_type == EV_KEY:
+                # El kernel usa CLOCK_REALTIME por defecto: comparable con time.time()
+                events.append((code, value, sec + usec / 1e6))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FakeEventSource(EvdevSource):
+    """Fuente falsa sobre un pipe, para probar sin hardware.
+
+    Escribe structs input_event reales, así que ejercita el mismo parser.
+    """
+
+    def __init__(self):
+        self.path = '<fake>'
+        self.fd, self._write_fd = os.pipe()
+        os.set_blocking(self.fd, False)
+        self._pending = b''
+
+    def press(self, code, timestamp=None):
+        """Simula pulsar y soltar un botón."""
+        ts = timestamp if timestamp is not None else time.time()
+        self.emit(code, 1, ts)
+        self.emit(code, 0, ts)
+
+    def emit(self, code, value, timestamp=None):
+        ts = timestamp if timestamp is not None else time.time()
+        sec = int(ts)
+        usec = int((ts - sec) * 1e6)
+        os.write(self._write_fd, struct.pack(EVENT_FORMAT, sec, usec, EV_KEY, code, value))
+
+    def close(self):
+        os.close(self.fd)
+        os.close(self._write_fd)
+
+
+class SysfsGpioSource:
+    """Fuente de eventos de un pin GPIO exportado en /sys/class/gpio.
+
+    Usa edge=both y espera POLLPRI (QSocketNotifier.Exception).
+    El 'code' es GPIO_CODE_BASE + pin para no chocar con keycodes evdev.
+    """
+
+    notifier_type = QSocketNotifier.Exception
+
+    def __init__(self, pin, active_low=True):
+        self.pin = pin
+        self.path = f'/sys/class/gpio/gpio{pin}'
+        if not os.path.exists(self.path):
+            with open('/sys/class/gpio/export', 'w') as f:
+                f.write(str(pin))
+        with open(os.path.join(self.path, 'direction'), 'w') as f:
+            f.write('in')
+        with open(os.path.join(self.path, 'edge'), 'w') as f:
+            f.write('both')
+        self.active_low = active_low
+        self.fd = os.open(os.path.join(self.path, 'value'), os.O_RDONLY | os.O_NONBLOCK)
+        self._last_value = self._read_value()
+
+    def fileno(self):
+        return self.fd
+
+    def _read_value(self):
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        raw = os.read(self.fd, 2).strip()
+        value = 1 if raw == b'1' else 0
+        return 1 - value if self.active_low else value
+
+    def read_events(self):
+        timestamp = time.time()
+        value = self._read_value()
+        if value == self._last_value:
+            return []
+        self._last_value = value
+        return [(GPIO_CODE_BASE + self.pin, value, timestamp)]
+
+    def close(self):
+        os.close(self.fd)
+
+
+def parse_key_bitmap(text, word_bits=struct.calcsize('l') * 8):
+    """capabilities/key del sysfs → set de keycodes.
+
+    Palabras hex de un long, la más significativa primero.
+    """
+    codes = set()
+    for index, word in enumerate(reversed(text.split())):
+        value = int(word, 16)
+        bit = 0
+        while value:
+            if value & 1:
+                codes.add(index * word_bits + bit)
+            value >>= 1
+            bit += 1
+    return codes
+
+
+def _read_sysfs(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def find_button_devices(keycodes=DEFAULT_KEYMAP):
+    """Busca dispositivos evdev de botones por nombre o por capacidades."""
+    devices = []
+    for path in sorted(glob.glob('/dev/input/event*')):
+        device = f'/sys/class/input/{os.path.basename(path)}/device'
+        name = _read_sysfs(os.path.join(device, 'name'))
+        if name is None:
+            continue
+        if name.lower() in HW_INPUT_NAMES:
+            devices.append(path)
+            continue
+        keys = parse_key_bitmap(_read_sysfs(os.path.join(device, 'capabilities/key')) or '')
+        if keys & set(keycodes) and len(keys) < KEYBOARD_MIN_KEYS:
+            devices.append(path)
+    return devices
+
+
+class ButtonInput(QObject):
+    """Traduce eventos de las fuentes a acciones del reproductor.
+
+    Emite action_triggered(acción, timestamp_de_pulsación) para que el
+    reproductor pueda medir la latencia pulsación → cambio de audio.
+    """
+
+    action_triggered = pyqtSignal(str, float)
+
+    def __init__(self, sources, keymap=None, debounce_ms=DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.keymap = dict(DEFAULT_KEYMAP if keymap is None else keymap)
+        self.debouncer = Debouncer(debounce_ms)
+        self.sources = []
+        self.notifiers = []
+        for source in sources:
+            self.add_source(source)
+
+    def add_source(self, source):
+        notifier = QSocketNotifier(source.fileno(), source.notifier_type, self)
+        notifier.activated.connect(lambda _fd, s=source: self._on_activated(s))
+        self.sources.append(source)
+        self.notifiers.append(notifier)
+
+    def _on_activated(self, source):
+        for code, value, timestamp in source.read_events():
+            if value != 1:  # Solo pulsación (ignorar soltar y autorepeat)
+                continue
+            action = self.keymap.get(code)
+            if not action:
+                continue
+            if not self.debouncer.accept(code, timestamp):
+                continue
+            self.action_triggered.emit(action, timestamp)
+
+    def close(self):
+        for notifier in self.notifiers:
+            notifier.setEnabled(False)
+        for source in self.sources:
+            try:
+                source.close()
+            except OSError:
+                pass
+        self.notifiers = []
+        self.sources = []
+
+
+def create_default_input(parent=None):
+    """Crea ButtonInput con los dispositivos configurados, o None si no hay."""
+    sources = []
+    for path in HW_INPUT_DEVICES or find_button_devices():
+        try:
+            sources.append(EvdevSource(path))
+        except OSError:
+            continue
+
+    keymap = dict(DEFAULT_KEYMAP)
+    for pin, action in HW_GPIO_PINS.items():
+        try:
+            sources.append(SysfsGpioSource(pin))
+            keymap[GPIO_CODE_BASE + pin] = action
+        except OSError:
+            continue
+
+    if not sources:
+        return None
+    return ButtonInput(sources, keymap=keymap, parent=parent)
@@ -22,11 +22,11 @@ echo "Directorio home: $INSTALL_HOME"
 echo ""
 
 # === PASO 1: Instalar dependencias del sistema ===
-echo -e "${YELLOW}[1/4] Instalando dependencias del sistema...${NC}"
+echo -e "${YELLOW}[1/5] Instalando dependencias del sistema...${NC}"
 
 if command -v apt-get &> /dev/null; then
     sudo apt-get update
-    sudo apt-get install -y mpv python3-venv python3-pyqt5 python3-pip fonts-noto-color-emoji fontconfig
+    sudo apt-get install -y mpv ffmpeg python3-venv python3-pyqt5 python3-pip fonts-noto-color-emoji fontconfig
     # yt-dlp se instala via pip (más actualizado que el de Debian)
     # fonts-noto-color-emoji proporciona soporte de emojis para framebuffer
     echo -e "${GREEN}   ✓ Dependencias instaladas${NC}"
@@ -41,7 +41,7 @@ else
 fi
 
 # === PASO 2: Instalar dependencias de Python ===
-echo -e "${YELLOW}[2/4] Configurando entorno Python...${NC}"
+echo -e "${YELLOW}[2/5] Configurando entorno Python...${NC}"
 
 INSTALL_DIR="$(cd "$(dirname "$0")" && pwd)"
 cd "$INSTALL_DIR"
@@ -61,14 +61,25 @@ deactivate
 echo -e "${GREEN}   ✓ Dependencias de Python instaladas${NC}"
 
 # === PASO 3: Crear directorio de configuración ===
-echo -e "${YELLOW}[3/4] Creando directorios de configuración...${NC}"
+echo -e "${YELLOW}[3/5] Creando directorios de configuración...${NC}"
 
 mkdir -p "$INSTALL_HOME/.config/ytplayer"
 echo -e "${GREEN}   ✓ Directorio ~/.config/ytplayer creado${NC}"
 
-# === PASO 4: Configuración opcional ===
+# === PASO 4: Fondos por resolución ===
+echo -e "${YELLOW}[4/5] Generando el fondo al tamaño de la escena...${NC}"
+
+# Escala una sola vez la imagen original (ver background_assets.py)
+if [ "$(id -u)" = "0" ] && [ "$INSTALL_USER" != "root" ]; then
+    sudo -u "$INSTALL_USER" "$INSTALL_DIR/venv/bin/python" background_assets.py || true
+else
+    "$INSTALL_DIR/venv/bin/python" background_assets.py || true
+fi
+echo -e "${GREEN}   ✓ Fondo en ~/.cache/ytplayer/backgrounds${NC}"
+
+# === PASO 5: Configuración opcional ===
 echo ""
-echo -e "${YELLOW}[4/4] Configuración opcional...${NC}"
+echo -e "${YELLOW}[5/5] Configuración opcional...${NC}"
 echo ""
 
 # --- Preguntar sobre auto-login ---
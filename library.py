@@ -0,0 +1,270 @@
+"""
+Historial de reproducción y favoritos (SQLite), más audio local de favoritos.
+
+El estante (favoritos primero, luego lo último escuchado) se lee de la
+base local al arrancar, sin red. Los favoritos se descargan en segundo
+plano a AUDIO_CACHE_DIR con el mismo formato liviano que la
+reproducción, para sonar al instante aunque el Wi-Fi esté lento o caído.
+Cada descarga es un trabajo PRIORITY_BACKGROUND del WorkPool.
+"""
+
+import os
+import time
+import signal
+import sqlite3
+from PyQt5.QtCore import QObject, QProcess, pyqtSignal
+from resolver import video_id, signal_process
+from work_pool import PRIORITY_BACKGROUND
+
+LIBRARY_DB_FILE = os.path.expanduser('~/.config/ytplayer/library.db')
+AUDIO_CACHE_DIR = os.path.expanduser('~/.cache/ytplayer/audio')
+
+SHELF_RECENT = 20
+# Espacio máximo para audio de favoritos en la tarjeta SD
+AUDIO_CACHE_MAX_MB = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    video_id    TEXT PRIMARY KEY,
+    link        TEXT NOT NULL,
+    title       TEXT,
+    duration    TEXT,
+    thumbnail   TEXT,
+    play_count  INTEGER NOT NULL DEFAULT 0,
+    last_played REAL,
+    favorite    INTEGER NOT NULL DEFAULT 0,
+    audio_path  TEXT
+);
+CREATE INDEX IF NOT EXISTS tracks_last_played ON tracks (last_played);
+"""
+
+
+class Library:
+    """Acceso a la base de historial/favoritos (hilo UI, consultas cortas)."""
+
+    def __init__(self, path=LIBRARY_DB_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def _upsert(self, video_info):
+        vid = video_id(video_info['link'])
+        self.db.execute(
+            """INSERT INTO tracks (video_id, link, title, duration, thumbnail)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(video_id) DO UPDATE SET
+                   title = excluded.title,
+                   duration = excluded.duration,
+                   thumbnail = COALESCE(excluded.thumbnail, thumbnail)""",
+            (vid, video_info['link'], video_info.get('title'),
+             video_info.get('duration'), video_info.get('thumbnail')))
+        return vid
+
+    def record_play(self, video_info):
+        vid = self._upsert(video_info)
+        self.db.execute("UPDATE tracks SET play_count = play_count + 1, last_played = ? "
+                        "WHERE video_id = ?", (time.time(), vid))
+        self.db.commit()
+
+    def toggle_favorite(self, video_info):
+        """Marca/desmarca favorito. Retorna el nuevo estado."""
+        vid = self._upsert(video_info)
+        self.db.execute("UPDATE tracks SET favorite = 1 - favorite WHERE video_id = ?", (vid,))
+        self.db.commit()
+        row = self.db.execute("SELECT favorite FROM tracks WHERE video_id = ?", (vid,)).fetchone()
+        return bool(row['favorite'])
+
+    def is_favorite(self, link):
+        row = self.db.execute("SELECT favorite FROM tracks WHERE video_id = ?",
+                              (video_id(link),)).fetchone()
+        return bool(row and row['favorite'])
+
+    @staticmethod
+    def _video_info(row):
+        return {
+            'title': row['title'],
+            'link': row['link'],
+            'duration': row['duration'],
+            'id': row['video_id'],
+            'thumbnail': row['thumbnail'],
+            'favorite': bool(row['favorite']),
+        }
+
+    def shelf(self, recent=SHELF_RECENT):
+        """Favoritos (más escuchados primero) y luego los últimos escuchados."""
+        favorites = self.db.execute(
+            "SELECT * FROM tracks WHERE favorite = 1 "
+            "ORDER BY play_count DESC, last_played DESC").fetchall()
+        recents = self.db.execute(
+            "SELECT * FROM tracks WHERE favorite = 0 AND last_played IS NOT NULL "
+            "ORDER BY last_played DESC LIMIT ?", (recent,)).fetchall()
+        return [self._video_info(row) for row in favorites + recents]
+
+    def favorites_without_audio(self):
+        rows = self.db.execute("SELECT * FROM tracks WHERE favorite = 1 "
+                               "ORDER BY play_count DESC").fetchall()
+        return [self._video_info(row) for row in rows
+                if not (row['audio_path'] and os.path.exists(row['audio_path']))]
+
+    def search(self, query, limit=12):
+        """Búsqueda local por palabras en el título (modo sin red)."""
+        words = query.split()
+        if not words:
+            return []
+        where = ' AND '.join(['title LIKE ?'] * len(words))
+        rows = self.db.execute(
+            f"SELECT * FROM tracks WHERE {where} "
+            "ORDER BY favorite DESC, audio_path IS NULL, play_count DESC LIMIT ?",
+            [f'%{word}%' for word in words] + [limit]).fetchall()
+        return [self._video_info(row) for row in rows]
+
+    def audio_path(self, link):
+        """Archivo de audio local del video, si existe."""
+        row = self.db.execute("SELECT audio_path FROM tracks WHERE video_id = ?",
+                              (video_id(link),)).fetchone()
+        if row and row['audio_path'] and os.path.exists(row['audio_path']):
+            return row['audio_path']
+        return None
+
+    def set_audio_path(self, link, path):
+        self.db.execute("UPDATE tracks SET audio_path = ? WHERE video_id = ?",
+                        (path, video_id(link)))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+def audio_cache_bytes(directory=AUDIO_CACHE_DIR):
+    try:
+        return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+    except OSError:
+        return 0
+
+
+class FavoriteDownload(QObject):
+    """Un yt-dlp (nice 19) descargando un favorito, admitido por el WorkPool."""
+
+    finished = pyqtSignal(str, int, str)    # link, código de salida, salida
+
+    def __init__(self, resolver, link, parent=None):
+        super().__init__(parent)
+        self.resolver = resolver
+        self.link = link
+        self.process = None
+        self.done = False
+        self.paused = False
+        self.deferred = False   # Admitido mientras estaba pausado
+
+    def start(self):
+        if self.done:
+            return
+        if self.paused:
+            self.deferred = True
+            return
+        self.process = QProcess(self)
+        self.process.finished.connect(self._on_finished)
+        output = os.path.join(AUDIO_CACHE_DIR, '%(id)s.%(ext)s')
+        self.process.start('nice', ['-n', '19', self.resolver.ytdlp_path]
+                           + self.resolver.build_download_args(self.link, output))
+        print(f"[FAV] Descargando favorito {video_id(self.link)}", flush=True)
+
+    def _on_finished(self, exit_code, _status):
+        if self.done:
+            return
+        self.done = True
+        output = self.process.readAllStandardOutput().data().decode('utf-8', errors='ignore')
+        self.finished.emit(self.link, exit_code, output)
+        self.deleteLater()
+
+    def set_paused(self, paused):
+        self.paused = paused
+        if self.process:
+            signal_process(self.process, signal.SIGSTOP if paused else signal.SIGCONT)
+        elif not paused and self.deferred:
+            self.deferred = False
+            self.start()
+
+    def cancel(self):
+        if self.done:
+            return
+        self.done = True
+        if self.process:
+            self.resolver.reaper.reap(self.process, 'yt-dlp favorito')
+        self.deleteLater()
+
+
+class FavoriteWarmer(QObject):
+    """Descarga el audio de favoritos de a uno, con prioridad baja.
+
+    Cada descarga pasa por el PrefetchScheduler (contención y pausa) y
+    después por el WorkPool (lugares y prioridad).
+    """
+
+    warmed = pyqtSignal(str, str)   # link, ruta del archivo
+
+    def __init__(self, library, resolver, scheduler, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.resolver = resolver
+        self.scheduler = scheduler
+        self.pending = []
+        self.job = None             # FavoriteDownload en cola o corriendo
+        self.current = None
+        self.paused = False
+        os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+
+    def refresh(self):
+        """Encola los favoritos sin audio local. Retorna cuántos faltan."""
+        self.pending = [info['link'] for info in self.library.favorites_without_audio()
+                        if info['link'] != self.current]
+        return len(self.pending)
+
+    def schedule(self):
+        """Pide al planificador lugar para la siguiente descarga."""
+        if self.pending and not self.job:
+            self.scheduler.submit('favoritos', self.run)
+
+    def run(self):
+        """Descarga el siguiente favorito. Llamado por el planificador."""
+        if self.job or self.paused or not self.pending:
+            return
+        if audio_cache_bytes() >= AUDIO_CACHE_MAX_MB * 1024 * 1024:
+            print(f"[FAV] Cache de audio llena ({AUDIO_CACHE_MAX_MB}MB)", flush=True)
+            self.pending = []
+            return
+        self.current = self.pending.pop(0)
+        self.job = FavoriteDownload(self.resolver, self.current, self)
+        self.job.finished.connect(self._on_finished)
+        self.resolver.pool.run_async(PRIORITY_BACKGROUND, f'favorito {video_id(self.current)}',
+                                     self.job, self.job.start)
+
+    def _on_finished(self, link, exit_code, output):
+        self.job = None
+        self.current = None
+
+        path = output.strip().splitlines()[-1] if output.strip() else ''
+        if exit_code == 0 and os.path.exists(path):
+            self.library.set_audio_path(link, path)
+            print(f"[FAV] Listo: {os.path.basename(path)} "
+                  f"({os.path.getsize(path) / 1024:.0f}KB)", flush=True)
+            self.warmed.emit(link, path)
+        else:
+            print(f"[FAV] Falló la descarga de {video_id(link)}", flush=True)
+        self.schedule()
+
+    def set_paused(self, paused):
+        self.paused = paused
+        if self.job:
+            self.job.set_paused(paused)
+        elif not paused:
+            self.schedule()
+
+    def cancel(self):
+        self.pending = []
+        self.scheduler.cancel('favoritos')
+        if self.job:
+            self.job.cancel()
+            self.job = None
+            self.current = None
@@ -0,0 +1,195 @@
+"""
+Normalización de volumen por canción con índice persistente.
+
+La sonoridad integrada (EBU R128) se mide una sola vez por video con el
+filtro ebur128 de ffmpeg, en segundo plano y con prioridad baja (cada
+medición es un trabajo PRIORITY_BACKGROUND del WorkPool). El
+resultado se guarda por video id y se aplica como ganancia fija al
+arrancar mpv, sin loudnorm en tiempo real en la placa ARM.
+"""
+
+import os
+import re
+import json
+import shutil
+import signal
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QProcess, pyqtSignal
+from work_pool import PRIORITY_BACKGROUND
+
+LOUDNESS_INDEX_FILE = os.path.expanduser('~/.config/ytplayer/loudness.json')
+
+# Sonoridad objetivo (LUFS) y límites de la ganancia aplicada (dB)
+TARGET_LUFS = -16.0
+MAX_BOOST_DB = 8.0
+MAX_CUT_DB = -12.0
+
+# Segundos analizados: suficiente para una estimación estable, menos datos
+ANALYZE_SECONDS = 120
+
+
+class LoudnessIndex:
+    """{video_id: lufs} guardado en JSON."""
+
+    def __init__(self, path=LOUDNESS_INDEX_FILE):
+        self.path = path
+        try:
+            with open(self.path) as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def __contains__(self, video_id):
+        return video_id in self.data
+
+    def set(self, video_id, lufs):
+        self.data[video_id] = round(lufs, 1)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[LOUDNESS] No se pudo guardar índice: {e}", flush=True)
+
+    def gain_db(self, video_id):
+        """Ganancia a aplicar para llegar a TARGET_LUFS, o None si no se midió."""
+        lufs = self.data.get(video_id)
+        if lufs is None:
+            return None
+        return max(MAX_CUT_DB, min(MAX_BOOST_DB, TARGET_LUFS - lufs))
+
+
+def mpv_gain_args(gain_db):
+    """Argumentos de mpv para aplicar una ganancia fija (vacío si no hay)."""
+    if gain_db is None or abs(gain_db) < 0.5:
+        return []
+    return [f'--af=lavfi=[volume={gain_db:.1f}dB]']
+
+
+class LoudnessJob(QObject):
+    """Una medición con ffmpeg (nice 19), admitida por el WorkPool."""
+
+    finished = pyqtSignal(str, str)     # video_id, salida de ffmpeg
+
+    def __init__(self, ffmpeg, video_id, url, reaper, parent=None):
+        super().__init__(parent)
+        self.ffmpeg = ffmpeg
+        self.video_id = video_id
+        self.url = url
+        self.reaper = reaper
+        self.process = None
+        self.done = False
+        self.paused = False
+        self.deferred = False   # Admitido mientras estaba pausado
+
+    def start(self):
+        if self.done:
+            return
+        if self.paused:
+            self.deferred = True
+            return
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.MergedChannels)
+        self.process.finished.connect(self._on_finished)
+        self.process.start('nice', ['-n', '19', self.ffmpeg, '-nostats', '-hide_banner',
+                                    '-t', str(ANALYZE_SECONDS), '-i', self.url, '-vn',
+                                    '-af', 'ebur128=framelog=quiet', '-f', 'null', '-'])
+
+    def _on_finished(self, *_):
+        if self.done:
+            return
+        self.done = True
+        output = self.process.readAll().data().decode('utf-8', errors='ignore')
+        self.finished.emit(self.video_id, output)
+        self.deleteLater()
+
+    def set_paused(self, paused):
+        """Congela/reanuda la medición (contención de red)."""
+        self.paused = paused
+        if self.process:
+            pid = self.process.processId()
+            if pid > 0:
+                # nice hace exec de ffmpeg: mismo pid
+                os.kill(pid, signal.SIGSTOP if paused else signal.SIGCONT)
+        elif not paused and self.deferred:
+            self.deferred = False
+            self.start()
+
+    def cancel(self):
+        if self.done:
+            return
+        self.done = True
+        if self.process:
+            self.reaper.reap(self.process, 'ffmpeg loudness')
+        self.deleteLater()
+
+
+class LoudnessAnalyzer(QObject):
+    """Mide canciones de a una. Cola FIFO; cada medición pasa por el WorkPool."""
+
+    measured = pyqtSignal(str, float)   # video_id, LUFS
+
+    def __init__(self, pool, reaper, index=None, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.reaper = reaper
+        self.index = index or LoudnessIndex()
+        self.ffmpeg = shutil.which('ffmpeg')
+        self.pending = OrderedDict()    # {video_id: url}
+        self.job = None                 # LoudnessJob en cola o corriendo
+        self.current_id = None
+        self.paused = False
+        if not self.ffmpeg:
+            print("[LOUDNESS] ffmpeg no encontrado, normalización desactivada", flush=True)
+
+    def gain_db(self, video_id):
+        return self.index.gain_db(video_id)
+
+    def analyze(self, video_id, url):
+        """Encola la medición si el video no está en el índice."""
+        if not self.ffmpeg or video_id in self.index or video_id == self.current_id:
+            return
+        self.pending[video_id] = url
+        self._start_next()
+
+    def _start_next(self):
+        if self.job or not self.pending or self.paused:
+            return
+        video_id, url = self.pending.popitem(last=False)
+        self.current_id = video_id
+        self.job = LoudnessJob(self.ffmpeg, video_id, url, self.reaper, self)
+        self.job.finished.connect(self._on_finished)
+        self.pool.run_async(PRIORITY_BACKGROUND, f'loudness {video_id}', self.job, self.job.start)
+
+    def _on_finished(self, video_id, output):
+        self.job = None
+        self.current_id = None
+
+        # Resumen de ebur128: "Integrated loudness:\n    I:         -14.2 LUFS"
+        match = re.search(r'I:\s+(-?[\d.]+)\s+LUFS', output)
+        if match:
+            lufs = float(match.group(1))
+            self.index.set(video_id, lufs)
+            print(f"[LOUDNESS] {video_id}: {lufs:.1f} LUFS "
+                  f"(ganancia {self.index.gain_db(video_id):+.1f}dB)", flush=True)
+            self.measured.emit(video_id, lufs)
+        else:
+            print(f"[LOUDNESS] {video_id}: medición falló", flush=True)
+        self._start_next()
+
+    def set_paused(self, paused):
+        """Congela/reanuda la medición en curso (contención de red)."""
+        self.paused = paused
+        if self.job:
+            self.job.set_paused(paused)
+        if not paused:
+            self._start_next()
+
+    def cancel_all(self):
+        self.pending.clear()
+        if self.job:
+            self.job.cancel()
+            self.job = None
+            self.current_id = None
@@ -0,0 +1,220 @@
+"""
+Presupuesto de memoria para placas de 512MB (BeagleBone Black).
+
+Mide cada MEMORY_SAMPLE_MS el RSS de este proceso y de todos sus hijos
+(mpv, yt-dlp, ffmpeg) leyendo /proc, junto con MemAvailable del sistema,
+y clasifica la situación en un nivel. La lectura de /proc recorre todos
+los procesos: corre como trabajo PRIORITY_BACKGROUND del WorkPool y solo
+la clasificación vuelve al hilo de la UI.
+
+  normal   → caché de mpv normal, un slot precargado
+  tight    → caché de mpv reducida, se liberan caches de la UI
+  critical → caché mínima, sin slots precargados
+
+El reproductor aplica las políticas; aquí solo se mide y se decide.
+"""
+
+import os
+import gc
+import ctypes
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from work_pool import PRIORITY_BACKGROUND
+
+# Presupuesto para el árbol de procesos (MB). 0 = automático según MemTotal
+MEMORY_BUDGET_MB = int(os.environ.get('YTPLAYER_MEMORY_BUDGET_MB', '0') or 0)
+MEMORY_BUDGET_FRACTION = 0.6      # Automático: esta fracción de MemTotal
+MEMORY_SAMPLE_MS = 5000
+
+# Umbrales como fracción del presupuesto (bajar de nivel requiere RELEASE)
+MEMORY_TIGHT_FRACTION = 0.85
+MEMORY_RELEASE_FRACTION = 0.75
+# Con menos memoria libre en el sistema se pasa a critical sin importar el presupuesto
+MEMORY_MIN_AVAILABLE_MB = 48
+
+LEVELS = ['normal', 'tight', 'critical']
+
+# (demuxer-max-bytes, demuxer-max-back-bytes) de mpv por nivel
+MPV_CACHE_LIMITS = {
+    'normal': ('32MiB', '8MiB'),
+    'tight': ('8MiB', '1MiB'),
+    'critical': ('2MiB', '0'),
+}
+
+# Slots mpv pausados (precargados) permitidos por nivel
+MAX_WARM_SLOTS = {'normal': 1, 'tight': 1, 'critical': 0}
+
+
+def read_meminfo():
+    """{campo: kB} de /proc/meminfo (MemTotal, MemAvailable, ...)."""
+    info = {}
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                info[name] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return info
+
+
+def read_rss_kb(pid):
+    """RSS en kB de un proceso, o None si ya no existe."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _read_stat(pid):
+    """(nombre, ppid) de /proc/<pid>/stat."""
+    with open(f'/proc/{pid}/stat') as f:
+        stat = f.read()
+    # El nombre va entre paréntesis y puede contener espacios
+    name = stat[stat.index('(') + 1:stat.rindex(')')]
+    ppid = int(stat[stat.rindex(')') + 2:].split()[1])
+    return name, ppid
+
+
+def child_processes(root_pid):
+    """{pid: nombre} de todos los descendientes de root_pid."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            name, ppid = _read_stat(entry)
+        except (OSError, ValueError):
+            continue
+        parents[int(entry)] = (name, ppid)
+
+    children = {}
+    frontier = [root_pid]
+    while frontier:
+        parent = frontier.pop()
+        for pid, (name, ppid) in parents.items():
+            if ppid == parent and pid not in children:
+                children[pid] = name
+                frontier.append(pid)
+    return children
+
+
+def measure(root_pid):
+    """(RSS propio, {pid: (nombre, RSS)} de hijos, MemAvailable) en kB. Bloqueante."""
+    own_kb = read_rss_kb(root_pid) or 0
+    children = {}
+    for pid, name in child_processes(root_pid).items():
+        rss = read_rss_kb(pid)
+        if rss:
+            children[pid] = (name, rss)
+    return own_kb, children, read_meminfo().get('MemAvailable')
+
+
+def release_heap():
+    """Devuelve al sistema la memoria libre del heap de Python (glibc)."""
+    gc.collect()
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class MemoryGovernor(QObject):
+    """Muestrea memoria y emite cambios de nivel."""
+
+    sampled = pyqtSignal(dict)         # ver _on_measured()
+    level_changed = pyqtSignal(str, str)   # nivel nuevo, nivel anterior
+
+    def __init__(self, pool, budget_mb=MEMORY_BUDGET_MB, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.job = None           # Medición en curso
+        if not budget_mb:
+            total_kb = read_meminfo().get('MemTotal', 512 * 1024)
+            budget_mb = int(total_kb / 1024 * MEMORY_BUDGET_FRACTION)
+        self.budget_kb = budget_mb * 1024
+        self.level = 'normal'
+        self.last = {}
+        self.peak_kb = 0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(MEMORY_SAMPLE_MS)
+        self.timer.timeout.connect(self.sample)
+
+    def start(self):
+        self.sample()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        if self.job:
+            self.job.cancel()
+            self.job = None
+
+    def cache_limits(self):
+        """(demuxer-max-bytes, demuxer-max-back-bytes) para el mpv que suena."""
+        return MPV_CACHE_LIMITS[self.level]
+
+    def max_warm_slots(self):
+        return MAX_WARM_SLOTS[self.level]
+
+    def sample(self):
+        """Pide una medición en un hilo; el resultado llega por sampled."""
+        if self.job:
+            return
+        pid = os.getpid()
+        self.job = self.pool.run_thread(PRIORITY_BACKGROUND, 'memoria',
+                                        lambda _token: measure(pid))
+        self.job.finished.connect(self._on_measured)
+        self.job.failed.connect(self._on_failed)
+
+    def _on_failed(self, error):
+        self.job = None
+        print(f"[MEM] Medición falló: {error}", flush=True)
+
+    def _on_measured(self, result):
+        self.job = None
+        own_kb, children, available_kb = result
+        total_kb = own_kb + sum(rss for _, rss in children.values())
+        self.peak_kb = max(self.peak_kb, total_kb)
+
+        self._update_level(total_kb, available_kb)
+        self.last = {
+            'own_kb': own_kb,
+            'children': children,
+            'total_kb': total_kb,
+            'available_kb': available_kb,
+            'budget_kb': self.budget_kb,
+            'peak_kb': self.peak_kb,
+            'level': self.level,
+        }
+        self.sampled.emit(self.last)
+
+    def _update_level(self, total_kb, available_kb):
+        low_available = (available_kb is not None
+                         and available_kb < MEMORY_MIN_AVAILABLE_MB * 1024)
+        if total_kb >= self.budget_kb or low_available:
+            level = 'critical'
+        elif total_kb >= self.budget_kb * MEMORY_TIGHT_FRACTION:
+            level = 'tight'
+        elif total_kb < self.budget_kb * MEMORY_RELEASE_FRACTION:
+            level = 'normal'
+        else:
+            # Zona de histéresis: solo se permite bajar de critical a tight
+            level = 'tight' if self.level == 'critical' else self.level
+
+        if level != self.level:
+            previous, self.level = self.level, level
+            print(f"[MEM] {previous} → {level}: {total_kb / 1024:.0f}MB de "
+                  f"{self.budget_kb / 1024:.0f}MB", flush=True)
+            self.level_changed.emit(level, previous)
+
+    def summary(self):
+        """Texto corto para la UI."""
+        if not self.last:
+            return ''
+        return (f"🧠 {self.last['total_kb'] / 1024:.0f}/{self.budget_kb / 1024:.0f}MB"
+                f" ({len(self.last['children'])} proc)")
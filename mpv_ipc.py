@@ -0,0 +1,123 @@
+"""
+Cliente asíncrono del IPC JSON de mpv (--input-ipc-server) sobre QLocalSocket.
+
+No bloquea el hilo de la UI: los comandos se encolan hasta que mpv crea
+el socket, las respuestas llegan por callback y los cambios de
+propiedades observadas por la señal property_changed.
+"""
+
+import json
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtNetwork import QLocalSocket
+
+# mpv crea el socket unos ms después de arrancar: reintentar la conexión
+IPC_RETRY_MS = 50
+IPC_CONNECT_TIMEOUT_MS = 5000
+
+
+class MpvIpc(QObject):
+    """Conexión a un mpv. Una instancia por proceso/socket."""
+
+    property_changed = pyqtSignal(str, object)   # nombre, valor
+    event_received = pyqtSignal(str, object)     # nombre de evento, dict completo
+    connected = pyqtSignal()
+
+    def __init__(self, socket_path, parent=None):
+        super().__init__(parent)
+        self.socket_path = socket_path
+        self.socket = QLocalSocket(self)
+        self.socket.readyRead.connect(self._on_ready_read)
+        self.socket.connected.connect(self._on_connected)
+        self.socket.error.connect(self._on_error)
+        self._buffer = b''
+        self._queue = []          # Mensajes a enviar al conectar
+        self._callbacks = {}      # {request_id: callback(error, data)}
+        self._observed = {}       # {nombre: observe_id}
+        self._next_id = 1
+        self._retry_elapsed = 0
+        self._closed = False
+        self.socket.connectToServer(self.socket_path)
+
+    def is_connected(self):
+        return self.socket.state() == QLocalSocket.ConnectedState
+
+    def _on_connected(self):
+        for message in self._queue:
+            self.socket.write(message)
+        self._queue = []
+        self.connected.emit()
+
+    def _on_error(self, _error):
+        if self._closed or self.is_connected():
+            return
+        if self._retry_elapsed >= IPC_CONNECT_TIMEOUT_MS:
+            print(f"[IPC] No se pudo conectar a {self.socket_path}", flush=True)
+            return
+        self._retry_elapsed += IPC_RETRY_MS
+        QTimer.singleShot(IPC_RETRY_MS, self._retry)
+
+    def _retry(self):
+        if not self._closed and self.socket.state() == QLocalSocket.UnconnectedState:
+            self.socket.connectToServer(self.socket_path)
+
+    def _send(self, payload):
+        message = (json.dumps(payload) + '\n').encode('utf-8')
+        if self.is_connected():
+            self.socket.write(message)
+        else:
+            self._queue.append(message)
+
+    def command(self, *args, callback=None):
+        """Envía un comando. callback(error, data) opcional con la respuesta."""
+        request_id = self._next_id
+        self._next_id += 1
+        if callback:
+            self._callbacks[request_id] = callback
+        self._send({'command': list(args), 'request_id': request_id})
+        return request_id
+
+    def set_property(self, name, value, callback=None):
+        return self.command('set_property', name, value, callback=callback)
+
+    def get_property(self, name, callback):
+        return self.command('get_property', name, callback=callback)
+
+    def observe(self, name):
+        """Observa una propiedad: cada cambio emite property_changed."""
+        if name in self._observed:
+            return
+        observe_id = len(self._observed) + 1
+        self._observed[name] = observe_id
+        self.command('observe_property', observe_id, name)
+
+    def _on_ready_read(self):
+        self._buffer += self.socket.readAll().data()
+        while b'\n' in self._buffer:
+            line, self._buffer = self._buffer.split(b'\n', 1)
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            self._dispatch(message)
+
+    def _dispatch(self, message):
+        if 'request_id' in message and 'event' not in message:
+            callback = self._callbacks.pop(message['request_id'], None)
+            if callback:
+                error = message.get('error')
+                callback(None if error == 'success' else error, message.get('data'))
+            return
+
+        event = message.get('event')
+        if event == 'property-change':
+            self.property_changed.emit(message.get('name', ''), message.get('data'))
+        elif event:
+            self.event_received.emit(event, message)
+
+    def close(self):
+        self._closed = True
+        self._callbacks.clear()
+        self.socket.abort()
+        self.deleteLater()
@@ -0,0 +1,51 @@
+"""
+Perfiles de caché de mpv según el rol del slot.
+
+- warm: slot pausado con la siguiente canción. Descarga solo los primeros
+  WARM_CACHE_SECS segundos y se detiene; alcanza para arrancar al
+  instante sin gastar RAM ni ancho de banda en una canción que quizás se
+  salte.
+- playing: la canción que suena. Lee por adelantado PLAYING_CACHE_SECS
+  para aguantar cortes del Wi-Fi, limitado en bytes por el nivel de
+  memoria (ver memory_governor.py).
+
+Las opciones demuxer-*/cache-secs son propiedades de mpv: al promover un
+slot se cambia de perfil por IPC, sin reiniciar mpv.
+"""
+
+# Segundos leídos por adelantado en cada rol
+WARM_CACHE_SECS = 20
+PLAYING_CACHE_SECS = 120
+
+# Tope en bytes del slot warm: 20s de Opus a 96kbps son ~240KB
+WARM_MAX_BYTES = '2MiB'
+
+# (demuxer-max-bytes, demuxer-max-back-bytes) si no se indica otro límite
+DEFAULT_PLAYING_LIMITS = ('32MiB', '8MiB')
+
+
+def profile_properties(role, cache_limits=None):
+    """{propiedad: valor} de mpv para el rol ('warm' o 'playing')."""
+    if role == 'warm':
+        return {
+            'cache': 'yes',
+            'cache-secs': WARM_CACHE_SECS,
+            'demuxer-readahead-secs': WARM_CACHE_SECS,
+            'demuxer-max-bytes': WARM_MAX_BYTES,
+            'demuxer-max-back-bytes': '0',
+        }
+    max_bytes, back_bytes = cache_limits or DEFAULT_PLAYING_LIMITS
+    return {
+        'cache': 'yes',
+        'cache-secs': PLAYING_CACHE_SECS,
+        'demuxer-readahead-secs': PLAYING_CACHE_SECS,
+        'demuxer-max-bytes': max_bytes,
+        'demuxer-max-back-bytes': back_bytes,
+        # Seeks dentro de lo ya leído se sirven desde la caché (ver seek.py)
+        'demuxer-seekable-cache': 'yes',
+    }
+
+
+def profile_args(role, cache_limits=None):
+    """Argumentos de línea de comandos de mpv para el rol."""
+    return [f'--{name}={value}' for name, value in profile_properties(role, cache_limits).items()]
@@ -0,0 +1,149 @@
+"""
+Planificador de trabajo en segundo plano consciente del ancho de banda.
+
+El prefetch compite con la canción que suena por el mismo enlace. El
+planificador observa por IPC la caché del mpv que reproduce
+(demuxer-cache-duration) y:
+  - retrasa los trabajos en cola hasta que haya PREFETCH_START_CACHE_S
+    segundos de audio en caché,
+  - pausa el trabajo en curso si la caché cae bajo PREFETCH_PAUSE_CACHE_S
+    mientras todavía se descarga (contención), y lo reanuda al recuperarse,
+  - sin red (set_blocked) retiene los trabajos que la necesitan.
+"""
+
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from mpv_ipc import MpvIpc
+
+# Segundos en caché necesarios para empezar trabajo de fondo
+PREFETCH_START_CACHE_S = 15.0
+# Bajo esto, con la descarga activa, se pausa el trabajo de fondo
+PREFETCH_PAUSE_CACHE_S = 5.0
+# Sobre esto se reanuda
+PREFETCH_RESUME_CACHE_S = 10.0
+# Si mpv no informa caché (p.ej. IPC caído), no esperar más que esto
+PREFETCH_MAX_WAIT_S = 20.0
+
+
+class PrefetchScheduler(QObject):
+    """Decide cuándo corre el trabajo de fondo según la caché del audio actual.
+
+    pause_fn() → int (trabajos pausados) y resume_fn() los provee el reproductor.
+    """
+
+    contention = pyqtSignal(float)   # segundos en caché al detectar contención
+
+    def __init__(self, pause_fn, resume_fn, parent=None):
+        super().__init__(parent)
+        self.pause_fn = pause_fn
+        self.resume_fn = resume_fn
+        self.ipc = None
+        self.attached_at = None
+        self.cache_s = None       # demuxer-cache-duration
+        self.cache_idle = False   # demuxer-cache-idle: no está descargando
+        self.stalled = False      # paused-for-cache: el audio se cortó
+        self.pending = []         # [(nombre, función, necesita_red)]
+        self.paused = False
+        self.blocked = False      # Sin red: retener trabajos de red
+        self.contention_events = 0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self._evaluate)
+
+    def attach(self, socket_path):
+        """Empieza a observar el mpv que reproduce."""
+        self.detach()
+        self.ipc = MpvIpc(socket_path, self)
+        self.ipc.property_changed.connect(self._on_property)
+        for name in ('demuxer-cache-duration', 'demuxer-cache-idle', 'paused-for-cache'):
+            self.ipc.observe(name)
+        self.attached_at = time.time()
+        self.timer.start()
+
+    def detach(self):
+        """Deja de observar (canción terminada o detenida). Reanuda lo pausado."""
+        if self.ipc:
+            self.ipc.close()
+            self.ipc = None
+        self.timer.stop()
+        self.attached_at = None
+        self.cache_s = None
+        self.cache_idle = False
+        self.stalled = False
+        self._resume()
+
+    def submit(self, name, fn, needs_network=True):
+        """Encola un trabajo de fondo. Sin audio sonando corre de inmediato."""
+        if any(job[0] == name for job in self.pending):
+            return
+        self.pending.append((name, fn, needs_network))
+        self._evaluate()
+
+    def cancel(self, name):
+        self.pending = [job for job in self.pending if job[0] != name]
+
+    def set_blocked(self, blocked):
+        """Sin red los trabajos que la necesitan esperan en cola hasta que vuelva."""
+        self.blocked = blocked
+        if not blocked:
+            self._evaluate()
+
+    def _on_property(self, name, value):
+        if name == 'demuxer-cache-duration':
+            self.cache_s = value if isinstance(value, (int, float)) else None
+        elif name == 'demuxer-cache-idle':
+            self.cache_idle = bool(value)
+        elif name == 'paused-for-cache':
+            self.stalled = bool(value)
+        self._evaluate()
+
+    def _can_start(self):
+        if self.attached_at is None:
+            return True
+        if self.cache_idle and not self.stalled:
+            return True  # Caché llena o stream completo: el enlace está libre
+        if self.cache_s is not None and self.cache_s >= PREFETCH_START_CACHE_S:
+            return True
+        return time.time() - self.attached_at >= PREFETCH_MAX_WAIT_S
+
+    def _evaluate(self):
+        if self.attached_at is not None:
+            downloading = not self.cache_idle
+            low = self.cache_s is not None and self.cache_s < PREFETCH_PAUSE_CACHE_S
+            if not self.paused and (self.stalled or (downloading and low)):
+                self._pause()
+            elif self.paused and not self.stalled and (
+                    self.cache_idle or (self.cache_s or 0) >= PREFETCH_RESUME_CACHE_S):
+                self._resume()
+
+        if self.pending and not self.paused and self._can_start():
+            jobs = [job for job in self.pending if not (self.blocked and job[2])]
+            self.pending = [job for job in self.pending if job not in jobs]
+            for name, fn, _ in jobs:
+                waited = time.time() - self.attached_at if self.attached_at else 0
+                print(f"[SCHED] {name} (tras {waited:.1f}s, caché {self._cache_str()})",
+                      flush=True)
+                fn()
+
+    def _pause(self):
+        count = self.pause_fn()
+        if count == 0:
+            return
+        self.paused = True
+        self.contention_events += 1
+        cache = self.cache_s or 0.0
+        print(f"[SCHED] Contención #{self.contention_events}: caché {self._cache_str()}"
+              f"{' (cortado)' if self.stalled else ''}, pausando {count} trabajos",
+              flush=True)
+        self.contention.emit(cache)
+
+    def _resume(self):
+        if not self.paused:
+            return
+        self.paused = False
+        self.resume_fn()
+        print(f"[SCHED] Reanudando trabajo de fondo (caché {self._cache_str()})", flush=True)
+
+    def _cache_str(self):
+        return f"{self.cache_s:.1f}s" if self.cache_s is not None else "?"
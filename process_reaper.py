@@ -0,0 +1,84 @@
+"""
+Terminación asíncrona de procesos (mpv / yt-dlp) sin bloquear la UI.
+
+En vez de terminate() + waitForFinished() en el hilo de la UI, el reaper
+envía SIGTERM, escucha la señal finished y manda SIGKILL si el proceso
+no terminó antes del plazo. Los slots quedan libres inmediatamente.
+"""
+
+import os
+import time
+import signal
+from PyQt5.QtCore import QObject, QProcess, QTimer
+
+# Plazo entre SIGTERM y SIGKILL
+REAP_KILL_MS = 1500
+
+
+class ProcessReaper(QObject):
+    """Lleva cuenta de procesos saliendo ("zombies") hasta que terminan."""
+
+    def __init__(self, parent=None, kill_after_ms=REAP_KILL_MS):
+        super().__init__(parent)
+        self.kill_after_ms = kill_after_ms
+        self.pending = {}       # {QProcess: (nombre, timestamp_inicio)}
+        self.reaped = 0         # Terminaron con SIGTERM
+        self.killed = 0         # Necesitaron SIGKILL
+
+    def reap(self, process, name='proceso'):
+        """Termina un proceso de forma asíncrona. Retorna inmediatamente."""
+        if process is None or process in self.pending:
+            return
+
+        # Cortar callbacks del dueño anterior (evita callbacks huérfanos)
+        for sig in (process.finished, process.started,
+                    process.readyReadStandardOutput, process.readyReadStandardError):
+            try:
+                sig.disconnect()
+            except TypeError:
+                pass
+
+        if process.state() == QProcess.NotRunning:
+            process.deleteLater()
+            return
+
+        # Adoptar el proceso: si su dueño se destruye no debe matarlo a medias
+        process.setParent(self)
+        self.pending[process] = (name, time.time())
+        process.finished.connect(lambda *_, p=process: self._on_finished(p))
+        process.terminate()
+        # Si estaba congelado (SIGSTOP) no atiende SIGTERM hasta continuar
+        pid = process.processId()
+        if pid > 0:
+            try:
+                os.kill(pid, signal.SIGCONT)
+            except OSError:
+                pass
+        QTimer.singleShot(self.kill_after_ms, lambda p=process: self._on_deadline(p))
+
+    def _on_deadline(self, process):
+        if process not in self.pending:
+            return
+        name, _ = self.pending[process]
+        print(f"[REAP] {name} no respondió a SIGTERM, enviando SIGKILL", flush=True)
+        self.killed += 1
+        process.kill()
+
+    def _on_finished(self, process):
+        entry = self.pending.pop(process, None)
+        if entry:
+            name, started = entry
+            elapsed_ms = (time.time() - started) * 1000
+            print(f"[REAP] {name} terminó en {elapsed_ms:.0f}ms "
+                  f"({len(self.pending)} pendientes)", flush=True)
+            self.reaped += 1
+        process.deleteLater()
+
+    def kill_all(self):
+        """Mata todos los pendientes (al salir de la aplicación)."""
+        for process in list(self.pending):
+            process.kill()
+
+    def summary(self):
+        return (f"pendientes={len(self.pending)} terminados={self.reaped} "
+                f"kill={self.killed}")
@@ -0,0 +1,168 @@
+"""
+Presentación del progreso de la canción con refresco acotado.
+
+mpv imprime una línea de estado por cada cambio, varias por segundo, y
+cada setText/setValue reestiliza y repinta el widget. ProgressPresenter
+guarda solo el último valor y lo muestra como mucho PROGRESS_REFRESH_HZ
+veces por segundo:
+  - si el texto y el porcentaje visibles no cambiaron, no toca los widgets,
+  - con la ventana oculta/minimizada o la pantalla apagada no refresca;
+    al volver muestra el último valor,
+  - sin actualizaciones pendientes no hay timers despertando la CPU.
+
+YTPLAYER_PROGRESS_HZ=0 vuelve al comportamiento anterior (un repintado
+por línea de mpv) para comparar. En ambos modos se registra cada
+UI_CPU_LOG_MS el CPU del hilo de la UI (time.thread_time) junto con
+cuántas líneas llegaron y cuántas terminaron en un repintado.
+"""
+
+import os
+import glob
+import time
+from PyQt5.QtCore import QObject, QTimer
+
+PROGRESS_REFRESH_HZ = float(os.environ.get('YTPLAYER_PROGRESS_HZ', '2') or 0)
+SCREEN_CHECK_MS = 5000
+UI_CPU_LOG_MS = 60000
+
+# bl_power: 0 = encendida (FB_BLANK_UNBLANK)
+BACKLIGHT_GLOB = '/sys/class/backlight/*/bl_power'
+DRM_CONNECTOR_GLOB = '/sys/class/drm/card*-*'
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def screen_is_on():
+    """False si el backlight o todos los conectores DRM conectados están apagados."""
+    for path in glob.glob(BACKLIGHT_GLOB):
+        if _read(path) not in (None, '0'):
+            return False
+    connected = [path for path in glob.glob(DRM_CONNECTOR_GLOB)
+                 if _read(os.path.join(path, 'status')) == 'connected']
+    if connected and all(_read(os.path.join(path, 'dpms')) == 'Off' for path in connected):
+        return False
+    return True
+
+
+def time_to_seconds(time_str):
+    parts = time_str.split(':')
+    if len(parts) == 2:
+        return int(parts[0]) * 60 + int(parts[1])
+    elif len(parts) == 3:
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+    return 0
+
+
+class ProgressPresenter(QObject):
+    """Muestra tiempo y porcentaje de la canción en time_label/progress_bar."""
+
+    def __init__(self, progress_bar, time_label, hz=PROGRESS_REFRESH_HZ, parent=None):
+        super().__init__(parent)
+        self.progress_bar = progress_bar
+        self.time_label = time_label
+        self.hz = hz
+        self.latest = None            # (actual, total) sin mostrar
+        self.shown_text = None
+        self.shown_percent = None
+        self.visible = True
+        self.screen_on = True
+        self.received = 0             # Líneas de estado recibidas
+        self.painted = 0              # Refrescos que cambiaron algo
+        self.skipped = 0              # Refrescos sin cambios visibles
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        if hz > 0:
+            self.timer.setInterval(int(1000 / hz))
+        self.timer.timeout.connect(self.flush)
+
+        self.screen_timer = QTimer(self)
+        self.screen_timer.setInterval(SCREEN_CHECK_MS)
+        self.screen_timer.timeout.connect(self._check_screen)
+        self.screen_timer.start()
+
+        self.cpu_mark = (time.thread_time(), time.time())
+        self.cpu_timer = QTimer(self)
+        self.cpu_timer.setInterval(UI_CPU_LOG_MS)
+        self.cpu_timer.timeout.connect(self._log_cpu)
+        self.cpu_timer.start()
+
+    def active(self):
+        return self.visible and self.screen_on
+
+    def update(self, current, total):
+        """Nueva posición ('m:ss', 'm:ss') leída de mpv."""
+        self.received += 1
+        self.latest = (current, total)
+        if self.hz <= 0:
+            self.flush()
+        elif self.active() and not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        if not self.latest or not self.active():
+            return
+        current, total = self.latest
+        self.latest = None
+        changed = False
+
+        text = f"{current} / {total}"
+        if text != self.shown_text:
+            self.time_label.setText(text)
+            self.shown_text = text
+            changed = True
+
+        total_secs = time_to_seconds(total)
+        if total_secs > 0:
+            percent = int((time_to_seconds(current) / total_secs) * 100)
+            if percent != self.shown_percent:
+                self.progress_bar.setValue(percent)
+                self.shown_percent = percent
+                changed = True
+
+        if changed:
+            self.painted += 1
+        else:
+            self.skipped += 1
+
+    def reset(self):
+        """Los widgets se escribieron por fuera (Cargando..., detenido)."""
+        self.timer.stop()
+        self.latest = None
+        self.shown_text = None
+        self.shown_percent = None
+
+    def set_visible(self, visible):
+        if visible == self.visible:
+            return
+        self.visible = visible
+        print(f"[UI] Ventana {'visible' if visible else 'oculta'}: progreso "
+              f"{'activo' if visible else 'en pausa'}", flush=True)
+        if self.active():
+            self.flush()
+
+    def _check_screen(self):
+        on = screen_is_on()
+        if on == self.screen_on:
+            return
+        self.screen_on = on
+        print(f"[UI] Pantalla {'encendida' if on else 'apagada'}", flush=True)
+        if self.active():
+            self.flush()
+
+    def _log_cpu(self):
+        cpu, wall = time.thread_time(), time.time()
+        usage = (cpu - self.cpu_mark[0]) / max(1e-6, wall - self.cpu_mark[1])
+        self.cpu_mark = (cpu, wall)
+        if not self.received:
+            return
+        mode = f"{self.hz:g}Hz" if self.hz > 0 else "sin límite"
+        print(f"[UI] CPU hilo UI {usage * 100:.1f}% | progreso ({mode}): {self.received} líneas → "
+              f"{self.painted} repintados, {self.skipped} sin cambios", flush=True)
+        self.received = self.painted = self.skipped = 0
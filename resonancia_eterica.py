@@ -3,19 +3,38 @@
 Resonancia Etérica - Prototipo Visual v3
 Interfaz antroposófica inspirada en el Goetheanum
 Basado en diseño de referencia - Versión mejorada
+
+Modo de render con caché (YTPLAYER_SCENE_CACHE=1, por defecto):
+  - Todo lo que no se anima (fondo, semilla de búsqueda, textos fijos) se
+    funde en una sola capa que la vista dibuja como fondo cacheado.
+  - Las hojas (cambian solo al pasar el mouse) usan DeviceCoordinateCache;
+    la estrella gira por transformación sobre ItemCoordinateCache. Lo que
+    se repinta en cada cuadro (flor, rama, cometa...) va sin caché.
+  - La vista repinta solo el área de lo que cambió.
+Ver bench_resonancia.py para comparar tiempos por cuadro.
 """
 
 import sys
 import math
+import time
 from PyQt5.QtWidgets import (QApplication, QGraphicsView, QGraphicsScene,
                              QGraphicsObject, QGraphicsTextItem, QLineEdit,
-                             QGraphicsProxyWidget)
+                             QGraphicsProxyWidget, QGraphicsItem)
 from PyQt5.QtCore import (Qt, QRectF, QPointF, QPropertyAnimation,
-                          pyqtProperty, QEasingCurve, QTimer, QSequentialAnimationGroup)
+                          pyqtProperty, pyqtSignal, QEasingCurve, QTimer,
+                          QSequentialAnimationGroup)
 from PyQt5.QtGui import (QPainter, QBrush, QColor, QRadialGradient,
                          QLinearGradient, QPen, QPainterPath, QFont,
                          QFontDatabase, QPolygonF, QPixmap)
 import os
+from collections import deque
+from background_assets import (BACKGROUND_SOURCE, load_variant, placeholder_color)
+from work_pool import WorkPool, PRIORITY_PLAY
+from seek import SeekController
+
+SCENE_CACHE = os.environ.get('YTPLAYER_SCENE_CACHE', '1') != '0'
+# Cuadros recientes guardados para las estadísticas
+FRAME_SAMPLES = 600
 
 
 class FlorCentral(QGraphicsObject):
@@ -527,7 +546,6 @@ class EstrellaDecorativa(QGraphicsObject):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._glow = 0.8
-        self._rotation = 0
 
     def boundingRect(self):
         return QRectF(-30, -30, 60, 60)
@@ -535,7 +553,6 @@ class EstrellaDecorativa(QGraphicsObject):
     def paint(self, painter, option, widget):
         painter.setRenderHint(QPainter.Antialiasing)
         painter.save()
-        painter.rotate(self._rotation)
 
         # Glow externo
         glow = QRadialGradient(0, 0, 28)
@@ -584,20 +601,28 @@ class EstrellaDecorativa(QGraphicsObject):
 
     @pyqtProperty(float)
     def rotacion(self):
-        return self._rotation
+        return self.rotation()
 
     @rotacion.setter
     def rotacion(self, value):
-        self._rotation = value
-        self.update()
+        # Por transformación: el dibujo no cambia y puede quedar en caché
+        self.setRotation(value)
 
 
 class CometaProgreso(QGraphicsObject):
-    """Barra de progreso como cometa con estela luminosa."""
+    """Barra de progreso como cometa con estela luminosa.
+
+    Se puede tocar o arrastrar: emite seek_requested(fracción, final), con
+    final=True al soltar (conectar a seek.SeekController.request).
+    """
+
+    seek_requested = pyqtSignal(float, bool)
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._progress = 0.0  # 0.0 a 1.0
+        self.duration = None  # Segundos de la canción (None: tiempo simulado)
+        self.dragging = False
         self._glow = 0.8
         self._trail_phase = 0  # Para animación de la estela
         self.path_width = 700  # Ancho del recorrido
@@ -739,8 +764,8 @@ class CometaProgreso(QGraphicsObject):
         # === TIEMPO ===
         # Mostrar tiempo si hay progreso
         if self._progress > 0:
-            # Tiempo transcurrido (simulado)
-            total_secs = 240  # 4 minutos ejemplo
+            # Tiempo transcurrido (simulado si no hay duración real)
+            total_secs = self.duration or 240  # 4 minutos ejemplo
             current_secs = int(self._progress * total_secs)
             mins = current_secs // 60
             secs = current_secs % 60
@@ -777,11 +802,24 @@ class CometaProgreso(QGraphicsObject):
         self._trail_phase = value
         self.update()
 
-    def mousePressEvent(self, event):
-        """Permitir click para cambiar posición."""
-        x = event.pos().x()
-        progress = (x + 350) / self.path_width
+    def _seek_to(self, event, final):
+        progress = (event.pos().x() + 350) / self.path_width
         self.progress = max(0.0, min(1.0, progress))
+        self.seek_requested.emit(self._progress, final)
+
+    def mousePressEvent(self, event):
+        """Click o inicio de arrastre: mueve el cometa y pide seek."""
+        self.dragging = True
+        self._seek_to(event, False)
+
+    def mouseMoveEvent(self, event):
+        if self.dragging:
+            self._seek_to(event, False)
+
+    def mouseReleaseEvent(self, event):
+        if self.dragging:
+            self.dragging = False
+            self._seek_to(event, True)
 
 
 class PlantaBioluminiscente(QGraphicsObject):
@@ -874,8 +912,12 @@ class PlantaBioluminiscente(QGraphicsObject):
 class ResonanciaEterica(QGraphicsView):
     """Ventana principal - Resonancia Etérica."""
 
-    def __init__(self):
+    def __init__(self, cache_escena=SCENE_CACHE):
         super().__init__()
+        self.cache_escena = cache_escena
+        self.capa_estatica = None    # QPixmap con los ítems que no se animan
+        self.fondo_listo = False
+        self.frame_times = deque(maxlen=FRAME_SAMPLES)
 
         # Configuración ventana
         self.setWindowFlags(Qt.FramelessWindowHint)
@@ -891,6 +933,10 @@ class ResonanciaEterica(QGraphicsView):
         self.setScene(self.scene)
         self.resize(1280, 720)
 
+        if self.cache_escena:
+            self.setCacheMode(QGraphicsView.CacheBackground)
+            self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+
         # Construir interfaz
         self.crear_fondo()  # Imagen PNG de fondo
         # Elementos estáticos ya en la imagen (comentados):
@@ -911,29 +957,114 @@ class ResonanciaEterica(QGraphicsView):
         # Animaciones
         self.iniciar_animaciones()
 
+        if self.cache_escena:
+            for hoja in self.hojas_cola:
+                hoja.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+            self.estrella.setCacheMode(QGraphicsItem.ItemCoordinateCache)
+            if not os.path.exists(BACKGROUND_SOURCE):
+                self.aplanar_estaticos()
+
     def crear_fondo(self):
-        """Fondo con imagen PNG - 720p."""
-        # Cargar la imagen de fondo
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        imagen_path = os.path.join(script_dir, "Gemini_Generated_Image_4rngoi4rngoi4rng.png")
-
-        if os.path.exists(imagen_path):
-            pixmap = QPixmap(imagen_path)
-            # Escalar la imagen a 720p exacto
-            pixmap = pixmap.scaled(1280, 720, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-            pixmap_item = self.scene.addPixmap(pixmap)
-            # Centrar la imagen en la escena (origen en -640, -360)
-            pixmap_item.setPos(-640, -360)
-            pixmap_item.setZValue(-100)  # Asegurar que esté detrás de todo
+        """Fondo: color plano ya, la imagen al tamaño de la escena desde un hilo."""
+        rect = self.scene.sceneRect()
+        if os.path.exists(BACKGROUND_SOURCE):
+            # Color medio de la imagen (ver background_assets.py), sin decodificar nada
+            self.fondo = self.scene.addRect(rect, QPen(Qt.NoPen),
+                                            QBrush(QColor(placeholder_color())))
+            self.fondo.setZValue(-100)  # Asegurar que esté detrás de todo
+            size = (int(rect.width()), int(rect.height()))
+            started = time.time()
+            self.assets = WorkPool(max_workers=1, parent=self)
+            job = self.assets.run_thread(PRIORITY_PLAY, 'fondo', lambda token: load_variant(size))
+            job.finished.connect(lambda image: self._on_fondo_listo(image, started))
+            job.failed.connect(self._on_fondo_fallo)
         else:
             # Fondo de respaldo si no existe la imagen
             fondo_path = QPainterPath()
-            fondo_path.addRect(-640, -360, 1280, 720)
+            fondo_path.addRect(rect)
             grad_fondo = QRadialGradient(0, 0, 640)
             grad_fondo.setColorAt(0, QColor(20, 25, 50))
             grad_fondo.setColorAt(0.5, QColor(15, 20, 40))
             grad_fondo.setColorAt(1, QColor(10, 12, 25))
             self.scene.addPath(fondo_path, QPen(Qt.NoPen), QBrush(grad_fondo))
+            self.fondo_listo = True
+
+    def _on_fondo_listo(self, image, started):
+        """La variante llegó (QImage): pasarla a QPixmap en el hilo de la UI."""
+        pixmap_item = self.scene.addPixmap(QPixmap.fromImage(image))
+        pixmap_item.setPos(self.scene.sceneRect().topLeft())
+        pixmap_item.setZValue(-100)
+        self.scene.removeItem(self.fondo)
+        self.fondo = pixmap_item
+        self.fondo_listo = True
+        print(f"[ASSETS] Fondo {image.width()}x{image.height()} en "
+              f"{(time.time() - started) * 1000:.0f}ms", flush=True)
+        if self.cache_escena:
+            self.aplanar_estaticos()
+
+    def _on_fondo_fallo(self, error):
+        print(f"[ASSETS] Fondo: {error}", flush=True)
+        self.fondo_listo = True
+        if self.cache_escena:
+            self.aplanar_estaticos()
+
+    # === Caché de render ===
+    @staticmethod
+    def _es_estatico(item):
+        """Ítems sueltos que nunca cambian: pixmaps, paths y textos no editables."""
+        if item.parentItem() is not None:
+            return False
+        if isinstance(item, QGraphicsTextItem):
+            return item.textInteractionFlags() == Qt.NoTextInteraction
+        return not isinstance(item, QGraphicsObject)
+
+    def aplanar_estaticos(self):
+        """Funde los ítems estáticos en una sola capa dibujada como fondo."""
+        rect = self.scene.sceneRect()
+        raiz = [item for item in self.scene.items() if item.parentItem() is None]
+        estaticos = [item for item in raiz if self._es_estatico(item)]
+        if not estaticos:
+            return
+        started = time.perf_counter()
+        ocultos = [item for item in raiz if item not in estaticos and item.isVisible()]
+        capa = QPixmap(rect.size().toSize())
+        capa.fill(Qt.transparent)
+        painter = QPainter(capa)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        for item in ocultos:
+            item.hide()
+        if self.capa_estatica is not None:
+            painter.drawPixmap(0, 0, self.capa_estatica)
+        self.scene.render(painter, QRectF(capa.rect()), rect)
+        for item in ocultos:
+            item.show()
+        painter.end()
+        for item in estaticos:
+            self.scene.removeItem(item)
+        self.fondo = None
+        self.capa_estatica = capa
+        self.resetCachedContent()
+        print(f"[ESCENA] {len(estaticos)} ítems estáticos → 1 capa en "
+              f"{(time.perf_counter() - started) * 1000:.0f}ms", flush=True)
+
+    def drawBackground(self, painter, rect):
+        if self.capa_estatica is None:
+            return super().drawBackground(painter, rect)
+        painter.drawPixmap(self.sceneRect().topLeft(), self.capa_estatica)
+
+    def paintEvent(self, event):
+        started = time.perf_counter()
+        super().paintEvent(event)
+        self.frame_times.append((time.perf_counter() - started) * 1000)
+
+    def resumen_cuadros(self):
+        if not self.frame_times:
+            return "sin cuadros"
+        ordenados = sorted(self.frame_times)
+        n = len(ordenados)
+        return (f"{n} cuadros, mediana {ordenados[n // 2]:.2f}ms, "
+                f"p95 {ordenados[min(n - 1, int(n * 0.95))]:.2f}ms, máx {ordenados[-1]:.2f}ms")
 
     def crear_titulo(self):
         """Título elegante arriba del marco."""
@@ -1128,7 +1259,31 @@ class ResonanciaEterica(QGraphicsView):
         self.cometa = CometaProgreso()
         self.cometa.setPos(0, 200)  # Zona de controles inferior
         self.cometa.progress = 0.35  # Progreso demo
+        self.cometa.seek_requested.connect(self._on_cometa_seek)
         self.scene.addItem(self.cometa)
+        # Seek por IPC al mpv conectado con attach_mpv() (ver seek.py)
+        self.seeker = SeekController(self)
+
+    def attach_mpv(self, socket_path):
+        """Conecta el cometa a un mpv (--input-ipc-server): progreso real y seek."""
+        self.anim_cometa_progress.stop()
+        self.seeker.attach(socket_path)
+        self.seeker.ipc.property_changed.connect(self._on_mpv_property)
+        self.seeker.ipc.observe('percent-pos')
+
+    def _on_mpv_property(self, name, value):
+        if not isinstance(value, (int, float)):
+            return
+        if name == 'duration':
+            self.cometa.duration = value
+        elif name == 'percent-pos' and not self.cometa.dragging:
+            self.cometa.progress = value / 100
+
+    def _on_cometa_seek(self, fraction, final):
+        # Un seek manual reemplaza la animación demo del progreso
+        if self.anim_cometa_progress.state() == QPropertyAnimation.Running:
+            self.anim_cometa_progress.stop()
+        self.seeker.request(fraction, final)
 
     def crear_planta_inferior(self):
         """Planta bioluminiscente animada en la parte inferior."""
@@ -1274,12 +1429,25 @@ class ResonanciaEterica(QGraphicsView):
         self.anim_cometa_progress.setLoopCount(-1)
         self.anim_cometa_progress.start()
 
+        # Sin padre Qt (son de los ítems): lista para pausarlas/avanzarlas (bench)
+        self.animaciones = [
+            self.anim_flor_escala, self.anim_flor_brillo, self.anim_flor_rot,
+            self.anim_rama, self.anim_twinkle, self.anim_estrella, self.anim_planta,
+            self.anim_planta_glow, self.anim_cometa_trail, self.anim_cometa_progress,
+        ]
+
     def mousePressEvent(self, event):
+        if self.itemAt(event.pos()) is self.cometa:
+            super().mousePressEvent(event)  # Seek en el cometa
+            return
         if event.button() == Qt.LeftButton:
             self.drag_pos = event.globalPos() - self.frameGeometry().topLeft()
             event.accept()
 
     def mouseMoveEvent(self, event):
+        if self.cometa.dragging:
+            super().mouseMoveEvent(event)
+            return
         if event.buttons() == Qt.LeftButton and hasattr(self, 'drag_pos'):
             self.move(event.globalPos() - self.drag_pos)
             event.accept()
@@ -1297,5 +1465,8 @@ class ResonanciaEterica(QGraphicsView):
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     ventana = ResonanciaEterica()
+    # --mpv-socket RUTA: controlar un mpv lanzado con --input-ipc-server=RUTA
+    if '--mpv-socket' in sys.argv[1:-1]:
+        ventana.attach_mpv(sys.argv[sys.argv.index('--mpv-socket') + 1])
     ventana.show()
     sys.exit(app.exec_())
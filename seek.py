@@ -0,0 +1,149 @@
+"""
+Seek en la canción que suena, por IPC de mpv.
+
+- Durante un arrastre los pedidos se agrupan: solo se envía el último
+  destino tras SEEK_DEBOUNCE_MS sin movimiento, o de inmediato al soltar.
+- Mientras se arrastra se usa 'absolute+keyframes' (salta al keyframe más
+  cercano, sin decodificar de más); al soltar, 'absolute' (preciso).
+- Con demuxer-seekable-cache (ver mpv_profiles.py) un destino dentro de la
+  caché del demuxer se sirve de memoria; si no, mpv pide el rango al proxy
+  local (ver stream_proxy.py), que lo sirve de disco si ya lo bajó.
+
+Latencia seek → audio: desde el envío hasta el evento playback-restart
+de mpv. Se informa si el destino estaba en la caché del demuxer.
+"""
+
+import time
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QProgressBar
+from mpv_ipc import MpvIpc
+
+SEEK_DEBOUNCE_MS = 120
+
+
+class SeekController(QObject):
+    """Envía seeks al mpv que suena y mide cuánto tarda en volver el audio."""
+
+    seeked = pyqtSignal(float, float, bool)   # destino (s), latencia (ms), desde caché
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ipc = None
+        self.duration = None
+        self.pending = None       # (segundos, final) a enviar
+        self.in_flight = None     # {'target', 'sent_at', 'cached'}
+        self.latencies = []
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(SEEK_DEBOUNCE_MS)
+        self.debounce.timeout.connect(self._send)
+
+    def attach(self, socket_path):
+        self.detach()
+        self.ipc = MpvIpc(socket_path, self)
+        self.ipc.property_changed.connect(self._on_property)
+        self.ipc.event_received.connect(self._on_event)
+        self.ipc.observe('duration')
+
+    def detach(self):
+        self.debounce.stop()
+        if self.ipc:
+            self.ipc.close()
+            self.ipc = None
+        self.duration = None
+        self.pending = None
+        self.in_flight = None
+
+    def request(self, fraction, final=True):
+        """Seek a una fracción (0-1) de la canción. final=False durante un arrastre."""
+        if not self.ipc or not self.duration:
+            return False
+        target = max(0.0, min(1.0, fraction)) * self.duration
+        self.pending = (target, final)
+        if final:
+            self.debounce.stop()
+            self._send()
+        else:
+            self.debounce.start()
+        return True
+
+    def _send(self):
+        if not self.pending or not self.ipc:
+            return
+        target, final = self.pending
+        self.pending = None
+        seek = {'target': target, 'sent_at': time.time(), 'cached': None}
+        self.in_flight = seek
+
+        def on_cache_state(error, data):
+            if error or not isinstance(data, dict):
+                return
+            seek['cached'] = any(r.get('start', 0) <= target <= r.get('end', 0)
+                                 for r in data.get('seekable-ranges', []))
+
+        # La respuesta llega antes que playback-restart (mismo socket, en orden)
+        self.ipc.get_property('demuxer-cache-state', on_cache_state)
+        self.ipc.command('seek', target, 'absolute' if final else 'absolute+keyframes')
+
+    def _on_property(self, name, value):
+        if name == 'duration' and isinstance(value, (int, float)) and value > 0:
+            self.duration = value
+
+    def _on_event(self, event, _message):
+        if event != 'playback-restart' or not self.in_flight:
+            return
+        seek, self.in_flight = self.in_flight, None
+        latency_ms = (time.time() - seek['sent_at']) * 1000
+        self.latencies.append(latency_ms)
+        cached = bool(seek['cached'])
+        minutes, seconds = divmod(int(seek['target']), 60)
+        print(f"[SEEK] → {minutes}:{seconds:02d} audio en {latency_ms:.0f}ms "
+              f"({'caché del demuxer' if cached else 'proxy/red'})", flush=True)
+        self.seeked.emit(seek['target'], latency_ms, cached)
+
+    def summary(self):
+        if not self.latencies:
+            return "sin seeks"
+        ordered = sorted(self.latencies)
+        return (f"{len(ordered)} seeks, mediana {ordered[len(ordered) // 2]:.0f}ms, "
+                f"máx {ordered[-1]:.0f}ms")
+
+
+class SeekBar(QProgressBar):
+    """QProgressBar que se puede tocar/arrastrar para hacer seek."""
+
+    seek_requested = pyqtSignal(float, bool)   # fracción, final (al soltar)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.dragging = False
+        self.setCursor(Qt.PointingHandCursor)
+
+    def _fraction(self, event):
+        return max(0.0, min(1.0, event.pos().x() / max(1, self.width())))
+
+    def _preview(self, fraction):
+        if self.maximum() > self.minimum():
+            self.setValue(int(self.minimum() + fraction * (self.maximum() - self.minimum())))
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton or self.maximum() <= self.minimum():
+            return super().mousePressEvent(event)
+        self.dragging = True
+        fraction = self._fraction(event)
+        self._preview(fraction)
+        self.seek_requested.emit(fraction, False)
+
+    def mouseMoveEvent(self, event):
+        if not self.dragging:
+            return super().mouseMoveEvent(event)
+        fraction = self._fraction(event)
+        self._preview(fraction)
+        self.seek_requested.emit(fraction, False)
+
+    def mouseReleaseEvent(self, event):
+        if not self.dragging:
+            return super().mouseReleaseEvent(event)
+        self.dragging = False
+        self.seek_requested.emit(self._fraction(event), True)
@@ -0,0 +1,144 @@
+"""
+Máquina de estados de los slots de reproducción, con métricas.
+
+Estados y transiciones legales:
+
+  free ──► prefetching ──► buffering ──► ready ──► playing ──► fading
+   ▲            │              │  └─────────────────►│           │
+   └────────────┴──────────────┴─────────────────────┴───────────┘
+                          (cleanup: siempre a free)
+
+Cada cambio guarda timestamp y duración del estado anterior. Un slot
+que llegó a buffering/ready y vuelve a free sin pasar por playing es un
+prefetch desperdiciado (URL resuelta y audio descargado sin sonar).
+Un slot que vuelve a free desde prefetching porque su URL la usó una
+reproducción que lo estaba esperando (used=True) cuenta como acierto.
+"""
+
+import time
+
+FREE = 'free'
+PREFETCHING = 'prefetching'
+BUFFERING = 'buffering'
+READY = 'ready'
+PLAYING = 'playing'
+FADING = 'fading'
+
+STATES = [FREE, PREFETCHING, BUFFERING, READY, PLAYING, FADING]
+
+TRANSITIONS = {
+    FREE: {PREFETCHING},
+    PREFETCHING: {BUFFERING, FREE},
+    BUFFERING: {READY, PLAYING, FREE},
+    READY: {PLAYING, FREE},
+    PLAYING: {FADING, FREE},
+    FADING: {FREE},
+}
+
+
+class SlotMetrics:
+    """Contadores compartidos por todos los slots."""
+
+    def __init__(self):
+        self.transitions = {}         # {(de, a): cantidad}
+        self.illegal = []             # [(slot_id, de, a, motivo)]
+        self.time_in_state = {state: 0.0 for state in STATES}
+        self.prefetches = 0           # free → prefetching
+        self.played = 0               # buffering/ready → playing
+        self.played_buffering = 0     # ... de esos, promovidos sin estar ready
+        self.wasted = 0               # buffering/ready → free sin sonar
+        self.abandoned = 0            # prefetching → free (resolución descartada)
+        self.url_hits = 0             # prefetching → free, URL usada por la reproducción
+        self.waits = 0                # Reproducción que esperó un prefetch en curso
+        self.ready_times = []         # Segundos de buffering → ready
+
+    def record(self, slot_id, old, new, elapsed, reason, used=False):
+        self.transitions[(old, new)] = self.transitions.get((old, new), 0) + 1
+        self.time_in_state[old] += elapsed
+        if new == PREFETCHING:
+            self.prefetches += 1
+        elif new == PLAYING:
+            self.played += 1
+            if old == BUFFERING:
+                self.played_buffering += 1
+        elif new == READY:
+            self.ready_times.append(elapsed)
+        elif new == FREE and old in (BUFFERING, READY):
+            self.wasted += 1
+            print(f"[SLOT] Prefetch desperdiciado en slot {slot_id} ({old}, {reason})",
+                  flush=True)
+        elif new == FREE and old == PREFETCHING and used:
+            self.url_hits += 1
+        elif new == FREE and old == PREFETCHING:
+            self.abandoned += 1
+
+    def hit_rate(self):
+        """Fracción de slots precargados que terminaron sonando."""
+        hits = self.played + self.url_hits
+        total = hits + self.wasted
+        return hits / total if total else None
+
+    def summary(self):
+        rate = self.hit_rate()
+        rate_str = f"{rate * 100:.0f}%" if rate is not None else "-"
+        return (f"aciertos {rate_str} ({self.played} usados, {self.url_hits} por URL, "
+                f"{self.wasted} desperdiciados, "
+                f"{self.abandoned} abandonados de {self.prefetches}, {self.waits} esperas)")
+
+    def dump(self, slots=()):
+        """Texto multilínea para depuración."""
+        lines = ["=== Slots ===", self.summary()]
+        if self.ready_times:
+            avg = sum(self.ready_times) / len(self.ready_times)
+            lines.append(f"buffering→ready: promedio {avg:.1f}s, máx {max(self.ready_times):.1f}s "
+                         f"({len(self.ready_times)}); promovidos sin ready: {self.played_buffering}")
+        lines.append("tiempo por estado: " + ", ".join(
+            f"{state} {seconds:.0f}s" for state, seconds in self.time_in_state.items() if seconds))
+        lines.append("transiciones: " + ", ".join(
+            f"{old}→{new} {count}" for (old, new), count in sorted(self.transitions.items())))
+        if self.illegal:
+            lines.append(f"ilegales: {len(self.illegal)} (última {self.illegal[-1]})")
+        for slot in slots:
+            lines.append(f"  {slot.machine.describe()}")
+        return '\n'.join(lines)
+
+
+class SlotStateMachine:
+    """Estado de un slot. Solo cambia por transition()."""
+
+    def __init__(self, slot_id, metrics):
+        self.slot_id = slot_id
+        self.metrics = metrics
+        self.state = FREE
+        self.entered_at = time.time()
+        self.history = []             # [(timestamp, de, a, motivo)] últimas transiciones
+
+    def transition(self, new, reason='', used=False):
+        """Cambia de estado si es legal. Retorna False (y lo registra) si no.
+
+        used: vuelve a free porque el resultado del prefetch se usó.
+        """
+        old = self.state
+        if new == old:
+            return True
+        # Volver a free es siempre legal (cleanup)
+        if new != FREE and new not in TRANSITIONS[old]:
+            print(f"[SLOT] Transición ilegal en slot {self.slot_id}: {old} → {new} ({reason})",
+                  flush=True)
+            self.metrics.illegal.append((self.slot_id, old, new, reason))
+            return False
+        now = time.time()
+        self.metrics.record(self.slot_id, old, new, now - self.entered_at, reason, used)
+        self.history.append((now, old, new, reason))
+        del self.history[:-20]
+        self.state = new
+        self.entered_at = now
+        return True
+
+    def time_in_state(self):
+        return time.time() - self.entered_at
+
+    def describe(self):
+        last = self.history[-1] if self.history else None
+        reason = f", último: {last[1]}→{last[2]} {last[3]}" if last else ""
+        return f"slot {self.slot_id}: {self.state} hace {self.time_in_state():.1f}s{reason}"
@@ -0,0 +1,133 @@
+"""
+Resolución especulativa de resultados de búsqueda.
+
+La mayoría de las reproducciones salen de un resultado de búsqueda, no de
+la cola. Tras una búsqueda (y cada vez que se mueve la selección) se
+resuelven por adelantado el resultado resaltado y los primeros
+SPECULATE_TOP_N, para que R encuentre la URL en cache.
+
+Límites:
+  - un solo yt-dlp especulativo a la vez (batch, sin estrategias en carrera),
+  - como mucho SPECULATE_MAX_PER_MIN links resueltos por minuto,
+  - la selección se estabiliza SPECULATE_DEBOUNCE_MS antes de lanzar nada,
+  - si la selección sale del batch en curso, se cancela.
+"""
+
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+SPECULATE_TOP_N = 3
+SPECULATE_BATCH_LINKS = 3
+SPECULATE_MAX_PER_MIN = 9
+SPECULATE_DEBOUNCE_MS = 400
+
+
+class SpeculativeResolver(QObject):
+    """Resuelve candidatos probables. is_known(link) evita repetir trabajo."""
+
+    media_ready = pyqtSignal(str, object)   # link, media (strategy='speculative')
+    wanted = pyqtSignal()                   # hay candidatos: pedir turno al planificador
+
+    def __init__(self, resolver, is_known, parent=None):
+        super().__init__(parent)
+        self.resolver = resolver
+        self.is_known = is_known
+        self.highlighted = None
+        self.top_links = []
+        self.job = None
+        self.job_links = []
+        self.failed = set()       # Links que el batch no pudo resolver
+        self.launched = []        # Timestamps por link lanzado (presupuesto)
+        self.paused = False
+        self.resolved = 0
+        self.cancelled = 0
+        self.hits = 0
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(SPECULATE_DEBOUNCE_MS)
+        self.debounce.timeout.connect(self.wanted.emit)
+
+    def set_results(self, links):
+        """Nueva búsqueda: candidatos los primeros resultados."""
+        self.top_links = [link for link in links[:SPECULATE_TOP_N] if link]
+        self.highlighted = None
+        self.failed.clear()
+        self.debounce.start()
+
+    def set_highlighted(self, link):
+        """Cambió la selección en la lista de resultados."""
+        if link == self.highlighted:
+            return
+        self.highlighted = link
+        self.debounce.start()
+
+    def _candidates(self):
+        ordered = []
+        for link in [self.highlighted] + self.top_links:
+            if link and link not in ordered and link not in self.failed and not self.is_known(link):
+                ordered.append(link)
+        return ordered
+
+    def run(self):
+        """Lanza (o redirige) la resolución especulativa. Llamado por el planificador."""
+        if self.paused:
+            return
+        candidates = self._candidates()
+        if not candidates:
+            return
+
+        if self.job:
+            if candidates[0] in self.job_links:
+                return  # El batch en curso ya cubre lo más probable
+            print(f"[SPEC] Selección cambió, cancelando batch de {len(self.job_links)}", flush=True)
+            self.job.cancel()
+            self.job = None
+            self.cancelled += 1
+
+        now = time.time()
+        self.launched = [t for t in self.launched if now - t < 60]
+        available = SPECULATE_MAX_PER_MIN - len(self.launched)
+        if available <= 0:
+            # Sin presupuesto: reintentar cuando venza el más viejo
+            QTimer.singleShot(int((60 - (now - self.launched[0])) * 1000) + 100, self.wanted.emit)
+            return
+
+        self.job_links = candidates[:min(SPECULATE_BATCH_LINKS, available)]
+        self.launched += [now] * len(self.job_links)
+        self.job = self.resolver.resolve_batch(self.job_links)
+        self.job.media_ready.connect(self._on_media)
+        self.job.finished.connect(self._on_finished)
+        print(f"[SPEC] Resolviendo {len(self.job_links)} candidatos", flush=True)
+
+    def _on_media(self, link, media):
+        self.resolved += 1
+        self.media_ready.emit(link, dict(media, strategy='speculative'))
+
+    def _on_finished(self, _resolved):
+        for link in self.job_links:
+            if not self.is_known(link):
+                self.failed.add(link)
+        self.job = None
+        self.job_links = []
+        # Quedan candidatos (p.ej. la selección se movió mientras corría)
+        if self._candidates():
+            self.wanted.emit()
+
+    def set_paused(self, paused):
+        self.paused = paused
+        if self.job:
+            self.job.set_paused(paused)
+        elif not paused and self._candidates():
+            self.wanted.emit()
+
+    def cancel(self):
+        self.debounce.stop()
+        if self.job:
+            self.job.cancel()
+            self.job = None
+            self.job_links = []
+
+    def summary(self):
+        return (f"{self.resolved} resueltos, {self.hits} aciertos, "
+                f"{self.cancelled} cancelados")
@@ -0,0 +1,497 @@
+"""
+Proxy HTTP local con caché de rangos en disco para las URLs de googlevideo.
+
+mpv reproduce http://127.0.0.1:PUERTO/<clave> en vez de la URL directa.
+La clave es video id + formato, así que:
+  - dos slots del mismo video comparten los bytes ya bajados,
+  - seek, reinicio y repetición se sirven del disco sin volver a la red,
+  - una URL re-resuelta (vencida) reemplaza a la anterior sin perder caché.
+
+Cada clave tiene un archivo disperso (<clave>.bin, escrito con pwrite en
+su offset real) y un <clave>.json con el tamaño total y los rangos
+[inicio, fin) presentes. Lo que falta se pide a upstream en segmentos de
+UPSTREAM_CHUNK_BYTES (Range: bytes=a-b) por conexiones keep-alive
+reutilizadas por host; cada segmento se escribe en caché y se envía al
+cliente a medida que llega.
+
+El tamaño total hace falta antes de responder (Content-Length). Sale del
+parámetro clen de googlevideo; si la URL no lo trae, de un pedido
+bytes=0-0 (un viaje de ida y vuelta, sin esperar ningún segmento).
+
+Corre en hilos propios (ThreadingHTTPServer), sin Qt: se puede probar
+contra un servidor HTTP local cualquiera.
+"""
+
+import os
+import re
+import json
+import threading
+import http.client
+import http.server
+from urllib.parse import urlparse, urljoin, parse_qs
+
+PROXY_CACHE_DIR = os.path.expanduser('~/.cache/ytplayer/ranges')
+# Espacio máximo de la caché de rangos (se borra lo menos usado)
+PROXY_CACHE_MAX_MB = 200
+# Tamaño de cada pedido a upstream (googlevideo limita los pedidos grandes)
+UPSTREAM_CHUNK_BYTES = 2 * 1024 * 1024
+UPSTREAM_TIMEOUT_S = 15
+UPSTREAM_MAX_IDLE = 4             # Conexiones keep-alive guardadas por host
+UPSTREAM_MAX_REDIRECTS = 3
+CLIENT_BLOCK_BYTES = 64 * 1024
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0'
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class RangeSet:
+    """Intervalos [inicio, fin) presentes, ordenados y sin solapes."""
+
+    def __init__(self, ranges=()):
+        self.ranges = []
+        for start, end in ranges:
+            self.add(start, end)
+
+    def add(self, start, end):
+        if end <= start:
+            return
+        merged = []
+        for s, e in self.ranges:
+            if e < start or s > end:
+                merged.append((s, e))
+            else:
+                start, end = min(s, start), max(e, end)
+        merged.append((start, end))
+        self.ranges = sorted(merged)
+
+    def covered_until(self, pos):
+        """Fin del rango que contiene pos, o None si pos no está en caché."""
+        for start, end in self.ranges:
+            if start <= pos < end:
+                return end
+        return None
+
+    def next_start(self, pos):
+        """Inicio del próximo rango después de pos, o None."""
+        for start, _ in self.ranges:
+            if start > pos:
+                return start
+        return None
+
+    def total(self):
+        return sum(end - start for start, end in self.ranges)
+
+
+class CacheEntry:
+    """Archivo disperso de una clave y su mapa de rangos."""
+
+    def __init__(self, cache_dir, key):
+        self.key = key
+        self.data_path = os.path.join(cache_dir, f'{key}.bin')
+        self.meta_path = os.path.join(cache_dir, f'{key}.json')
+        self.size = None
+        self.content_type = 'application/octet-stream'
+        self.ranges = RangeSet()
+        self.lock = threading.Lock()        # Mapa de rangos y metadatos
+        self.fetch_lock = threading.Lock()  # Un solo pedido upstream a la vez
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not os.path.exists(self.data_path):
+            return
+        self.size = meta.get('size')
+        self.content_type = meta.get('content_type') or self.content_type
+        self.ranges = RangeSet(tuple(r) for r in meta.get('ranges', []))
+
+    def _save(self):
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'size': self.size, 'content_type': self.content_type,
+                       'ranges': self.ranges.ranges}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def covered_until(self, pos):
+        with self.lock:
+            return self.ranges.covered_until(pos)
+
+    def next_start(self, pos):
+        with self.lock:
+            return self.ranges.next_start(pos)
+
+    def read(self, start, length):
+        fd = os.open(self.data_path, os.O_RDONLY)
+        try:
+            return os.pread(fd, length, start)
+        finally:
+            os.close(fd)
+
+    def write(self, start, data):
+        fd = os.open(self.data_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, data, start)
+        finally:
+            os.close(fd)
+        with self.lock:
+            self.ranges.add(start, start + len(data))
+
+    def commit(self):
+        """Guarda el mapa de rangos (al terminar cada segmento)."""
+        with self.lock:
+            try:
+                self._save()
+            except OSError as e:
+                print(f"[PROXY] No se pudo guardar {self.key}: {e}", flush=True)
+
+
+class UpstreamPool:
+    """Conexiones HTTP(S) keep-alive reutilizadas por host."""
+
+    def __init__(self):
+        self._idle = {}           # {(esquema, host): [conexión]}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def _take(self, origin):
+        with self._lock:
+            idle = self._idle.get(origin)
+            if idle:
+                self.reused += 1
+                return idle.pop()
+        scheme, host = origin
+        self.opened += 1
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return cls(host, timeout=UPSTREAM_TIMEOUT_S)
+
+    def give_back(self, origin, conn, response):
+        """Devuelve la conexión si quedó reutilizable."""
+        if response.will_close or not response.isclosed():
+            conn.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < UPSTREAM_MAX_IDLE:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def get_range(self, url, start, end):
+        """GET bytes [start, end). Retorna (origen, conexión, respuesta, url final)."""
+        for _ in range(UPSTREAM_MAX_REDIRECTS + 1):
+            parsed = urlparse(url)
+            origin = (parsed.scheme, parsed.netloc)
+            target = parsed.path + (f'?{parsed.query}' if parsed.query else '')
+            headers = {'Range': f'bytes={start}-{end - 1}', 'User-Agent': USER_AGENT}
+            for attempt in range(2):
+                conn = self._take(origin)
+                try:
+                    conn.request('GET', target, headers=headers)
+                    response = conn.getresponse()
+                    break
+                except (http.client.HTTPException, OSError):
+                    conn.close()
+                    if attempt:
+                        raise
+                    # Keep-alive vencido del lado del servidor: probar con una nueva
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.getheader('Location')
+                response.read()
+                self.give_back(origin, conn, response)
+                url = urljoin(url, location)
+                continue
+            return origin, conn, response, url
+        raise UpstreamError('demasiadas redirecciones')
+
+    def close_all(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+
+def parse_range(header, size):
+    """'bytes=a-b' → (inicio, fin exclusivo). None si no es satisfacible."""
+    match = re.match(r'bytes=(\d*)-(\d*)$', (header or '').strip())
+    if not match:
+        return 0, size
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        return max(0, size - int(last)), size   # Sufijo: últimos N bytes
+    start = int(first)
+    end = min(size, int(last) + 1) if last else size
+    if start >= size or end <= start:
+        return None
+    return start, end
+
+
+def url_size_hint(url):
+    """(tamaño exacto, tipo) según la URL de googlevideo (clen, mime)."""
+    query = parse_qs(urlparse(url).query)
+    try:
+        size = int(query['clen'][0])
+    except (KeyError, ValueError, IndexError):
+        size = None
+    return size, query.get('mime', [None])[0]
+
+
+def content_range_total(header):
+    match = re.search(r'/(\d+)\s*$', header or '')
+    return int(match.group(1)) if match else None
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    proxy = None                  # StreamProxy (asignado por subclase)
+
+    def do_GET(self):
+        self.proxy.serve(self, head=False)
+
+    def do_HEAD(self):
+        self.proxy.serve(self, head=True)
+
+    def log_message(self, *_):
+        pass                      # Sin log por pedido (mpv pide muchos rangos)
+
+
+class StreamProxy:
+    """Servidor local; register() devuelve la URL local para mpv."""
+
+    def __init__(self, cache_dir=PROXY_CACHE_DIR, max_mb=PROXY_CACHE_MAX_MB, port=0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024 * 1024
+        os.makedirs(cache_dir, exist_ok=True)
+        self.upstream = UpstreamPool()
+        self.urls = {}            # {clave: URL upstream vigente}
+        self.entries = {}         # {clave: CacheEntry}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.upstream_requests = 0
+        self.bytes_cached = 0     # Servidos desde disco
+        self.bytes_upstream = 0   # Bajados de la red
+
+        handler = type('Handler', (_Handler,), {'proxy': self})
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       name='stream-proxy', daemon=True)
+        self.thread.start()
+        print(f"[PROXY] Escuchando en 127.0.0.1:{self.port}", flush=True)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.upstream.close_all()
+
+    def register(self, key, url):
+        """Asocia la clave a su URL upstream y retorna la URL local."""
+        key = re.sub(r'[^\w.-]', '_', key)
+        with self.lock:
+            self.urls[key] = url
+        self._evict()
+        return f'http://127.0.0.1:{self.port}/{key}'
+
+    def cached_bytes(self, key):
+        entry = self._entry(re.sub(r'[^\w.-]', '_', key), create=False)
+        return entry.ranges.total() if entry else 0
+
+    def summary(self):
+        total = self.bytes_cached + self.bytes_upstream
+        ratio = f"{self.bytes_cached * 100 / total:.0f}%" if total else "-"
+        return (f"{self.requests} pedidos, {self.bytes_upstream / 1024:.0f}KB de red, "
+                f"{self.bytes_cached / 1024:.0f}KB de caché ({ratio}), "
+                f"{self.upstream_requests} pedidos upstream, "
+                f"conexiones {self.upstream.opened} nuevas/{self.upstream.reused} reusadas")
+
+    # --- Caché ---
+
+    def _entry(self, key, create=True):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None and (create or os.path.exists(os.path.join(self.cache_dir,
+                                                                       f'{key}.json'))):
+                entry = self.entries[key] = CacheEntry(self.cache_dir, key)
+            return entry
+
+    def _evict(self):
+        """Borra las claves menos usadas (por mtime) si se pasa del máximo."""
+        try:
+            files = [entry for entry in os.scandir(self.cache_dir)
+                     if entry.name.endswith('.bin')]
+        except OSError:
+            return
+        # st_blocks: espacio real del archivo disperso
+        used = sum(f.stat().st_blocks * 512 for f in files)
+        if used <= self.max_bytes:
+            return
+        with self.lock:
+            active = set(self.urls)
+        for f in sorted(files, key=lambda f: f.stat().st_mtime):
+            key = f.name[:-len('.bin')]
+            if key in active:
+                continue
+            used -= f.stat().st_blocks * 512
+            for path in (f.path, os.path.join(self.cache_dir, f'{key}.json')):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            with self.lock:
+                self.entries.pop(key, None)
+            print(f"[PROXY] Caché llena, borrado {key}", flush=True)
+            if used <= self.max_bytes:
+                break
+
+    # --- Servir ---
+
+    def serve(self, handler, head):
+        key = handler.path.lstrip('/').split('?')[0]
+        with self.lock:
+            url = self.urls.get(key)
+            self.requests += 1
+        if not url:
+            handler.send_error(404)
+            return
+        entry = self._entry(key)
+        try:
+            if entry.size is None:
+                self._learn_size(entry, url)
+            byte_range = parse_range(handler.headers.get('Range'), entry.size)
+            if byte_range is None:
+                handler.send_response(416)
+                handler.send_header('Content-Range', f'bytes */{entry.size}')
+                handler.send_header('Content-Length', '0')
+                handler.end_headers()
+                return
+            start, end = byte_range
+            partial = handler.headers.get('Range') is not None
+            handler.send_response(206 if partial else 200)
+            handler.send_header('Content-Type', entry.content_type)
+            handler.send_header('Accept-Ranges', 'bytes')
+            handler.send_header('Content-Length', str(end - start))
+            if partial:
+                handler.send_header('Content-Range', f'bytes {start}-{end - 1}/{entry.size}')
+            handler.end_headers()
+            if not head:
+                self._stream(entry, url, start, end, handler.wfile)
+        except (BrokenPipeError, ConnectionResetError):
+            pass                  # mpv cerró (seek o fin): normal
+        except (UpstreamError, http.client.HTTPException, OSError) as e:
+            print(f"[PROXY] {key}: {e}", flush=True)
+            handler.close_connection = True
+            if entry.size is None:
+                try:
+                    handler.send_error(502)
+                except OSError:
+                    pass
+
+    def _learn_size(self, entry, url):
+        """Fija entry.size sin bajar un segmento entero antes de responder."""
+        with entry.fetch_lock:
+            if entry.size is not None:
+                return
+            size, mime = url_size_hint(url)
+            if size:
+                entry.size = size
+                entry.content_type = mime or entry.content_type
+                return
+            origin, conn, response, _ = self.upstream.get_range(url, 0, 1)
+            self.upstream_requests += 1
+            if response.status == 200:
+                conn.close()      # Ignoró el Range: no bajar el archivo entero
+            else:
+                response.read()
+                self.upstream.give_back(origin, conn, response)
+            if response.status == 206:
+                total = content_range_total(response.getheader('Content-Range'))
+            elif response.status == 200:
+                total = int(response.getheader('Content-Length') or 0) or None
+            else:
+                raise UpstreamError(f'upstream HTTP {response.status}')
+            if total is None:
+                raise UpstreamError('upstream sin tamaño total')
+            entry.size = total
+            entry.content_type = response.getheader('Content-Type') or entry.content_type
+
+    def _stream(self, entry, url, start, end, out):
+        pos = start
+        while pos < end:
+            cached_end = entry.covered_until(pos)
+            if cached_end:
+                stop = min(cached_end, end)
+                while pos < stop:
+                    data = entry.read(pos, min(CLIENT_BLOCK_BYTES, stop - pos))
+                    if not data:
+                        raise OSError(f'caché corta en {pos}')
+                    out.write(data)
+                    pos += len(data)
+                    self.bytes_cached += len(data)
+                continue
+            reached = self._fetch_segment(entry, url, pos, end, out)
+            if reached == pos and not entry.covered_until(pos):
+                raise UpstreamError(f'upstream sin datos en {pos}')
+            pos = reached
+
+    def _fetch_segment(self, entry, url, pos, end, out):
+        """Baja un segmento desde pos; lo escribe en caché y (si hay) al cliente.
+
+        Retorna la posición alcanzada. Si el cliente corta, igual termina
+        el segmento para dejarlo en caché y la conexión reutilizable.
+        """
+        with entry.fetch_lock:
+            if entry.size is not None and entry.covered_until(pos):
+                return pos        # Otro lector lo bajó mientras esperábamos
+            seg_end = pos + UPSTREAM_CHUNK_BYTES
+            next_cached = entry.next_start(pos)
+            if next_cached is not None:
+                seg_end = min(seg_end, next_cached)
+            if entry.size is not None:
+                seg_end = min(seg_end, entry.size)
+
+            origin, conn, response, _ = self.upstream.get_range(url, pos, seg_end)
+            self.upstream_requests += 1
+            if response.status not in (200, 206) or (response.status == 200 and pos):
+                response.read()
+                self.upstream.give_back(origin, conn, response)
+                raise UpstreamError(f'upstream HTTP {response.status}')
+            if entry.size is None:
+                total = content_range_total(response.getheader('Content-Range'))
+                if response.status == 200:
+                    total = int(response.getheader('Content-Length') or 0) or None
+                if total is None:
+                    raise UpstreamError('upstream sin tamaño total')
+                entry.size = total
+                entry.content_type = response.getheader('Content-Type') or entry.content_type
+
+            client_ok = out is not None
+            limit = end if end is not None else seg_end
+            while True:
+                data = response.read(CLIENT_BLOCK_BYTES)
+                if not data:
+                    break
+                entry.write(pos, data)
+                self.bytes_upstream += len(data)
+                if client_ok and pos < limit:
+                    try:
+                        out.write(data[:limit - pos])
+                    except (BrokenPipeError, ConnectionResetError):
+                        client_ok = False
+                pos += len(data)
+            self.upstream.give_back(origin, conn, response)
+            entry.commit()
+            if out is not None and not client_ok:
+                raise BrokenPipeError()
+            return pos
@@ -0,0 +1,257 @@
+"""
+Estilos de la ventana: una hoja aplicada una sola vez y estados por propiedad.
+
+Antes cada cambio de estado llamaba status_label.setStyleSheet(...), lo
+que obliga a Qt a parsear una hoja nueva y repulir el widget. Ahora los
+colores viven en APP_STYLESHEET como reglas QLabel#status[state="..."] y
+un cambio de estado es setProperty + unpolish/polish del label, contra
+reglas ya parseadas. StyleStates mide cuánto cuesta cada cambio
+(YTPLAYER_STYLE_PROPERTIES=0 vuelve a setStyleSheet para comparar).
+
+En linuxfb no hay aceleración y cada repintado de un qlineargradient se
+rasteriza en CPU. GradientSkin reemplaza esos fondos por un PNG generado
+al tamaño real del widget (con borde y esquinas redondeadas), cacheado
+en ~/.cache/ytplayer/skin y dibujado con border-image 1:1. El chunk de
+la barra de progreso cambia de ancho a cada segundo: ahí se usa el color
+plano del medio (GradientSkin.stylesheet).
+YTPLAYER_GRADIENT_PIXMAPS: auto (solo en linuxfb, por defecto), 1 o 0.
+"""
+
+import os
+import time
+import hashlib
+from PyQt5.QtCore import Qt, QObject, QEvent, QRectF
+from PyQt5.QtGui import (QGuiApplication, QPixmap, QPainter, QPainterPath,
+                         QLinearGradient, QColor, QPen)
+
+STYLE_PROPERTIES = os.environ.get('YTPLAYER_STYLE_PROPERTIES', '1') != '0'
+GRADIENT_PIXMAPS = os.environ.get('YTPLAYER_GRADIENT_PIXMAPS', 'auto')
+SKIN_DIR = os.path.expanduser('~/.cache/ytplayer/skin')
+
+# Estados de status_label: (color, padding)
+STATUS_STATES = {
+    'ready':   ('#6ba36e', '8px'),   # Pantalla inicial
+    'playing': ('#6ba36e', '0px'),
+    'waiting': ('#c9886a', '0px'),   # Cargando, esperando, avisos
+    'idle':    ('#8b7355', '0px'),   # Terminado o detenido
+}
+
+
+def _status_rules():
+    rules = ["QLabel#status { font-size: 18px; }"]
+    for state, (color, padding) in STATUS_STATES.items():
+        rules.append(f'QLabel#status[state="{state}"] {{ color: {color}; padding: {padding}; }}')
+    return '\n'.join(rules)
+
+
+# Anthroposophic/Waldorf color scheme - warm, natural, organic
+APP_STYLESHEET = """
+    QWidget {
+        background-color: #fdf6e3;
+        color: #5c4a3d;
+        font-family: 'Segoe UI', 'Ubuntu', sans-serif;
+    }
+    QLineEdit {
+        background-color: #fff8dc;
+        border: 4px solid #e8a87c;
+        border-radius: 25px;
+        padding: 12px 20px;
+        font-size: 22px;
+        color: #5c4a3d;
+    }
+    QLineEdit:focus {
+        border-color: #c38d6b;
+        background-color: #fffef5;
+    }
+    QListWidget {
+        background-color: #fff8dc;
+        border: 4px solid #d4a574;
+        border-radius: 25px;
+        padding: 12px;
+        font-size: 18px;
+    }
+    QListWidget::item {
+        padding: 14px;
+        border-radius: 18px;
+        margin: 4px;
+        background-color: #fef9e7;
+    }
+    QListWidget::item:selected {
+        background-color: #e8a87c;
+        color: #3d2914;
+    }
+    QListWidget::item:hover {
+        background-color: #f5deb3;
+    }
+    QPushButton {
+        border-radius: 25px;
+        padding: 15px 30px;
+        font-size: 20px;
+        font-weight: bold;
+        border: none;
+    }
+    QProgressBar {
+        border: 4px solid #d4a574;
+        border-radius: 15px;
+        text-align: center;
+        height: 28px;
+        background-color: #fff8dc;
+    }
+""" + _status_rules()
+
+
+class StyleStates:
+    """Cambia el estado visual de un widget y mide cuánto cuesta."""
+
+    def __init__(self, use_properties=STYLE_PROPERTIES):
+        self.use_properties = use_properties
+        self.changes = 0
+        self.unchanged = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def set(self, widget, state):
+        if widget.property('state') == state:
+            self.unchanged += 1
+            return
+        started = time.perf_counter()
+        widget.setProperty('state', state)
+        if self.use_properties:
+            style = widget.style()
+            style.unpolish(widget)
+            style.polish(widget)
+            widget.update()
+        else:
+            color, padding = STATUS_STATES[state]
+            widget.setStyleSheet(f"font-size: 18px; color: {color}; padding: {padding};")
+        elapsed = (time.perf_counter() - started) * 1000
+        self.changes += 1
+        self.total_ms += elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+
+    def summary(self):
+        if not self.changes:
+            return "sin cambios de estado"
+        mode = 'propiedades' if self.use_properties else 'setStyleSheet'
+        return (f"{self.changes} cambios ({mode}), media {self.total_ms / self.changes:.2f}ms, "
+                f"máx {self.max_ms:.2f}ms, {self.unchanged} sin cambio")
+
+
+class Gradient:
+    """Fondo degradado: se expresa como qlineargradient o como PNG."""
+
+    def __init__(self, stops, vertical=False, radius=0, border=0, border_color=None):
+        self.stops = stops              # [(posición, '#color'), ...]
+        self.vertical = vertical
+        self.radius = radius
+        self.border = border
+        self.border_color = border_color
+
+    def middle(self):
+        """Color del stop central (fondo plano equivalente)."""
+        return self.stops[len(self.stops) // 2][1]
+
+    def css(self, background=None):
+        if background is None:
+            x2, y2 = (0, 1) if self.vertical else (1, 0)
+            stops = ', '.join(f"stop:{pos:g} {color}" for pos, color in self.stops)
+            background = f"qlineargradient(x1:0, y1:0, x2:{x2}, y2:{y2}, {stops})"
+        rules = [f"background: {background};"]
+        if self.radius:
+            rules.append(f"border-radius: {self.radius}px;")
+        if self.border:
+            rules.append(f"border: {self.border}px solid {self.border_color};")
+        return '\n'.join(rules)
+
+    def key(self, width, height):
+        raw = repr((self.stops, self.vertical, self.radius, self.border,
+                    self.border_color, width, height))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+    def render(self, width, height):
+        pixmap = QPixmap(width, height)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        gradient = QLinearGradient(0, 0, 0 if self.vertical else width, height if self.vertical else 0)
+        for pos, color in self.stops:
+            gradient.setColorAt(pos, QColor(color))
+        inset = self.border / 2
+        rect = QRectF(inset, inset, width - self.border, height - self.border)
+        path = QPainterPath()
+        path.addRoundedRect(rect, self.radius, self.radius)
+        painter.fillPath(path, gradient)
+        if self.border:
+            painter.setPen(QPen(QColor(self.border_color), self.border))
+            painter.drawPath(path)
+        painter.end()
+        return pixmap
+
+
+# Relleno de la barra de progreso
+PROGRESS_CHUNK = Gradient([(0, '#e8a87c'), (0.5, '#c9a66b'), (1, '#85c88a')], radius=11)
+
+
+def gradient_pixmaps_enabled():
+    if GRADIENT_PIXMAPS in ('0', '1'):
+        return GRADIENT_PIXMAPS == '1'
+    return QGuiApplication.platformName() == 'linuxfb'
+
+
+class GradientSkin(QObject):
+    """Aplica fondos degradados como qlineargradient o como PNG cacheado."""
+
+    def __init__(self, enabled=None, parent=None):
+        super().__init__(parent)
+        self.enabled = gradient_pixmaps_enabled() if enabled is None else enabled
+        self.widgets = {}         # widget -> (css, Gradient, último tamaño)
+        self.rendered = 0
+        self.reused = 0
+        if self.enabled:
+            os.makedirs(SKIN_DIR, exist_ok=True)
+            print(f"[STYLE] Degradados como pixmaps ({QGuiApplication.platformName()})", flush=True)
+
+    def apply(self, widget, css, gradient):
+        """css: reglas del widget sin fondo, borde ni radio."""
+        if not self.enabled:
+            widget.setStyleSheet(css + '\n' + gradient.css())
+            return
+        # Hasta el primer resize, plano con el color del medio (mismas métricas)
+        widget.setStyleSheet(css + '\n' + gradient.css(background=gradient.middle()))
+        self.widgets[widget] = (css, gradient, None)
+        widget.installEventFilter(self)
+        widget.destroyed.connect(lambda _=None, w=widget: self.widgets.pop(w, None))
+
+    def stylesheet(self, base=APP_STYLESHEET):
+        """Hoja de la aplicación con el chunk de progreso en degradado o plano."""
+        background = PROGRESS_CHUNK.middle() if self.enabled else None
+        return base + f"\nQProgressBar::chunk {{ {PROGRESS_CHUNK.css(background=background)} }}"
+
+    def eventFilter(self, widget, event):
+        if event.type() == QEvent.Resize and widget in self.widgets:
+            self._skin(widget, event.size().width(), event.size().height())
+        return False
+
+    def _skin(self, widget, width, height):
+        css, gradient, last = self.widgets[widget]
+        if last == (width, height) or width <= 0 or height <= 0:
+            return
+        self.widgets[widget] = (css, gradient, (width, height))
+        path = os.path.join(SKIN_DIR, f"{gradient.key(width, height)}.png")
+        if os.path.exists(path):
+            self.reused += 1
+        else:
+            started = time.perf_counter()
+            gradient.render(width, height).save(path, 'PNG')
+            self.rendered += 1
+            print(f"[STYLE] Pixmap {width}x{height} en "
+                  f"{(time.perf_counter() - started) * 1000:.1f}ms", flush=True)
+        # Cortes = ancho del borde: el PNG cae 1:1 sobre el widget
+        b = gradient.border
+        widget.setStyleSheet(css + f"\nborder-image: url({path}) {b} {b} {b} {b} stretch stretch;"
+                                   f"\nborder-width: {b}px; border-style: solid;")
+
+    def summary(self):
+        if not self.enabled:
+            return "degradados qlineargradient"
+        return f"pixmaps: {self.rendered} generados, {self.reused} desde caché"
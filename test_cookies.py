@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Test de lectura y validación de cookies.txt (sin red)."""
+
+import os
+import time
+import tempfile
+from cookies import parse_cookie_file, assess, cookie_digest, COOKIE_WARN_DAYS
+
+
+def _write(lines):
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(fd, 'w') as f:
+        f.write('# Netscape HTTP Cookie File\n\n' + '\n'.join(lines) + '\n')
+    return path
+
+
+def _line(name, expires, domain='.youtube.com', http_only=False, value='x'):
+    prefix = '#HttpOnly_' if http_only else ''
+    return '\t'.join([prefix + domain, 'TRUE', '/', 'TRUE', str(int(expires)), name, value])
+
+
+def test_parse_and_states():
+    now = time.time()
+    path = _write([_line('SAPISID', now + 30 * 86400),
+                   _line('LOGIN_INFO', now + 60 * 86400, http_only=True),
+                   _line('NID', now + 86400, domain='.google.com')])
+    try:
+        cookies = parse_cookie_file(path)
+    finally:
+        os.remove(path)
+    assert [c['name'] for c in cookies] == ['SAPISID', 'LOGIN_INFO', 'NID']
+    assert assess(cookies, now)[0] == 'ok'
+    assert assess(cookies, now + (30 - COOKIE_WARN_DAYS + 1) * 86400)[0] == 'expiring'
+    assert assess(cookies, now + 31 * 86400)[0] == 'expired'
+    assert assess([c for c in cookies if c['name'] == 'NID'], now)[0] == 'missing'
+
+
+def test_digest_ignores_rewrite_order():
+    now = time.time()
+    lines = [_line('SAPISID', now + 86400), _line('SID', now + 86400)]
+    first, second = _write(lines), _write(list(reversed(lines)))
+    # yt-dlp rota SIDCC/YSC en cada corrida: no es un cambio de sesión
+    rotated = _write(lines + [_line('SIDCC', now + 86400, value='rotado')])
+    changed = _write([_line('SAPISID', now + 86400), _line('SID', now + 2 * 86400)])
+    paths = (first, second, rotated, changed)
+    try:
+        digests = [cookie_digest(parse_cookie_file(p)) for p in paths]
+    finally:
+        for path in paths:
+            os.remove(path)
+    assert digests[0] == digests[1] == digests[2]
+    assert digests[0] != digests[3]
+
+
+if __name__ == '__main__':
+    test_parse_and_states()
+    test_digest_ignores_rewrite_order()
+    print("OK")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Test de la entrada por botones físicos usando FakeEventSource (sin hardware)."""
+
+import sys
+import time
+from PyQt5.QtCore import QCoreApplication
+from hw_input import (ButtonInput, Debouncer, FakeEventSource, parse_key_bitmap,
+                      KEY_P, KEY_R, KEY_S, DEBOUNCE_MS)
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _collect(button_input, timeout=0.2):
+    """Procesa eventos Qt y retorna las acciones emitidas."""
+    received = []
+    button_input.action_triggered.connect(
+        lambda a, t: received.append((a, t, time.time())))
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return received
+
+
+def test_debouncer():
+    deb = Debouncer(window_ms=30)
+    assert deb.accept(KEY_S, 10.000)
+    assert not deb.accept(KEY_S, 10.010)   # Rebote
+    assert deb.accept(KEY_P, 10.011)       # Otro botón no se bloquea
+    assert deb.accept(KEY_S, 10.050)
+    assert deb.rejected == 1
+
+
+def test_fake_source_parses_events():
+    source = FakeEventSource()
+    source.press(KEY_S, timestamp=123.5)
+    events = source.read_events()
+    source.close()
+    assert events == [(KEY_S, 1, 123.5), (KEY_S, 0, 123.5)]
+
+
+def test_key_bitmap():
+    # Palabras de 32 bits (BeagleBone): KEY_S=31 en la primera, 33 en la segunda
+    assert parse_key_bitmap('2 80000000', word_bits=32) == {KEY_S, 33}
+    assert parse_key_bitmap('0') == set()
+
+
+def test_actions_and_latency():
+    source = FakeEventSource()
+    button_input = ButtonInput([source])
+
+    now = time.time()
+    source.press(KEY_S, now)
+    source.press(KEY_S, now + 0.005)                  # Rebote: descartado
+    source.press(KEY_P, now + 0.010)
+    source.press(KEY_R, now + DEBOUNCE_MS / 1000 + 0.020)
+
+    received = _collect(button_input)
+    button_input.close()
+
+    assert [a for a, _, _ in received] == ['next', 'stop', 'play']
+    # Despacho pulsación → señal (el objetivo total es < 50ms)
+    _, pressed_at, arrived_at = received[0]
+    dispatch_ms = (arrived_at - pressed_at) * 1000
+    print(f"Despacho: {dispatch_ms:.1f}ms")
+    assert dispatch_ms < 50
+
+
+if __name__ == '__main__':
+    test_debouncer()
+    test_fake_source_parses_events()
+    test_key_bitmap()
+    test_actions_and_latency()
+    print("OK")
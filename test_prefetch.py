@@ -6,6 +6,7 @@ import time
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QTimer
 from yt_mp_player_qt5 import BBBPlayer
+from formats import read_process_bytes
 
 # Video que funciona para testing (repetido para probar el sistema de slots)
 TEST_VIDEOS = [
@@ -17,6 +18,9 @@ TEST_VIDEOS = [
 
 start_time = None
 
+# Bytes máximos leídos por un slot warm (debe estabilizarse: perfil warm)
+warm_peak_bytes = {}
+
 
 def test_prefetch_system():
     global start_time
@@ -50,7 +54,12 @@ def test_prefetch_system():
 
         for slot in player.slots:
             video = slot.video_info.get('title', 'None')[:25] if slot.video_info else 'None'
-            print(f"  Slot {slot.slot_id}: {slot.state:12} | {video}")
+            read_bytes = read_process_bytes(slot.process.processId()) if slot.process else None
+            bytes_str = f"{read_bytes / 1024:.0f}KB" if read_bytes else "-"
+            print(f"  Slot {slot.slot_id}: {slot.state:12} | {video:25} | {bytes_str}")
+            if read_bytes and slot.state in ('buffering', 'ready'):
+                key = (slot.slot_id, slot.generation)
+                warm_peak_bytes[key] = max(warm_peak_bytes.get(key, 0), read_bytes)
 
         # Verificar invariantes
         playing_count = sum(1 for s in player.slots if s.state == 'playing')
@@ -72,6 +81,10 @@ def test_prefetch_system():
         print(f"=== TEST COMPLETADO (T+{elapsed:.1f}s) ===")
         print(f"{'='*60}")
         print(f"Videos en cola restantes: {len(player.queue)}")
+        if warm_peak_bytes:
+            peaks = [b / 1024 for b in warm_peak_bytes.values()]
+            print(f"Slots warm: {len(peaks)}, máx {max(peaks):.0f}KB, "
+                  f"promedio {sum(peaks) / len(peaks):.0f}KB leídos antes de promover")
         app.quit()
 
     QTimer.singleShot(300000, finish_test)  # 5 minutos
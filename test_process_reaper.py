@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Test del ProcessReaper con un proceso vivo y congelado (SIGSTOP)."""
+
+import os
+import sys
+import time
+import signal
+from PyQt5.QtCore import QCoreApplication, QProcess, QEvent
+from process_reaper import ProcessReaper
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _spin(timeout, until):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not until():
+        app.processEvents()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        time.sleep(0.005)
+
+
+def test_reap_stopped_process():
+    reaper = ProcessReaper(kill_after_ms=3000)
+    process = QProcess()
+    process.start('sleep', ['30'])
+    assert process.waitForStarted(2000)
+    os.kill(process.processId(), signal.SIGSTOP)
+
+    reaper.reap(process, 'sleep')
+    assert reaper.pending, "el proceso vivo debe quedar pendiente"
+    # SIGCONT + SIGTERM: termina sin llegar al SIGKILL
+    _spin(2.5, until=lambda: not reaper.pending)
+    assert not reaper.pending
+    assert reaper.reaped == 1 and reaper.killed == 0, reaper.summary()
+
+
+if __name__ == '__main__':
+    test_reap_stopped_process()
+    print("OK")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Test de la máquina de estados de slots y sus métricas."""
+
+from slot_state import (SlotMetrics, SlotStateMachine, FREE, PREFETCHING,
+                        BUFFERING, READY, PLAYING, FADING)
+
+
+def test_legal_cycle_counts_hit():
+    metrics = SlotMetrics()
+    machine = SlotStateMachine(0, metrics)
+    for state in (PREFETCHING, BUFFERING, READY, PLAYING, FADING, FREE):
+        assert machine.transition(state, 'test')
+    assert machine.state == FREE
+    assert metrics.prefetches == 1
+    assert metrics.played == 1
+    assert metrics.wasted == 0
+    assert metrics.hit_rate() == 1.0
+    assert len(metrics.ready_times) == 1
+
+
+def test_illegal_transition_rejected():
+    metrics = SlotMetrics()
+    machine = SlotStateMachine(1, metrics)
+    assert not machine.transition(PLAYING, 'sin prefetch')
+    assert machine.state == FREE
+    assert metrics.illegal == [(1, FREE, PLAYING, 'sin prefetch')]
+    # Free siempre es legal
+    machine.transition(PREFETCHING)
+    assert machine.transition(FREE, 'cancelado')
+    assert metrics.abandoned == 1
+
+
+def test_wasted_prefetch():
+    metrics = SlotMetrics()
+    machine = SlotStateMachine(0, metrics)
+    machine.transition(PREFETCHING)
+    machine.transition(BUFFERING)
+    machine.transition(READY)
+    machine.transition(FREE, 'cola limpiada')
+    assert metrics.wasted == 1
+    assert metrics.hit_rate() == 0.0
+    assert 'desperdiciados' in metrics.dump([])
+
+
+def test_prefetch_used_by_waiting_play_is_hit():
+    metrics = SlotMetrics()
+    machine = SlotStateMachine(0, metrics)
+    machine.transition(PREFETCHING)
+    machine.transition(FREE, 'usado por reproducción directa', used=True)
+    assert metrics.abandoned == 0
+    assert metrics.url_hits == 1
+    assert metrics.hit_rate() == 1.0
+
+
+if __name__ == '__main__':
+    test_legal_cycle_counts_hit()
+    test_illegal_transition_rejected()
+    test_wasted_prefetch()
+    test_prefetch_used_by_waiting_play_is_hit()
+    print("OK")
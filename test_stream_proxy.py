@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Test del proxy de rangos contra un servidor HTTP local (sin red)."""
+
+import os
+import shutil
+import tempfile
+import threading
+import http.server
+import urllib.request
+import stream_proxy
+from stream_proxy import StreamProxy, RangeSet, parse_range
+
+PAYLOAD = os.urandom(5 * 1024 * 1024 + 123)
+
+
+class Origin(http.server.BaseHTTPRequestHandler):
+    """Imita googlevideo: solo pedidos con Range, keep-alive."""
+
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def do_GET(self):
+        start, end = parse_range(self.headers.get('Range'), len(PAYLOAD))
+        Origin.requests.append((start, end))
+        self.send_response(206)
+        self.send_header('Content-Type', 'audio/webm')
+        self.send_header('Content-Length', str(end - start))
+        self.send_header('Content-Range', f'bytes {start}-{end - 1}/{len(PAYLOAD)}')
+        self.end_headers()
+        self.wfile.write(PAYLOAD[start:end])
+
+    def log_message(self, *_):
+        pass
+
+
+def _get(url, byte_range=None):
+    request = urllib.request.Request(url)
+    if byte_range:
+        request.add_header('Range', byte_range)
+    with urllib.request.urlopen(request) as response:
+        return response.status, response.read()
+
+
+def test_range_set():
+    ranges = RangeSet([(0, 10), (20, 30)])
+    ranges.add(10, 20)
+    assert ranges.ranges == [(0, 30)]
+    assert ranges.covered_until(5) == 30
+    assert ranges.covered_until(30) is None
+    assert parse_range('bytes=-10', 100) == (90, 100)
+    assert parse_range('bytes=200-', 100) is None
+
+
+def test_proxy_serves_repeats_from_cache():
+    origin = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Origin)
+    threading.Thread(target=origin.serve_forever, daemon=True).start()
+    cache_dir = tempfile.mkdtemp()
+    proxy = StreamProxy(cache_dir=cache_dir)
+    proxy.start()
+    try:
+        upstream_url = f'http://127.0.0.1:{origin.server_address[1]}/videoplayback?id=1'
+        local = proxy.register('abc_251', upstream_url)
+
+        status, body = _get(local)
+        assert status == 200 and body == PAYLOAD
+        # Sin clen: el tamaño sale de un pedido de 1 byte, no de un segmento
+        assert Origin.requests[0] == (0, 1), Origin.requests[:2]
+        first_pass = len(Origin.requests)
+        assert first_pass >= len(PAYLOAD) // stream_proxy.UPSTREAM_CHUNK_BYTES
+        # Keep-alive: los segmentos reutilizan la conexión
+        assert proxy.upstream.reused >= first_pass - 1, proxy.summary()
+
+        # Seek y repetición: todo desde disco
+        status, body = _get(local, 'bytes=3000000-3000999')
+        assert status == 206 and body == PAYLOAD[3000000:3001000]
+        status, body = _get(local)
+        assert body == PAYLOAD
+        assert len(Origin.requests) == first_pass
+        assert proxy.bytes_cached >= len(PAYLOAD)
+
+        # Otra instancia (reinicio) reusa la caché en disco
+        proxy.stop()
+        proxy = StreamProxy(cache_dir=cache_dir)
+        proxy.start()
+        local = proxy.register('abc_251', upstream_url)
+        status, body = _get(local, 'bytes=100-')
+        assert body == PAYLOAD[100:]
+        assert len(Origin.requests) == first_pass
+    finally:
+        proxy.stop()
+        origin.shutdown()
+        shutil.rmtree(cache_dir)
+
+
+def test_size_from_clen_without_probe():
+    origin = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Origin)
+    threading.Thread(target=origin.serve_forever, daemon=True).start()
+    cache_dir = tempfile.mkdtemp()
+    proxy = StreamProxy(cache_dir=cache_dir)
+    proxy.start()
+    try:
+        upstream_url = (f'http://127.0.0.1:{origin.server_address[1]}/videoplayback'
+                        f'?id=2&clen={len(PAYLOAD)}&mime=audio%2Fwebm')
+        local = proxy.register('def_251', upstream_url)
+        del Origin.requests[:]
+        status, body = _get(local, 'bytes=0-99')
+        assert status == 206 and body == PAYLOAD[:100]
+        assert Origin.requests[0][0] == 0 and Origin.requests[0][1] > 1, Origin.requests
+    finally:
+        proxy.stop()
+        origin.shutdown()
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    test_range_set()
+    test_proxy_serves_repeats_from_cache()
+    test_size_from_clen_without_probe()
+    print("OK")
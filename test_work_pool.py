@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Test del WorkPool: prioridades, lugares acotados y cancelación."""
+
+import sys
+import time
+from PyQt5.QtCore import QCoreApplication, QObject, QEvent
+from work_pool import (WorkPool, PRIORITY_PLAY, PRIORITY_SEARCH,
+                       PRIORITY_BACKGROUND)
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _spin(timeout=0.2, until=None):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not (until and until()):
+        app.processEvents()
+        # deleteLater no se procesa fuera de un event loop
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        time.sleep(0.005)
+
+
+class FakeJob(QObject):
+    """Imita ResolveRace: start(), cancel() y deleteLater al terminar."""
+
+    def __init__(self, name, started):
+        super().__init__()
+        self.name = name
+        self.started = started
+
+    def start(self):
+        self.started.append(self.name)
+
+    def finish(self):
+        self.deleteLater()
+
+    cancel = finish
+
+
+def test_priorities_and_bound():
+    pool = WorkPool(max_workers=2)
+    started = []
+    jobs = {name: FakeJob(name, started) for name in ('bg1', 'bg2', 'search', 'play')}
+    pool.run_async(PRIORITY_BACKGROUND, 'bg1', jobs['bg1'], jobs['bg1'].start)
+    pool.run_async(PRIORITY_BACKGROUND, 'bg2', jobs['bg2'], jobs['bg2'].start)
+    pool.run_async(PRIORITY_SEARCH, 'search', jobs['search'], jobs['search'].start)
+    pool.run_async(PRIORITY_PLAY, 'play', jobs['play'], jobs['play'].start)
+    _spin()
+    # El fondo deja libre el último lugar; play entra siempre
+    assert started == ['bg1', 'search', 'play'], started
+    assert pool.depth(PRIORITY_BACKGROUND) == 1
+
+    jobs['bg1'].finish()
+    jobs['search'].finish()
+    jobs['play'].finish()
+    _spin(until=lambda: 'bg2' in started)
+    assert 'bg2' in started
+    assert pool.depth() == 0
+
+
+def test_thread_job_and_cancel():
+    pool = WorkPool(max_workers=1)
+    results = []
+    job = pool.run_thread(PRIORITY_SEARCH, 'sum', lambda token: sum(range(10)))
+    job.finished.connect(results.append)
+    queued = pool.run_thread(PRIORITY_SEARCH, 'never', lambda token: results.append('no'))
+    queued.cancel()
+    _spin(1.0, until=lambda: results and not pool.running)
+    assert results == [45], results
+    assert pool.cancelled == 1
+
+
+if __name__ == '__main__':
+    test_priorities_and_bound()
+    test_thread_job_and_cancel()
+    print("OK")
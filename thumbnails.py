@@ -0,0 +1,179 @@
+"""
+Miniaturas de resultados: descarga, decodificación y cache fuera del hilo UI.
+
+- Un solo hilo trabajador descarga con conexiones HTTPS keep-alive
+  reutilizadas por host (i.ytimg.com).
+- Decodifica y reduce con QImageReader.setScaledSize (el decoder JPEG
+  reduce durante la decodificación, sin crear la imagen completa).
+- Guarda la miniatura ya reducida en disco (LRU por cantidad) y la UI
+  mantiene un LRU en memoria de QPixmap.
+- Las filas visibles se piden primero; lo que salió de pantalla se cancela.
+"""
+
+import os
+import hashlib
+import http.client
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+from PyQt5.QtCore import Qt, QThread, QSize, QBuffer, QByteArray, QIODevice, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPixmap
+
+THUMB_SIZE = QSize(80, 45)
+THUMB_CACHE_DIR = os.path.expanduser('~/.cache/ytplayer/thumbs')
+THUMB_DISK_MAX_FILES = 500
+THUMB_MEMORY_MAX = 100
+THUMB_HTTP_TIMEOUT = 10
+
+
+def thumbnail_url(video_id):
+    """Miniatura más chica que publica YouTube (120x90, ~3KB)."""
+    return f'https://i.ytimg.com/vi/{video_id}/default.jpg'
+
+
+def decode_scaled(data, size=THUMB_SIZE):
+    """Decodifica bytes de imagen reduciendo al tamaño pedido. QImage o None."""
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.ReadOnly)
+    reader = QImageReader(buffer)
+    original = reader.size()
+    if original.isValid():
+        reader.setScaledSize(original.scaled(size, Qt.KeepAspectRatio))
+    image = reader.read()
+    return None if image.isNull() else image
+
+
+class ThumbnailWorker(QThread):
+    """Hilo de descarga/decodificación. request() y prioritize() desde la UI."""
+
+    thumbnail_ready = pyqtSignal(str, QImage)   # clave (video id), imagen reducida
+
+    def __init__(self, cache_dir=THUMB_CACHE_DIR, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self._pending = OrderedDict()   # {clave: url} en orden de prioridad
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._connections = {}          # {host: HTTPSConnection} (solo este hilo)
+        self._writes = 0
+        self.offline = False            # Sin red: solo cache en disco
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # --- API (hilo UI) ---
+    def request(self, key, url):
+        with self._cond:
+            if key not in self._pending:
+                self._pending[key] = url
+                self._cond.notify()
+
+    def prioritize(self, visible):
+        """visible: [(clave, url)] en orden. Descarta lo pendiente no visible."""
+        with self._cond:
+            self._pending = OrderedDict(visible)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._pending.clear()
+            self._cond.notify()
+        self.wait(2000)
+
+    # --- Hilo trabajador ---
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    break
+                key, url = self._pending.popitem(last=False)
+
+            image = self._load(key, url)
+            if image is not None:
+                self.thumbnail_ready.emit(key, image)
+
+        for conn in self._connections.values():
+            conn.close()
+
+    def _cache_path(self, key):
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{name}.jpg')
+
+    def _load(self, key, url):
+        path = self._cache_path(key)
+        if os.path.exists(path):
+            image = QImage(path)
+            if not image.isNull():
+                os.utime(path)  # LRU: marcar como usado
+                return image
+
+        if self.offline:
+            return None
+        data = self._fetch(url)
+        if not data:
+            return None
+        image = decode_scaled(data)
+        if image is None:
+            return None
+        image.save(path, 'JPG', 85)
+        self._writes += 1
+        if self._writes % 50 == 0:
+            self._trim_disk()
+        return image
+
+    def _fetch(self, url):
+        parsed = urlparse(url)
+        path = parsed.path + (f'?{parsed.query}' if parsed.query else '')
+        for attempt in range(2):
+            conn = self._connections.get(parsed.netloc)
+            if conn is None:
+                conn = http.client.HTTPSConnection(parsed.netloc, timeout=THUMB_HTTP_TIMEOUT)
+                self._connections[parsed.netloc] = conn
+            try:
+                conn.request('GET', path, headers={'Connection': 'keep-alive'})
+                response = conn.getresponse()
+                data = response.read()
+                return data if response.status == 200 else None
+            except (OSError, http.client.HTTPException):
+                # Conexión keep-alive cerrada por el servidor: reabrir una vez
+                conn.close()
+                self._connections.pop(parsed.netloc, None)
+        return None
+
+    def _trim_disk(self):
+        try:
+            entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+            if len(entries) <= THUMB_DISK_MAX_FILES:
+                return
+            entries.sort(key=os.path.getmtime)
+            for path in entries[:len(entries) - THUMB_DISK_MAX_FILES]:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+class ThumbnailCache:
+    """LRU en memoria de QPixmap (hilo UI)."""
+
+    def __init__(self, max_items=THUMB_MEMORY_MAX):
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def get(self, key):
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, key, image):
+        pixmap = QPixmap.fromImage(image)
+        self._items[key] = pixmap
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return pixmap
+
+    def clear(self):
+        self._items.clear()
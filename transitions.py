@@ -0,0 +1,122 @@
+"""
+Transiciones entre canciones: crossfade o gapless con el slot precargado.
+
+Observa time-remaining del mpv que suena. Cuando faltan CROSSFADE_S
+segundos (o GAPLESS_LEAD_S si el crossfade está desactivado) emite due;
+el reproductor despausa el slot warm con volumen 0 y el motor cruza los
+volúmenes por IPC con una curva de igual potencia. El mpv saliente se
+entrega al callback on_done(aborted) al terminar la rampa, o al cortarla
+con abort() (stop/siguiente manual).
+"""
+
+import os
+import math
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from mpv_ipc import MpvIpc
+
+# Duración del crossfade en segundos (0 = gapless, sin rampa)
+CROSSFADE_S = float(os.environ.get('YTPLAYER_CROSSFADE_S', '4') or 0)
+# Sin crossfade: adelantar el despause lo que tarda mpv en sacar audio
+GAPLESS_LEAD_S = 0.15
+FADE_STEP_MS = 50
+
+
+class TransitionEngine(QObject):
+    """Dispara y ejecuta la transición al slot siguiente."""
+
+    due = pyqtSignal(float)   # segundos que le quedan a la canción actual
+
+    def __init__(self, crossfade_s=CROSSFADE_S, parent=None):
+        super().__init__(parent)
+        self.crossfade_s = crossfade_s
+        self.ipc = None           # mpv que suena
+        self.triggered = False
+        self.outgoing_ipc = None  # mpv saliente durante la rampa
+        self.incoming_ipc = None
+        self.on_done = None
+        self.fade_start = None
+        self.fade_duration = 0
+        self.outgoing_end_at = None   # Cuándo termina el audio saliente
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(FADE_STEP_MS)
+        self.timer.timeout.connect(self._step)
+        self.end_timer = QTimer(self)     # Gapless: fin del saliente
+        self.end_timer.setSingleShot(True)
+        self.end_timer.timeout.connect(self._finish)
+
+    def lead_s(self):
+        return self.crossfade_s if self.crossfade_s > 0 else GAPLESS_LEAD_S
+
+    def attach(self, socket_path):
+        """Empieza a observar el mpv que suena."""
+        self.detach()
+        self.ipc = MpvIpc(socket_path, self)
+        self.ipc.property_changed.connect(self._on_property)
+        self.ipc.observe('time-remaining')
+        self.triggered = False
+
+    def detach(self):
+        if self.ipc:
+            self.ipc.close()
+            self.ipc = None
+
+    def _on_property(self, name, value):
+        if name != 'time-remaining' or self.triggered or not isinstance(value, (int, float)):
+            return
+        if 0 < value <= self.lead_s():
+            self.triggered = True
+            self.due.emit(value)
+
+    def begin(self, incoming_ipc, remaining, on_done):
+        """Cruza del mpv observado a incoming_ipc (ya despausado en volumen 0).
+
+        on_done(aborted) se llama cuando el saliente puede terminarse;
+        aborted indica que la transición se cortó antes de tiempo.
+        """
+        self.abort()
+        self.outgoing_ipc, self.ipc = self.ipc, None
+        self.incoming_ipc = incoming_ipc
+        self.on_done = on_done
+        self.outgoing_end_at = time.time() + remaining
+        self.fade_start = time.time()
+        self.fade_duration = min(self.crossfade_s, remaining)
+
+        if self.fade_duration * 1000 < FADE_STEP_MS:
+            # Gapless: el saliente termina solo; liberarlo después
+            self.incoming_ipc.set_property('volume', 100)
+            self.end_timer.start(int(remaining * 1000) + 500)
+            return
+        self.timer.start()
+
+    def _step(self):
+        progress = min(1.0, (time.time() - self.fade_start) / self.fade_duration)
+        angle = progress * math.pi / 2
+        self.incoming_ipc.set_property('volume', round(100 * math.sin(angle), 1))
+        if self.outgoing_ipc:
+            self.outgoing_ipc.set_property('volume', round(100 * math.cos(angle), 1))
+        if progress >= 1.0:
+            self._finish()
+
+    def _finish(self, aborted=False):
+        self.timer.stop()
+        self.end_timer.stop()
+        if self.outgoing_ipc:
+            self.outgoing_ipc.close()
+            self.outgoing_ipc = None
+        self.incoming_ipc = None
+        on_done, self.on_done = self.on_done, None
+        if on_done:
+            on_done(aborted)
+
+    def abort(self):
+        """Corta una transición en curso (stop/siguiente manual)."""
+        if self.on_done is None:
+            return
+        if self.incoming_ipc:
+            self.incoming_ipc.set_property('volume', 100)
+        self._finish(aborted=True)
+
+    def in_progress(self):
+        return self.on_done is not None
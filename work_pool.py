@@ -0,0 +1,273 @@
+"""
+Capa única de ejecución: trabajos con prioridad y concurrencia acotada.
+
+Prioridades (menor número = más urgente):
+  PRIORITY_PLAY        reproducción pedida por el usuario (nunca espera)
+  PRIORITY_SEARCH      búsqueda
+  PRIORITY_PREFETCH    pre-carga de la siguiente canción
+  PRIORITY_BACKGROUND  batch de la cola, especulación y demás caches
+
+Hay MAX_WORKERS lugares. PRIORITY_PLAY entra siempre; el resto espera en
+cola por prioridad (FIFO dentro de la misma) y lo que no es interactivo
+deja libre el último lugar, para que una búsqueda no espere detrás del
+trabajo de fondo.
+
+Dos tipos de trabajo:
+  - run_thread(fn): fn(token) bloqueante en un QThreadPool; el resultado
+    llega por señal (finished/failed) al hilo de la UI.
+  - run_async(obj, start): obj es un QObject que maneja su propio QProcess
+    (ResolveRace, BatchResolve, LoudnessJob, FavoriteDownload). start()
+    se llama al admitirlo y el lugar se libera cuando obj se destruye
+    (deleteLater al terminar o cancelar).
+
+Toda la contabilidad corre en el hilo de la UI.
+"""
+
+import time
+import itertools
+import threading
+from collections import deque
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+PRIORITY_PLAY = 0
+PRIORITY_SEARCH = 1
+PRIORITY_PREFETCH = 2
+PRIORITY_BACKGROUND = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_PLAY: 'play',
+    PRIORITY_SEARCH: 'search',
+    PRIORITY_PREFETCH: 'prefetch',
+    PRIORITY_BACKGROUND: 'background',
+}
+
+# yt-dlp simultáneos (cada uno ~50MB y bastante CPU en una Pi)
+MAX_WORKERS = 3
+# Con esta cantidad esperando en cola se considera saturado
+SATURATION_DEPTH = 3
+# Esperas recientes guardadas por prioridad (para el promedio)
+WAIT_SAMPLES = 50
+
+
+class CancelToken:
+    """Cancelación cooperativa; se puede consultar desde cualquier hilo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def on_cancel(self, fn):
+        """Registra fn para la cancelación (o la llama ya si llegó tarde)."""
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(fn)
+                return
+        fn()
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn()
+            except Exception as e:
+                print(f"[POOL] Error al cancelar: {e}", flush=True)
+
+
+class Job(QObject):
+    """Un trabajo del pool. finished/failed solo para run_thread()."""
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    _delivered = pyqtSignal(object, str)    # Desde el hilo trabajador
+
+    def __init__(self, pool, priority, name):
+        super().__init__(pool)
+        self.pool = pool
+        self.priority = priority
+        self.name = name
+        self.token = CancelToken()
+        self.seq = next(pool.seq)
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.start_fn = None
+
+    def cancel(self):
+        self.pool.cancel(self)
+
+    def __repr__(self):
+        return f"Job({self.name}, {PRIORITY_NAMES[self.priority]})"
+
+
+class _Runnable(QRunnable):
+    def __init__(self, job, fn):
+        super().__init__()
+        self.job = job
+        self.fn = fn
+
+    def run(self):
+        if self.job.token.cancelled:
+            self.job._delivered.emit(None, 'cancelado')
+            return
+        try:
+            self.job._delivered.emit(self.fn(self.job.token), '')
+        except Exception as e:
+            self.job._delivered.emit(None, str(e) or type(e).__name__)
+
+
+class WorkPool(QObject):
+    """Cola con prioridad y lugares acotados para todo el trabajo externo."""
+
+    saturated = pyqtSignal(int)     # Trabajos en cola al saturarse
+
+    def __init__(self, max_workers=MAX_WORKERS, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers
+        self.threads = QThreadPool(self)
+        self.threads.setMaxThreadCount(max_workers)
+        self.seq = itertools.count()
+        self.queue = []           # [Job] en espera, ordenados por (prioridad, seq)
+        self.running = set()
+        self.waits = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITY_NAMES}
+        self.completed = 0
+        self.cancelled = 0
+        self.peak_depth = 0
+        self.saturation_events = 0
+        self.is_saturated = False
+
+    # --- Envío ---
+
+    def run_thread(self, priority, name, fn):
+        """Corre fn(token) en un hilo. Conectar a job.finished/job.failed."""
+        job = Job(self, priority, name)
+        job._delivered.connect(lambda result, error: self._on_delivered(job, result, error),
+                               Qt.QueuedConnection)
+        job.start_fn = lambda: self.threads.start(_Runnable(job, fn))
+        self._submit(job)
+        return job
+
+    def run_async(self, priority, name, obj, start):
+        """Admite obj (con cancel() y deleteLater al terminar) y llama start()."""
+        job = Job(self, priority, name)
+        job.token.on_cancel(obj.cancel)
+        obj.destroyed.connect(lambda *_: self._release(job))
+        job.start_fn = start
+        self._submit(job)
+        return job
+
+    def cancel(self, job):
+        if job in self.queue:
+            self.queue.remove(job)
+            self.cancelled += 1
+            job.token.cancel()
+            job.deleteLater()
+            self._check_saturation()
+        elif job in self.running and not job.token.cancelled:
+            self.cancelled += 1
+            # El lugar se libera cuando el trabajo termina de verdad
+            job.token.cancel()
+
+    def promote(self, job, priority):
+        """Sube la prioridad de un trabajo (p.ej. play se sumó a un prefetch)."""
+        if priority >= job.priority:
+            return
+        job.priority = priority
+        if job in self.queue:
+            self.queue.sort(key=lambda j: (j.priority, j.seq))
+            self._dispatch()
+            self._check_saturation()
+
+    def _submit(self, job):
+        self.queue.append(job)
+        self.queue.sort(key=lambda j: (j.priority, j.seq))
+        self._dispatch()
+        self.peak_depth = max(self.peak_depth, len(self.queue))
+        self._check_saturation()
+
+    # --- Despacho ---
+
+    def _has_room(self, job):
+        if job.priority == PRIORITY_PLAY:
+            return True
+        limit = self.max_workers if job.priority <= PRIORITY_SEARCH else self.max_workers - 1
+        return len(self.running) < max(1, limit)
+
+    def _dispatch(self):
+        for job in list(self.queue):
+            if not self._has_room(job):
+                continue
+            self.queue.remove(job)
+            self.running.add(job)
+            job.started_at = time.time()
+            wait = job.started_at - job.submitted_at
+            self.waits[job.priority].append(wait)
+            if wait > 0.05:
+                print(f"[POOL] {job.name} ({PRIORITY_NAMES[job.priority]}) "
+                      f"tras {wait:.1f}s en cola", flush=True)
+            # Diferido: quien envía conecta sus señales antes de que arranque
+            QTimer.singleShot(0, job.start_fn)
+
+    def _on_delivered(self, job, result, error):
+        cancelled = job.token.cancelled
+        self._release(job)
+        if not cancelled:
+            if error:
+                job.failed.emit(error)
+            else:
+                job.finished.emit(result)
+
+    def _release(self, job):
+        if job in self.running:
+            self.running.discard(job)
+            self.completed += 1
+        elif job in self.queue:
+            # Cancelado por su dueño antes de arrancar
+            self.queue.remove(job)
+            self.cancelled += 1
+        else:
+            return
+        job.deleteLater()
+        self._dispatch()
+        self._check_saturation()
+
+    # --- Métricas ---
+
+    def depth(self, priority=None):
+        if priority is None:
+            return len(self.queue)
+        return sum(1 for job in self.queue if job.priority == priority)
+
+    def _check_saturation(self):
+        depth = len(self.queue)
+        if depth >= SATURATION_DEPTH and not self.is_saturated:
+            self.is_saturated = True
+            self.saturation_events += 1
+            print(f"[POOL] Saturado: {depth} en cola, {len(self.running)} corriendo "
+                  f"({self._depth_str()})", flush=True)
+            self.saturated.emit(depth)
+        elif depth == 0 and self.is_saturated:
+            self.is_saturated = False
+            print("[POOL] Cola vacía", flush=True)
+
+    def _depth_str(self):
+        return ', '.join(f"{PRIORITY_NAMES[p]} {self.depth(p)}"
+                         for p in PRIORITY_NAMES if self.depth(p))
+
+    def summary(self):
+        waits = []
+        for priority, samples in self.waits.items():
+            if samples:
+                waits.append(f"{PRIORITY_NAMES[priority]} "
+                             f"{sum(samples) / len(samples):.1f}s")
+        return (f"{len(self.running)} corriendo, {len(self.queue)} en cola "
+                f"(máx {self.peak_depth}, saturado {self.saturation_events}x), "
+                f"espera media: {', '.join(waits) or '-'}, "
+                f"{self.completed} hechos, {self.cancelled} cancelados")
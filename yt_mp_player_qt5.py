@@ -4,14 +4,34 @@ import os
 import json
 import subprocess
 import time
-import socket
-from threading import Lock
+import signal
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                              QLineEdit, QPushButton, QListWidget, QLabel, QShortcut,
-                             QProgressBar, QPlainTextEdit)
+                             QPlainTextEdit)
 from datetime import datetime
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QProcess
-from PyQt5.QtGui import QKeySequence
+from PyQt5.QtCore import Qt, QEvent, QProcess, QTimer
+from PyQt5.QtGui import QKeySequence, QIcon, QPixmapCache
+from hw_input import create_default_input
+from process_reaper import ProcessReaper
+from resolver import Resolver, BATCH_MAX_LINKS, video_id
+from formats import TransferLog, read_process_bytes
+from prefetch_scheduler import PrefetchScheduler
+from thumbnails import ThumbnailWorker, ThumbnailCache, THUMB_SIZE, thumbnail_url
+from loudness import LoudnessAnalyzer, mpv_gain_args
+from memory_governor import MemoryGovernor, LEVELS, release_heap
+from mpv_profiles import profile_args, profile_properties
+from mpv_ipc import MpvIpc
+from transitions import TransitionEngine
+from speculation import SpeculativeResolver
+from library import Library, FavoriteWarmer
+from connectivity import ConnectivityMonitor
+from cookies import CookieManager
+from stream_proxy import StreamProxy
+from seek import SeekController, SeekBar
+from progress_view import ProgressPresenter
+from styles import APP_STYLESHEET, StyleStates, Gradient, GradientSkin
+from slot_state import SlotStateMachine, SlotMetrics
+from work_pool import WorkPool, PRIORITY_SEARCH, PRIORITY_PREFETCH
 
 # Path to cookies file (NOT tracked by git - stored in user's home)
 COOKIES_FILE = os.path.expanduser('~/.config/ytplayer/cookies.txt')
@@ -19,81 +39,136 @@ COOKIES_FILE = os.path.expanduser('~/.config/ytplayer/cookies.txt')
 # Path to yt-dlp (evita timeout de 60s buscando en config directories)
 YTDLP_PATH = os.path.expanduser('~/.local/bin/yt-dlp')
 
+# Objetivo de latencia botón físico → cambio de audio
+HW_LATENCY_TARGET_MS = 50
 
-# --- Hilo de Búsqueda (Worker) ---
-class SearchThread(QThread):
-    results_ready = pyqtSignal(list)
-    error_occurred = pyqtSignal(str)
+# URLs de googlevideo que vencen antes de este margen se descartan del cache
+URL_EXPIRY_MARGIN_S = 600
 
-    def __init__(self, query):
-        super().__init__()
-        self.query = query
+# Espera tras encolar antes de resolver la cola en batch (agrupa encolados)
+BATCH_DEBOUNCE_MS = 1500
 
-    def run(self):
-        # Limpiar query
-        query = self.query.strip()
-        if not query:
-            self.results_ready.emit([])
-            return
+# Máximo de URLs en cache (las especulativas se descartan primero por antigüedad)
+URL_CACHE_MAX = 60
 
-        # Usar yt-dlp para búsqueda (más confiable que youtube-search-python)
-        try:
-            cmd = ['yt-dlp', '--flat-playlist', '--dump-json', f'ytsearch12:{query}']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-            if result.returncode == 0 and result.stdout:
-                valid_results = []
-                for line in result.stdout.strip().split('\n'):
-                    if line:
-                        try:
-                            item = json.loads(line)
-                            title = item.get('title')
-                            video_id = item.get('id') or item.get('url', '').split('=')[-1]
-                            if title and video_id:
-                                valid_results.append({
-                                    'title': title,
-                                    'link': f'https://www.youtube.com/watch?v={video_id}',
-                                    'duration': item.get('duration_string') or 'N/A'
-                                })
-                        except json.JSONDecodeError:
-                            continue
-                self.results_ready.emit(valid_results)
-                return
+# Un slot está listo con este audio en caché y la salida de audio abierta
+SLOT_READY_CACHE_S = 3.0
+
+# Objetivo de latencia S (siguiente) → primer sample de audio
+SKIP_LATENCY_TARGET_MS = 300
+
+# mpv reproduce a través del proxy local con caché de rangos (YTPLAYER_PROXY=0 lo desactiva)
+STREAM_PROXY_ENABLED = os.environ.get('YTPLAYER_PROXY', '1') != '0'
+
+# Orden de severidad de los niveles de memoria
+LEVELS_ORDER = {level: rank for rank, level in enumerate(LEVELS)}
+
+
+# --- Búsqueda (corre en el WorkPool) ---
+SEARCH_TIMEOUT_S = 30
 
-            self.error_occurred.emit("Sin resultados")
-            self.results_ready.emit([])
-        except subprocess.TimeoutExpired:
-            self.error_occurred.emit("Timeout en búsqueda")
-            self.results_ready.emit([])
-        except Exception as e:
-            self.error_occurred.emit(str(e))
-            self.results_ready.emit([])
+
+def search_youtube(query, token):
+    """Busca con yt-dlp. Bloqueante: se corre con WorkPool.run_thread()."""
+    query = query.strip()
+    if not query:
+        return []
+
+    # Usar yt-dlp para búsqueda (más confiable que youtube-search-python)
+    cmd = ['yt-dlp', '--flat-playlist', '--dump-json', f'ytsearch12:{query}']
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    token.on_cancel(process.kill)
+    try:
+        stdout, _ = process.communicate(timeout=SEARCH_TIMEOUT_S)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise RuntimeError("Timeout en búsqueda")
+    if token.cancelled:
+        return []
+    if process.returncode != 0 or not stdout:
+        raise RuntimeError("Sin resultados")
+
+    valid_results = []
+    for line in stdout.strip().split('\n'):
+        if line:
+            try:
+                item = json.loads(line)
+                title = item.get('title')
+                video_id = item.get('id') or item.get('url', '').split('=')[-1]
+                if title and video_id:
+                    valid_results.append({
+                        'title': title,
+                        'id': video_id,
+                        'link': f'https://www.youtube.com/watch?v={video_id}',
+                        'duration': item.get('duration_string') or 'N/A',
+                        'thumbnail': thumbnail_url(video_id)
+                    })
+            except json.JSONDecodeError:
+                continue
+    return valid_results
 
 
 # --- Slot de Reproducción (Doble-Buffer) ---
 class PlayerSlot:
     """Representa un slot de reproducción con su propio socket IPC."""
 
-    def __init__(self, slot_id):
+    def __init__(self, slot_id, reaper, metrics):
         self.slot_id = slot_id
-        self.socket_path = f'/tmp/mpv_ytplayer_{slot_id}'
+        self.reaper = reaper      # ProcessReaper: termina mpv sin bloquear
+        self.generation = 0
+        self.socket_path = f'/tmp/mpv_ytplayer_{slot_id}_0'
         self.process = None       # QProcess de mpv
         self.video_info = None    # dict con title, link, etc
         self.video_link = None    # link del video (para comparar)
-        self.state = 'free'       # free|prefetching|buffering|ready|playing
+        self.media = None         # dict de formato resuelto (ver formats.py)
+        self.machine = SlotStateMachine(slot_id, metrics)   # ver slot_state.py
+        self.ipc = None           # MpvIpc: readiness y despause sin bloquear
+        self.props = {}           # Últimos valores observados por IPC
+        self.started_at = None    # Inicio de mpv (para medir tiempo a ready)
+
+    @property
+    def state(self):
+        return self.machine.state
+
+    def set_state(self, state, reason=''):
+        """Cambia de estado validando la transición. False si es ilegal."""
+        return self.machine.transition(state, reason)
+
+    def release(self, reason, used=False):
+        """Libera un slot sin mpv (prefetch descartado, o usado si used=True)."""
+        self.video_info = None
+        self.video_link = None
+        self.media = None
+        self.machine.transition('free', reason, used=used)
 
-    def cleanup(self):
-        """Limpia el slot para reutilización."""
+    def is_buffered(self):
+        """True si mpv abrió la salida de audio y tiene el inicio en caché."""
+        if not self.props.get('current-ao'):
+            return False
+        cache_time = self.props.get('demuxer-cache-time') or 0
+        # Canción corta: la caché terminó antes del umbral
+        complete = self.props.get('demuxer-cache-idle') and cache_time > 0
+        return cache_time >= SLOT_READY_CACHE_S or bool(complete)
+
+    def cleanup(self, reason='cleanup'):
+        """Limpia el slot para reutilización (no espera a que mpv termine)."""
+        if self.ipc:
+            self.ipc.close()
+            self.ipc = None
+        self.props = {}
+        self.started_at = None
         if self.process:
-            try:
-                self.process.terminate()
-                self.process.waitForFinished(500)
-            except:
-                pass
+            self.reaper.reap(self.process, f'mpv slot {self.slot_id}')
+            # El mpv viejo borra su socket al salir: usar uno nuevo para no
+            # pisar al siguiente mpv de este slot
+            self.generation += 1
+            self.socket_path = f'/tmp/mpv_ytplayer_{self.slot_id}_{self.generation}'
         self.process = None
         self.video_info = None
         self.video_link = None
-        self.state = 'free'
+        self.media = None
+        self.machine.transition('free', reason)
 
     def __repr__(self):
         video = self.video_info.get('title', '')[:20] if self.video_info else 'None'
@@ -117,93 +192,132 @@ class BBBPlayer(QWidget):
         self.max_log_lines = 5
 
         # Pre-carga paralela (yt-dlp)
-        self.url_cache = {}           # {video_link: direct_audio_url}
-        self.prefetch_process = None  # QProcess para pre-carga yt-dlp
+        self.url_cache = {}           # {video_link: media dict con 'url' (ver formats.py)}
+        self.prefetch_job = None      # SharedResolve para pre-carga yt-dlp
         self.prefetch_slot = None     # Slot siendo pre-cargado
 
+        # Resolución en batch de toda la cola (un solo yt-dlp)
+        self.batch_job = None
+        self.batch_size = 0
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(BATCH_DEBOUNCE_MS)
+        self.batch_timer.timeout.connect(
+            lambda: self.scheduler.submit('batch', self.batch_resolve_queue))
+
         # Sistema de doble-buffer para pre-buffering
-        self.slots = [PlayerSlot(0), PlayerSlot(1)]
-        self.slot_lock = Lock()       # Protege acceso concurrente a slots
+        self.reaper = ProcessReaper(self)
+        self.slot_metrics = SlotMetrics()
+        self.slots = [PlayerSlot(0, self.reaper, self.slot_metrics),
+                      PlayerSlot(1, self.reaper, self.slot_metrics)]
+
+        # Todo yt-dlp pasa por un pool con prioridades (ver work_pool.py)
+        self.pool = WorkPool(parent=self)
+        self.search_job = None
+
+        # Cookies cargadas una vez, recargadas al cambiar el archivo (ver cookies.py)
+        self.cookies = CookieManager(COOKIES_FILE, self)
+        self.cookies.changed.connect(self._on_cookies_changed)
+
+        # Resolución de URLs con estrategias en carrera (ver resolver.py)
+        self.resolver = Resolver(YTDLP_PATH, self.cookies, self.reaper, pool=self.pool,
+                                 parent=self)
+
+        # Trabajo de fondo según la caché del audio actual
+        self.scheduler = PrefetchScheduler(self._pause_background,
+                                           self._resume_background, self)
+
+        # Resolución especulativa de resultados de búsqueda (ver speculation.py)
+        self.speculation = SpeculativeResolver(self.resolver, self._is_url_known, self)
+        self.speculation.media_ready.connect(self._on_speculative_media)
+        self.speculation.wanted.connect(
+            lambda: self.scheduler.submit('speculate', self.speculation.run))
+        self.frozen_pids = set()      # mpv de slots congelados por contención
+
+        # Crossfade/gapless al slot precargado según time-remaining
+        self.transitions = TransitionEngine(parent=self)
+        self.transitions.due.connect(self._on_transition_due)
+        self.transition_end_at = None  # Fin del audio anterior (para medir el gap)
+        self.transition_kind = None
+
+        # Seek desde la barra de progreso (ver seek.py)
+        self.seeker = SeekController(self)
+        self.seeker.seeked.connect(self._on_seeked)
+        self.play_socket_seq = 0      # Socket IPC del mpv de reproducción directa
         self.current_slot = None      # Slot actualmente reproduciendo
         self.waiting_for_prefetch = None  # Video info esperando prefetch
 
         # Resolución URL asíncrona para reproducción
-        self.resolve_process = None   # QProcess para resolver URL
+        self.resolve_job = None       # SharedResolve para resolver URL
         self.resolve_video_info = None
 
+        # Proxy local: seeks, repeticiones y slots del mismo video sin volver a la red
+        self.proxy = None
+        if STREAM_PROXY_ENABLED:
+            try:
+                self.proxy = StreamProxy()
+                self.proxy.start()
+            except OSError as e:
+                print(f"[PROXY] No disponible: {e}", flush=True)
+                self.proxy = None
+
         # Debug timing
         self.load_start_time = None
 
+        # Bytes transferidos por canción
+        self.transfer_log = TransferLog()
+        self.transfer = None          # Registro de la canción en curso
+
+        # Estado de la red: sin red solo se usa lo guardado localmente
+        self.network = ConnectivityMonitor(self)
+        self.network.changed.connect(self._on_network_changed)
+
+        # Historial y favoritos; audio local de favoritos (ver library.py)
+        self.library = Library()
+        self.favorite_warmer = FavoriteWarmer(self.library, self.resolver, self.scheduler, self)
+
+        # Sonoridad por canción: se mide una vez y se aplica como ganancia
+        self.loudness = LoudnessAnalyzer(self.pool, self.reaper, parent=self)
+
+        # Botones físicos (evdev/GPIO)
+        self.hw_input = None
+        self.hw_press_time = None     # Timestamp de la última pulsación física
+        self.skip_pressed_at = None   # Timestamp de S (siguiente), para latencia
+
+        # Miniaturas: descarga/decodificación en hilo aparte, LRU en memoria
+        self.thumb_cache = ThumbnailCache()
+        self.thumb_worker = ThumbnailWorker(parent=self)
+        self.thumb_worker.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self.thumb_worker.start()
+
+        # Presupuesto de memoria (RSS propio + mpv/yt-dlp hijos)
+        self.memory = MemoryGovernor(self.pool, parent=self)
+        self.memory.sampled.connect(self._on_memory_sampled)
+        self.memory.level_changed.connect(self._on_memory_level)
+
         self.init_ui()
         self.setup_shortcuts()
+        self.setup_hw_input()
+        self.memory.start()
+        self.network.start()
+        self.cookies.start()
+
+        # Estante local al arrancar (sin red) y descarga de favoritos pendientes
+        self.show_shelf()
+        self._warm_favorites()
 
         # Initial log
         self.log("🎉 ¡Hola Emilia y Frida!")
-        if os.path.exists(COOKIES_FILE):
+        if self.cookies.valid():
             self.log("✅ Todo listo")
         else:
             self.log("⚠️ Falta configurar", "WARN")
 
     def init_ui(self):
-        # Anthroposophic/Waldorf color scheme - warm, natural, organic
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #fdf6e3;
-                color: #5c4a3d;
-                font-family: 'Segoe UI', 'Ubuntu', sans-serif;
-            }
-            QLineEdit {
-                background-color: #fff8dc;
-                border: 4px solid #e8a87c;
-                border-radius: 25px;
-                padding: 12px 20px;
-                font-size: 22px;
-                color: #5c4a3d;
-            }
-            QLineEdit:focus {
-                border-color: #c38d6b;
-                background-color: #fffef5;
-            }
-            QListWidget {
-                background-color: #fff8dc;
-                border: 4px solid #d4a574;
-                border-radius: 25px;
-                padding: 12px;
-                font-size: 18px;
-            }
-            QListWidget::item {
-                padding: 14px;
-                border-radius: 18px;
-                margin: 4px;
-                background-color: #fef9e7;
-            }
-            QListWidget::item:selected {
-                background-color: #e8a87c;
-                color: #3d2914;
-            }
-            QListWidget::item:hover {
-                background-color: #f5deb3;
-            }
-            QPushButton {
-                border-radius: 25px;
-                padding: 15px 30px;
-                font-size: 20px;
-                font-weight: bold;
-                border: none;
-            }
-            QProgressBar {
-                border: 4px solid #d4a574;
-                border-radius: 15px;
-                text-align: center;
-                height: 28px;
-                background-color: #fff8dc;
-            }
-            QProgressBar::chunk {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #e8a87c, stop:0.5 #c9a66b, stop:1 #85c88a);
-                border-radius: 11px;
-            }
-        """)
+        # Hoja única, parseada una vez (ver styles.py)
+        self.styles = StyleStates()
+        self.skin = GradientSkin(parent=self)
+        self.setStyleSheet(self.skin.stylesheet(APP_STYLESHEET))
 
         main_layout = QHBoxLayout()
 
@@ -212,16 +326,14 @@ class BBBPlayer(QWidget):
 
         # Welcome header with kids names
         welcome_label = QLabel("🌸 Música para Emilia y Frida 🌻")
-        welcome_label.setStyleSheet("""
+        self.skin.apply(welcome_label, """
             font-size: 26px;
             font-weight: bold;
             color: #5c4a3d;
             padding: 15px;
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 #f5deb3, stop:0.3 #e8a87c, stop:0.7 #85c88a, stop:1 #a7c5eb);
-            border-radius: 30px;
             margin-bottom: 10px;
-        """)
+        """, Gradient([(0, '#f5deb3'), (0.3, '#e8a87c'), (0.7, '#85c88a'), (1, '#a7c5eb')],
+                      radius=30))
         welcome_label.setAlignment(Qt.AlignCenter)
         left_panel.addWidget(welcome_label)
 
@@ -231,26 +343,28 @@ class BBBPlayer(QWidget):
         self.search_input.returnPressed.connect(self.start_search)
 
         btn_search = QPushButton("🔎 Buscar")
-        btn_search.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                stop:0 #85c88a, stop:1 #6ba36e);
+        self.skin.apply(btn_search, """
             color: #2d4a2e;
-            border: none;
-        """)
+        """, Gradient([(0, '#85c88a'), (1, '#6ba36e')], vertical=True, radius=25))
         btn_search.clicked.connect(self.start_search)
 
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(btn_search)
 
         self.list_widget = QListWidget()
+        self.list_widget.setIconSize(THUMB_SIZE)
         self.list_widget.itemDoubleClicked.connect(self.play_video)
+        self.list_widget.currentRowChanged.connect(self._on_result_highlighted)
+        self.list_widget.verticalScrollBar().valueChanged.connect(self._request_visible_thumbnails)
 
         self.status_label = QLabel("🎶 Listo para escuchar música!")
-        self.status_label.setStyleSheet("font-size: 18px; color: #6ba36e; padding: 8px;")
+        self.status_label.setObjectName('status')
+        self.styles.set(self.status_label, 'ready')
 
         progress_layout = QHBoxLayout()
 
-        self.progress_bar = QProgressBar()
+        self.progress_bar = SeekBar()
+        self.progress_bar.seek_requested.connect(self._on_seek_requested)
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
         self.progress_bar.setFormat("")
@@ -262,14 +376,14 @@ class BBBPlayer(QWidget):
         progress_layout.addWidget(self.progress_bar)
         progress_layout.addWidget(self.time_label)
 
+        # Progreso de mpv con refresco acotado (ver progress_view.py)
+        self.progress_view = ProgressPresenter(self.progress_bar, self.time_label, parent=self)
+
         btn_stop = QPushButton("⏹️ Parar")
-        btn_stop.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                stop:0 #e8a87c, stop:1 #c9886a);
+        self.skin.apply(btn_stop, """
             color: #4a3728;
-            border: none;
             min-height: 55px;
-        """)
+        """, Gradient([(0, '#e8a87c'), (1, '#c9886a')], vertical=True, radius=25))
         btn_stop.clicked.connect(self.stop_music)
 
         # === LOG TERMINAL ===
@@ -308,19 +422,17 @@ class BBBPlayer(QWidget):
 <tr><td><b style='color: #6ba36e;'>E</b> 📋Encolar</td><td><b style='color: #e8a87c;'>S</b> ⏭️Sig</td></tr>
 <tr><td><b style='color: #c9886a;'>P</b> ⏹️Parar</td><td><b style='color: #a7c5eb;'>L</b> 🗑️Limp</td></tr>
 <tr><td><b style='color: #a7c5eb;'>Q</b> ❌Quitar</td><td><b style='color: #c9886a;'>A</b> 🚪Salir</td></tr>
+<tr><td><b style='color: #e8a87c;'>H</b> 📚Mías</td><td><b style='color: #e8a87c;'>M</b> ⭐Me gusta</td></tr>
 </table>
 </div>
 """
         help_label = QLabel(help_text)
-        help_label.setStyleSheet("""
+        self.skin.apply(help_label, """
             font-size: 13px;
-            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                stop:0 #fff8dc, stop:1 #f5deb3);
             color: #5c4a3d;
             padding: 8px;
-            border-radius: 15px;
-            border: 3px solid #d4a574;
-        """)
+        """, Gradient([(0, '#fff8dc'), (1, '#f5deb3')], vertical=True, radius=15,
+                      border=3, border_color='#d4a574'))
         help_label.setWordWrap(True)
         help_label.setAlignment(Qt.AlignTop)
         help_label.setMaximumHeight(160)
@@ -336,9 +448,14 @@ class BBBPlayer(QWidget):
         self.queue_widget = QListWidget()
         self.queue_widget.setStyleSheet("font-size: 14px;")
 
+        self.memory_label = QLabel("")
+        self.memory_label.setStyleSheet("font-size: 12px; color: #c38d6b;")
+        self.memory_label.setAlignment(Qt.AlignCenter)
+
         right_panel.addWidget(help_label)
         right_panel.addWidget(queue_title)
         right_panel.addWidget(self.queue_widget, stretch=1)
+        right_panel.addWidget(self.memory_label)
 
         left_container = QWidget()
         left_container.setLayout(left_panel)
@@ -353,6 +470,12 @@ class BBBPlayer(QWidget):
         self.setLayout(main_layout)
         self.list_widget.setFocus()
 
+        # Pulir ahora (reglas de la hoja resueltas antes de mostrar la ventana)
+        started = time.perf_counter()
+        for widget in [self] + self.findChildren(QWidget):
+            widget.ensurePolished()
+        print(f"[STYLE] Hoja aplicada en {(time.perf_counter() - started) * 1000:.1f}ms", flush=True)
+
     def setup_shortcuts(self):
         # Atajos con primera letra en español
         QShortcut(QKeySequence('B'), self, self.focus_search)      # Buscar
@@ -362,11 +485,59 @@ class BBBPlayer(QWidget):
         QShortcut(QKeySequence('P'), self, self.stop_music)        # Parar
         QShortcut(QKeySequence('L'), self, self.clear_queue)       # Limpiar cola
         QShortcut(QKeySequence('Q'), self, self.remove_from_queue) # Quitar de cola
+        QShortcut(QKeySequence('H'), self, self.show_shelf)        # Historial/favoritos
+        QShortcut(QKeySequence('M'), self, self.toggle_favorite)   # Me gusta
+        QShortcut(QKeySequence('D'), self, self.dump_slots)        # Depuración de slots
         QShortcut(QKeySequence(Qt.Key_Escape), self, self.stop_music)
         QShortcut(QKeySequence(Qt.Key_Space), self, self.play_selected)
         QShortcut(QKeySequence('A'), self, self.close)              # Apagar/Salir
         self.list_widget.itemActivated.connect(self.play_video)
 
+    def setup_hw_input(self):
+        """Conecta botones físicos (evdev/GPIO) a las mismas acciones que S/P/R."""
+        try:
+            self.hw_input = create_default_input(self)
+        except Exception as e:
+            print(f"[HW] Error iniciando botones: {e}", flush=True)
+            self.hw_input = None
+        if self.hw_input:
+            self.hw_input.action_triggered.connect(self._on_hw_action)
+            paths = ', '.join(getattr(src, 'path', '?') for src in self.hw_input.sources)
+            print(f"[HW] Botones activos: {paths}", flush=True)
+
+    def _on_hw_action(self, action, pressed_at):
+        """Ejecuta la acción de un botón físico y registra la latencia de despacho."""
+        self.hw_press_time = pressed_at
+        dispatch_ms = (time.time() - pressed_at) * 1000
+        print(f"[HW] {action} (despacho {dispatch_ms:.1f}ms)", flush=True)
+
+        before = self._playback_marker()
+        if action == 'next':
+            self.play_next()
+        elif action == 'stop':
+            self.stop_music()
+            self._report_hw_latency("silencio")
+        elif action == 'play':
+            self.play_selected()
+        unchanged = all(a is b for a, b in zip(before, self._playback_marker()))
+        if self.hw_press_time is not None and unchanged:
+            # Cola vacía, nada seleccionado...: no hay cambio de audio que medir
+            print(f"[HW] {action}: sin cambio de reproducción", flush=True)
+            self.hw_press_time = None
+
+    def _playback_marker(self):
+        """Identidad de lo que suena o se está cargando (para ver si cambió)."""
+        return (self.current_process, self.resolve_job, self.waiting_for_prefetch)
+
+    def _report_hw_latency(self, event):
+        """Registra latencia pulsación física → cambio de audio (una vez por pulsación)."""
+        if self.hw_press_time is None:
+            return
+        latency_ms = (time.time() - self.hw_press_time) * 1000
+        self.hw_press_time = None
+        flag = "OK" if latency_ms <= HW_LATENCY_TARGET_MS else "LENTO"
+        print(f"[HW] botón → {event}: {latency_ms:.1f}ms [{flag}]", flush=True)
+
     def log(self, message, level="INFO"):
         """Add a message to the log terminal. Levels: INFO, WARN, ERROR"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -407,32 +578,45 @@ class BBBPlayer(QWidget):
     # === Slot Management (Double-Buffer) ===
     def get_free_slot(self):
         """Retorna un slot libre o None si ambos ocupados."""
-        with self.slot_lock:
-            for slot in self.slots:
-                if slot.state == 'free':
-                    return slot
+        for slot in self.slots:
+            if slot.state == 'free':
+                return slot
         return None
 
     def get_ready_slot(self, video_link):
         """Retorna slot ready o buffering que coincida con el video, o None."""
-        with self.slot_lock:
-            for slot in self.slots:
-                if slot.state in ('ready', 'buffering') and slot.video_link == video_link:
-                    return slot
+        for slot in self.slots:
+            if slot.state in ('ready', 'buffering') and slot.video_link == video_link:
+                return slot
         return None
 
     def get_prefetching_slot(self, video_link):
         """Retorna slot prefetching que coincida con el video, o None."""
-        with self.slot_lock:
-            for slot in self.slots:
-                if slot.state == 'prefetching' and slot.video_link == video_link:
-                    return slot
+        for slot in self.slots:
+            if slot.state == 'prefetching' and slot.video_link == video_link:
+                return slot
         return None
 
     def _log_slots(self):
         """Log del estado de los slots."""
         for slot in self.slots:
             self._flow(f"  Slot {slot.slot_id}: {slot.state:12} {slot.video_link if slot.video_link else 'None'}")
+        if self.reaper.pending:
+            self._flow(f"  Reaper: {self.reaper.summary()}")
+        if self.pool.running or self.pool.queue:
+            self._flow(f"  Pool: {self.pool.summary()}")
+
+    def dump_slots(self):
+        """Imprime estados, tiempos y tasa de aciertos del prefetch."""
+        if self.search_input.hasFocus():
+            return
+        print(self.slot_metrics.dump(self.slots), flush=True)
+        print(f"Pool: {self.pool.summary()}", flush=True)
+        print(f"Resolver: {self.resolver.coalesce_summary()}", flush=True)
+        print(f"Estilos: {self.styles.summary()}; {self.skin.summary()}", flush=True)
+        if self.proxy:
+            print(f"Proxy: {self.proxy.summary()}", flush=True)
+        self.log(f"🔎 Slots: {self.slot_metrics.summary()}")
 
     def focus_search(self):
         self.search_input.setFocus()
@@ -459,6 +643,7 @@ class BBBPlayer(QWidget):
             self.queue.append(video_info)
             self.update_queue_display()
             self.status_label.setText(f"Encolado: {video_info['title'][:40]}...")
+            self.batch_timer.start()
 
     def update_queue_display(self):
         self.queue_widget.clear()
@@ -472,6 +657,7 @@ class BBBPlayer(QWidget):
         # NO limpiar slots aquí - play_video_from_info() usará los que correspondan
         # y stop_music() limpiará los que no sirvan
         if self.queue:
+            self.skip_pressed_at = time.time()
             video_info = self.queue.pop(0)
             self.update_queue_display()
             self.play_video_from_info(video_info)
@@ -483,18 +669,22 @@ class BBBPlayer(QWidget):
             return
         self.queue.clear()
         self.url_cache.clear()  # Limpiar cache de URLs pre-cargadas
-
-        # Terminar proceso de prefetch
-        if self.prefetch_process:
-            self.prefetch_process.terminate()
-            self.prefetch_process = None
+        self.batch_timer.stop()
+        self.scheduler.cancel('batch')
+        if self.batch_job:
+            self.batch_job.cancel()
+            self.batch_job = None
+
+        # Cancelar resolución de prefetch
+        if self.prefetch_job:
+            self.prefetch_job.cancel()
+            self.prefetch_job = None
         self.prefetch_slot = None
 
         # Limpiar todos los slots
-        with self.slot_lock:
-            for slot in self.slots:
-                if slot != self.current_slot:  # No tocar el que está reproduciendo
-                    slot.cleanup()
+        for slot in self.slots:
+            if slot != self.current_slot:  # No tocar el que está reproduciendo
+                slot.cleanup('cola limpiada')
 
         self.update_queue_display()
         self.status_label.setText("Cola limpiada")
@@ -508,6 +698,58 @@ class BBBPlayer(QWidget):
             self.update_queue_display()
             self.status_label.setText(f"Quitado de cola: {removed['title'][:30]}...")
 
+    # === Cache de URLs ===
+    def _cached_media(self, link, take=False):
+        """Retorna el media en cache si no está por vencer (y lo quita si take)."""
+        media = self.url_cache.get(link)
+        if not media:
+            return None
+        expires = media.get('expires')
+        if expires and expires - time.time() < URL_EXPIRY_MARGIN_S:
+            self._flow(f"  → URL en cache vencida, descartando: {link}")
+            del self.url_cache[link]
+            return None
+        if take:
+            del self.url_cache[link]
+        return media
+
+    def batch_resolve_queue(self):
+        """Resuelve en un solo yt-dlp los videos de la cola sin URL en cache."""
+        if self.batch_job:
+            self.batch_timer.start()  # Reintentar cuando termine el actual
+            return
+
+        prefetching_link = self.prefetch_slot.video_link if self.prefetch_slot else None
+        links = []
+        for video in self.queue:
+            link = video.get('link')
+            if not link or link in links or link == prefetching_link:
+                continue
+            if self._cached_media(link) or self.get_ready_slot(link):
+                continue
+            if self.resolver.in_flight(link):
+                continue
+            links.append(link)
+        if not links:
+            return
+
+        self._flow(f"batch_resolve_queue() - {len(links)} links sin URL")
+        self.batch_size = min(len(links), BATCH_MAX_LINKS)
+        self.batch_job = self.resolver.resolve_batch(links)
+        self.batch_job.media_ready.connect(self._on_batch_media)
+        self.batch_job.finished.connect(self._on_batch_finished)
+
+    def _on_batch_media(self, link, media):
+        if link not in self.url_cache:
+            self.url_cache[link] = media
+
+    def _on_batch_finished(self, resolved):
+        self.batch_job = None
+        self.log(f"📦 {resolved} canciones listas en cache")
+        # La cola puede tener más links que BATCH_MAX_LINKS (sin reintentar fallidos)
+        if self.batch_size >= BATCH_MAX_LINKS and resolved > 0:
+            self.batch_timer.start()
+
     # === Pre-carga Paralela (con Doble-Buffer) ===
     def prefetch_next(self):
         """Pre-cargar la URL del siguiente video en la cola usando un slot libre."""
@@ -517,7 +759,7 @@ class BBBPlayer(QWidget):
         if not self.queue:
             self._flow("  → Sin cola, saliendo")
             return
-        if self.prefetch_process:
+        if self.prefetch_job:
             self._flow("  → Prefetch ya en curso, saliendo")
             return
 
@@ -541,91 +783,96 @@ class BBBPlayer(QWidget):
             return
 
         # Marcar slot como prefetching
-        with self.slot_lock:
-            slot.state = 'prefetching'
-            slot.video_info = next_video
-            slot.video_link = link
+        slot.set_state('prefetching', 'siguiente en cola')
+        slot.video_info = next_video
+        slot.video_link = link
+
+        # Audio local o URL ya resuelta (batch o prefetch anterior): directo a mpv pausado
+        cached = self._local_media(link) or self._cached_media(link)
+        if not cached and not self.network.online:
+            self._flow("  → Sin red y sin audio local, sin prefetch")
+            slot.release('sin red')
+            return
+        if cached:
+            if not self._warm_slot_allowed(slot):
+                self._flow("  → URL en cache, sin memoria para slot precargado")
+                slot.release('sin memoria')
+                return
+            self._flow(f"  → URL en cache, slot {slot.slot_id} directo a mpv pausado")
+            slot.media = cached
+            self.start_paused_mpv(slot, cached['url'])
+            return
 
         self.prefetch_slot = slot
-        self.prefetch_process = QProcess(self)
-        self.prefetch_process.finished.connect(self.on_prefetch_finished)
-
-        cmd_args = ['-f', 'bestaudio[protocol!=m3u8_native]/bestaudio/best', '-g', '--no-warnings', '--socket-timeout', '10', '--retries', '1', '--fragment-retries', '1']
-        if os.path.exists(COOKIES_FILE):
-            cmd_args.extend(['--cookies', COOKIES_FILE])
-        cmd_args.append(link)
-
         self._flow(f"  → Slot {slot.slot_id} prefetching: {next_video.get('title', '')[:30]}...")
         self._flow(f"  → Slot {slot.slot_id} video_link: {link}")
-        self.prefetch_process.start(YTDLP_PATH, cmd_args)
+        self.prefetch_job = self.resolver.resolve(link, PRIORITY_PREFETCH)
+        self.prefetch_job.finished.connect(self.on_prefetch_finished)
 
-    def on_prefetch_finished(self):
+    def on_prefetch_finished(self, output, media, error):
         """Callback cuando termina la pre-carga yt-dlp."""
-        self._flow("on_prefetch_finished()")
+        self._flow(f"on_prefetch_finished() - estrategia {media.get('strategy', 'ninguna')}")
 
         slot = self.prefetch_slot
         if not slot:
             self._flow("  → No hay prefetch_slot, saliendo")
-            self.prefetch_process = None
+            self.prefetch_job = None
             return
 
         waiting_video = self.waiting_for_prefetch
         self.waiting_for_prefetch = None
 
-        if self.prefetch_process:
-            output = self.prefetch_process.readAllStandardOutput().data().decode('utf-8').strip()
-            if output and output.startswith('http'):
-                self.url_cache[slot.video_link] = output
+        if self.prefetch_job:
+            if output:
+                self.url_cache[slot.video_link] = media
+                slot.media = media
                 self._flow(f"  → URL obtenida para slot {slot.slot_id}")
 
                 # Si estábamos esperando este prefetch, reproducir inmediatamente
                 if waiting_video and waiting_video.get('link') == slot.video_link:
                     self._flow(f"  → Estábamos esperando este video, reproduciendo ahora")
-                    with self.slot_lock:
-                        slot.state = 'free'
-                        slot.video_info = None
-                        slot.video_link = None
-                    self.prefetch_process = None
+                    slot.release('usado por reproducción directa', used=True)
+                    self.prefetch_job = None
                     self.prefetch_slot = None
                     # Reproducir usando el cache que acabamos de llenar
                     self.play_video_from_info(waiting_video)
                     return
 
                 # Validar que el video sigue siendo el primero en la cola
-                if self.queue and self.queue[0].get('link') == slot.video_link:
+                in_queue = self.queue and self.queue[0].get('link') == slot.video_link
+                if in_queue and not self._warm_slot_allowed(slot):
+                    # Presupuesto de memoria: solo queda la URL en cache
+                    self._flow("  → Sin memoria para slot precargado, URL queda en cache")
+                    slot.release('sin memoria')
+                elif in_queue:
                     self._flow(f"  → Video sigue en cola, iniciando mpv pausado en slot {slot.slot_id}")
                     self.start_paused_mpv(slot, output)
                 else:
                     self._flow("  → Video ya no está en cola, liberando slot")
-                    with self.slot_lock:
-                        slot.state = 'free'
-                        slot.video_info = None
-                        slot.video_link = None
+                    slot.release('ya no está en cola')
             else:
-                stderr = self.prefetch_process.readAllStandardError().data().decode('utf-8').strip()
-                self._flow(f"  → Prefetch falló: {stderr[:60]}")
-                with self.slot_lock:
-                    slot.state = 'free'
-                    slot.video_info = None
-                    slot.video_link = None
+                self._flow(f"  → Prefetch falló: {error[:60]}")
+                self.network.report_failure()
+                self.cookies.report_failure(error)
+                slot.release('prefetch falló')
 
                 # Si estábamos esperando, intentar con play_next normal
                 if waiting_video:
                     self._flow("  → Prefetch falló pero estábamos esperando, usando fallback")
-                    self.prefetch_process = None
+                    self.prefetch_job = None
                     self.prefetch_slot = None
                     self.play_video_from_info(waiting_video)
                     return
 
-        self.prefetch_process = None
+        self.prefetch_job = None
         self.prefetch_slot = None
 
     def start_paused_mpv(self, slot, url):
         """Inicia mpv pausado en un slot específico."""
         self._flow(f"start_paused_mpv() - slot {slot.slot_id}")
 
-        with self.slot_lock:
-            slot.state = 'buffering'
+        if not slot.set_state('buffering', 'mpv pausado'):
+            return
 
         mpv_args = [
             '--pause',
@@ -634,44 +881,191 @@ class BBBPlayer(QWidget):
             '--msg-level=all=status',
             f'--script-opts=ytdl_hook-ytdl_path={YTDLP_PATH}',
             f'--input-ipc-server={slot.socket_path}',
-            url
+            *profile_args('warm'),
+            *self._gain_args(slot.video_link),
+            self._proxied_url(slot.video_link, slot.media, url)
         ]
 
         slot.process = QProcess(self)
         slot.process.setProcessChannelMode(QProcess.MergedChannels)
-        slot.process.started.connect(lambda: self._on_slot_buffering_started(slot))
         slot.process.start('mpv', mpv_args)
+        slot.started_at = time.time()
         self._flow(f"  → mpv iniciado en slot {slot.slot_id} (socket: {slot.socket_path})")
 
-    def _on_slot_buffering_started(self, slot):
-        """Callback cuando mpv empieza a hacer buffering."""
-        with self.slot_lock:
-            if slot.state == 'buffering':
-                slot.state = 'ready'
-        self._flow(f"  → Slot {slot.slot_id} ahora READY")
-        self.log("⏸️ Siguiente listo")
+        # Ready real: caché y salida de audio reportadas por mpv
+        ipc = MpvIpc(slot.socket_path, self)
+        ipc.property_changed.connect(
+            lambda name, value: self._on_slot_property(slot, ipc, name, value))
+        for name in ('current-ao', 'demuxer-cache-time', 'demuxer-cache-idle', 'core-idle'):
+            ipc.observe(name)
+        slot.ipc = ipc
+        slot.props = {}
+
+    def _on_slot_property(self, slot, ipc, name, value):
+        """Propiedad observada de un slot: pasa a ready o detecta el primer sample."""
+        if slot.ipc is not ipc:
+            return  # mpv anterior de este slot
+        slot.props[name] = value
+
+        if slot.state == 'buffering' and slot.is_buffered():
+            slot.set_state('ready', 'audio en caché')
+            elapsed = time.time() - slot.started_at
+            cache_time = slot.props.get('demuxer-cache-time') or 0
+            self._flow(f"  → Slot {slot.slot_id} ahora READY ({elapsed:.1f}s, "
+                       f"{cache_time:.1f}s en caché, ao {slot.props.get('current-ao')})")
+            self.log("⏸️ Siguiente listo")
+        elif name == 'core-idle' and value is False and slot.state == 'playing':
+            self._report_skip_latency("slot")
+            self._report_transition_gap()
+
+    def _promote_slot(self, slot, link, title):
+        """Convierte un slot ya despausado en la reproducción actual."""
+        # Reconectar signals
+        slot.process.finished.connect(self.on_playback_finished)
+        slot.process.readyReadStandardOutput.connect(self.on_mpv_output)
+
+        slot.set_state('playing', 'promovido')
+        self.current_slot = slot
+        self.current_process = slot.process
+
+        self.current_title = title
+        if slot.video_info:
+            self.library.record_play(slot.video_info)
+        self._begin_transfer(slot.process, link, slot.media)
+        self.load_start_time = time.time()
+        self.playback_started = True
+        self.is_loading = False
+        self.progress_bar.setRange(0, 100)
+
+        self.status_label.setText(f"⚡ {self.current_title[:50]}")
+        self.styles.set(self.status_label, 'playing')
+        self.log(f"⚡ Instantáneo: {self.current_title[:30]}...")
+        self._report_hw_latency("audio (slot listo)")
+
+        # Pre-cargar el siguiente cuando haya caché suficiente
+        self._flow("  → Programando prefetch_next() para pre-cargar siguiente")
+        self.scheduler.attach(slot.socket_path)
+        self.transitions.attach(slot.socket_path)
+        self.seeker.attach(slot.socket_path)
+        self.scheduler.submit('prefetch', self.prefetch_next, needs_network=False)
+        self._queue_loudness(link, slot.media)
+
+    # === Seek (ver seek.py) ===
+    def _on_seek_requested(self, fraction, final):
+        if not self.current_process or self.transitions.in_progress() or self.is_loading:
+            return
+        if final:
+            self.progress_view.reset()  # La barra muestra el destino elegido
+        if self.seeker.request(fraction, final) and final:
+            target = fraction * self.seeker.duration
+            self._flow(f"seek → {int(target) // 60}:{int(target) % 60:02d}")
+
+    def _on_seeked(self, target, latency_ms, cached):
+        self._flow(f"  → Seek: audio en {latency_ms:.0f}ms "
+                   f"({'caché' if cached else 'proxy/red'}; {self.seeker.summary()})")
+
+    # === Transiciones (ver transitions.py) ===
+    def _on_transition_due(self, remaining):
+        """Faltan pocos segundos: arrancar el slot siguiente si está listo."""
+        if not self.queue or not self.current_process:
+            return
+        next_link = self.queue[0].get('link')
+        slot = self.get_ready_slot(next_link)
+        if not slot or slot.state != 'ready':
+            self._flow("  → Transición: siguiente no está READY, corte al terminar")
+            return
+
+        kind = 'crossfade' if self.transitions.crossfade_s > 0 else 'gapless'
+        self._flow(f"_on_transition_due() - {kind}, quedan {remaining:.2f}s")
+
+        # El mpv saliente deja de ser el actual: sin callbacks de fin/salida
+        outgoing_process, outgoing_slot = self.current_process, self.current_slot
+        for sig in (outgoing_process.finished, outgoing_process.readyReadStandardOutput,
+                    outgoing_process.readyReadStandardError):
+            try:
+                sig.disconnect()
+            except TypeError:
+                pass
+        if outgoing_slot:
+            outgoing_slot.set_state('fading', kind)
+        self._end_transfer()
+        self.scheduler.detach()
+        self.current_process = None
+        self.current_slot = None
+
+        start_volume = 0 if kind == 'crossfade' else None
+        if not self.unpause_slot(slot, volume=start_volume):
+            self._finish_outgoing(outgoing_process, outgoing_slot)
+            return
+        self.transitions.begin(slot.ipc, remaining, lambda aborted: self._finish_outgoing(
+            outgoing_process, outgoing_slot, prefetch=not aborted))
+        self.transition_end_at = self.transitions.outgoing_end_at
+        self.transition_kind = kind
+
+        self.queue.pop(0)
+        self.update_queue_display()
+        self._promote_slot(slot, next_link, slot.video_info.get('title', 'Sin título'))
+
+    def _finish_outgoing(self, process, slot, prefetch=True):
+        """Termina el mpv saliente de una transición y libera su slot.
+
+        prefetch=False cuando la transición se cortó (stop/siguiente): el
+        planificador está desacoplado y un prefetch arrancaría ya.
+        """
+        if slot:
+            slot.cleanup('transición terminada')
+        else:
+            self.reaper.reap(process, 'mpv saliente')
+        if prefetch:
+            # El slot liberado permite pre-cargar el siguiente
+            self.scheduler.submit('prefetch', self.prefetch_next, needs_network=False)
+
+    def _report_transition_gap(self):
+        """Registra el silencio (o solapamiento, negativo) entre canciones."""
+        if self.transition_end_at is None:
+            return
+        gap_ms = (time.time() - self.transition_end_at) * 1000
+        kind = self.transition_kind
+        self.transition_end_at = None
+        self.transition_kind = None
+        print(f"[DEBUG] Transición {kind}: gap {gap_ms:+.0f}ms"
+              f"{' (solapado)' if gap_ms < 0 else ''}", flush=True)
+
+    def _report_skip_latency(self, path):
+        """Registra latencia S (siguiente) → primer sample (una vez por pulsación)."""
+        if self.skip_pressed_at is None:
+            return
+        latency_ms = (time.time() - self.skip_pressed_at) * 1000
+        self.skip_pressed_at = None
+        flag = "OK" if latency_ms <= SKIP_LATENCY_TARGET_MS else "LENTO"
+        print(f"[LATENCIA] S → primer sample ({path}): {latency_ms:.0f}ms [{flag}]", flush=True)
 
-    def unpause_slot(self, slot):
-        """Despausa un slot via IPC socket. Retorna True si exitoso."""
+    def unpause_slot(self, slot, volume=None):
+        """Despausa un slot via IPC (opcionalmente con otro volumen). True si exitoso."""
         self._flow(f"unpause_slot() - slot {slot.slot_id}")
 
         if not slot.process:
             self._flow("  → No hay proceso en el slot, retornando False")
             return False
 
-        try:
-            self._flow(f"  → Conectando a socket {slot.socket_path}")
-            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            sock.settimeout(1.0)
-            sock.connect(slot.socket_path)
-            sock.send(b'{"command":["set_property","pause",false]}\n')
-            sock.close()
-            self._flow("  → Comando de despause enviado OK")
-            return True
-        except Exception as e:
-            self._flow(f"  → Error despausando slot {slot.slot_id}: {e}")
+        if not slot.ipc or slot.process.state() == QProcess.NotRunning:
+            self._flow("  → mpv del slot no está corriendo, retornando False")
             return False
 
+        if slot.state == 'buffering':
+            cache_time = slot.props.get('demuxer-cache-time') or 0
+            self._flow(f"  → Slot aún en buffering ({cache_time:.1f}s en caché), despausando igual")
+
+        # Despausar primero; después pasar del perfil warm al playing.
+        # Sin bloquear: si el socket aún conecta, los comandos quedan en cola.
+        if volume is not None:
+            slot.ipc.set_property('volume', volume)
+        slot.ipc.set_property('pause', False)
+        for name, value in profile_properties('playing', self.memory.cache_limits()).items():
+            slot.ipc.set_property(name, value)
+        self._flow("  → Despause y perfil playing enviados")
+        return True
+
     def keyPressEvent(self, event):
         key = event.key()
 
@@ -704,21 +1098,174 @@ class BBBPlayer(QWidget):
 
         self.status_label.setText("🔍 Buscando...")
         self.list_widget.clear()
+        if self.search_job:
+            self.search_job.cancel()   # Resultados viejos ya no sirven
+            self.search_job = None
+        self.thumb_worker.prioritize([])  # Cancelar miniaturas de la búsqueda anterior
+        self.speculation.cancel()
         self.log(f"Buscando: {query}")
 
-        self.search_thread = SearchThread(query)
-        self.search_thread.results_ready.connect(self.handle_results)
-        self.search_thread.error_occurred.connect(lambda e: self.log(f"Error búsqueda: {e}", "ERROR"))
-        self.search_thread.start()
+        if not self.network.online:
+            # Sin red: buscar en el historial/favoritos local
+            results = self.library.search(query)
+            self.handle_results(results)
+            self.status_label.setText(f"📴 Sin red: {len(results)} canciones guardadas")
+            return
+
+        self.search_job = self.pool.run_thread(PRIORITY_SEARCH, 'search',
+                                               lambda token: search_youtube(query, token))
+        self.search_job.finished.connect(self.handle_results)
+        self.search_job.failed.connect(self._on_search_failed)
+
+    def _on_search_failed(self, error):
+        self.log(f"Error búsqueda: {error}", "ERROR")
+        self.handle_results([])
 
     def handle_results(self, results):
         self.video_data_list = results
         self.status_label.setText(f"Encontrados {len(results)} resultados.")
 
         for vid in results:
-            title = vid.get('title') or 'Sin título'
-            duration = vid.get('duration') or 'N/A'
-            self.list_widget.addItem(f"{title} - [{duration}]")
+            if 'favorite' not in vid and vid.get('link'):
+                vid['favorite'] = self.library.is_favorite(vid['link'])
+            self.list_widget.addItem(self._result_text(vid))
+            pixmap = self.thumb_cache.get(vid.get('id'))
+            if pixmap:
+                self.list_widget.item(self.list_widget.count() - 1).setIcon(QIcon(pixmap))
+
+        # Esperar al layout para saber qué filas se ven
+        QTimer.singleShot(0, self._request_visible_thumbnails)
+
+        # Resolver por adelantado los primeros resultados
+        self.speculation.set_results([vid.get('link') for vid in results])
+
+    def _result_text(self, vid):
+        title = vid.get('title') or 'Sin título'
+        duration = vid.get('duration') or 'N/A'
+        star = "⭐ " if vid.get('favorite') else ""
+        return f"{star}{title} - [{duration}]"
+
+    # === Historial y favoritos (ver library.py) ===
+    def show_shelf(self):
+        """Muestra favoritos y últimos escuchados desde la base local."""
+        if self.search_input.hasFocus():
+            return
+        shelf = self.library.shelf()
+        if not shelf:
+            return
+        self.list_widget.clear()
+        self.thumb_worker.prioritize([])
+        self.speculation.cancel()
+        self.handle_results(shelf)
+        self.status_label.setText(f"📚 {len(shelf)} canciones tuyas")
+        self.list_widget.setCurrentRow(0)
+
+    def toggle_favorite(self):
+        if self.search_input.hasFocus():
+            return
+        row = self.list_widget.currentRow()
+        if row < 0 or row >= len(self.video_data_list):
+            return
+        vid = self.video_data_list[row]
+        if not vid.get('link'):
+            return
+        vid['favorite'] = self.library.toggle_favorite(vid)
+        self.list_widget.item(row).setText(self._result_text(vid))
+        if vid['favorite']:
+            self.log(f"⭐ Favorito: {vid.get('title', '')[:30]}")
+            self._warm_favorites()
+        else:
+            self.log(f"Quitado de favoritos: {vid.get('title', '')[:30]}")
+
+    def _warm_favorites(self):
+        """Programa la descarga de favoritos sin audio local."""
+        missing = self.favorite_warmer.refresh()
+        if missing:
+            self._flow(f"  → {missing} favoritos sin audio local")
+            self.favorite_warmer.schedule()
+
+    def _on_network_changed(self, online):
+        self.scheduler.set_blocked(not online)
+        self.thumb_worker.offline = not online
+        self.cookies.set_online(online)
+        if online:
+            self.log("📶 Red de nuevo")
+            self._warm_favorites()
+        else:
+            self.log("📴 Sin red: solo canciones guardadas", "WARN")
+            self.status_label.setText("📴 Sin red: solo canciones guardadas (⭐)")
+
+    def _on_cookies_changed(self, state, message):
+        """Avisar antes de que una canción falle por cookies vencidas."""
+        if state == 'ok':
+            if self.cookies.reloads > 1:
+                self.log(f"🍪 {message}")
+            return
+        self.log(f"🍪 {message}", "WARN")
+        if state in ('expired', 'rejected') and not self.current_process and not self.is_loading:
+            self.status_label.setText(f"⚠️ {message}")
+            self.styles.set(self.status_label, 'waiting')
+
+    def _local_media(self, link):
+        """Media de un favorito descargado, o None."""
+        path = self.library.audio_path(link)
+        if not path:
+            return None
+        return {'url': path, 'format_id': None, 'acodec': None, 'abr': None,
+                'duration': None, 'expected_bytes': None, 'expires': None,
+                'strategy': 'local'}
+
+    # === Resolución especulativa (ver speculation.py) ===
+    def _on_result_highlighted(self, row):
+        if 0 <= row < len(self.video_data_list):
+            self.speculation.set_highlighted(self.video_data_list[row].get('link'))
+
+    def _is_url_known(self, link):
+        return (bool(self._cached_media(link)) or self.get_ready_slot(link) is not None
+                or self.resolver.in_flight(link)
+                or self.library.audio_path(link) is not None)
+
+    def _on_speculative_media(self, link, media):
+        if link in self.url_cache:
+            return
+        self.url_cache[link] = media
+        queued = {video.get('link') for video in self.queue}
+        for old_link in list(self.url_cache):
+            if len(self.url_cache) <= URL_CACHE_MAX:
+                break
+            if old_link not in queued:
+                del self.url_cache[old_link]
+
+    # === Miniaturas (ver thumbnails.py) ===
+    def _visible_rows(self, margin=2):
+        """Rango de filas visibles en list_widget, más un margen."""
+        count = self.list_widget.count()
+        if count == 0:
+            return range(0)
+        viewport = self.list_widget.viewport().rect()
+        first = self.list_widget.indexAt(viewport.topLeft()).row()
+        last = self.list_widget.indexAt(viewport.bottomLeft()).row()
+        first = 0 if first < 0 else first
+        last = count - 1 if last < 0 else last
+        return range(max(0, first - margin), min(count, last + margin + 1))
+
+    def _request_visible_thumbnails(self):
+        """Pide al worker solo las miniaturas visibles; cancela el resto."""
+        visible = []
+        for row in self._visible_rows():
+            if row >= len(self.video_data_list):
+                break
+            vid = self.video_data_list[row]
+            key = vid.get('id')
+            if key and vid.get('thumbnail') and self.thumb_cache.get(key) is None:
+                visible.append((key, vid['thumbnail']))
+        self.thumb_worker.prioritize(visible)
+
+    def _on_thumbnail_ready(self, key, image):
+        pixmap = self.thumb_cache.put(key, image)
+        for row, vid in enumerate(self.video_data_list):
+            if vid.get('id') == key and row < self.list_widget.count():
+                self.list_widget.item(row).setIcon(QIcon(pixmap))
 
     def play_video(self, item):
         index = self.list_widget.row(item)
@@ -742,36 +1289,15 @@ class BBBPlayer(QWidget):
             self._stop_current_playback_only()
 
             if self.unpause_slot(ready_slot):
-                # Reconectar signals
-                ready_slot.process.finished.connect(self.on_playback_finished)
-                ready_slot.process.readyReadStandardOutput.connect(self.on_mpv_output)
-
-                with self.slot_lock:
-                    ready_slot.state = 'playing'
-                self.current_slot = ready_slot
-                self.current_process = ready_slot.process
-
-                self.current_title = video_info.get('title') or 'Sin título'
-                self.load_start_time = time.time()
-                self.playback_started = True
-                self.is_loading = False
-                self.progress_bar.setRange(0, 100)
-
-                self.status_label.setText(f"⚡ {self.current_title[:50]}")
-                self.status_label.setStyleSheet("font-size: 18px; color: #6ba36e;")
-                self.log(f"⚡ Instantáneo: {self.current_title[:30]}...")
-
-                # Pre-cargar el siguiente
-                self.prefetch_next()
+                self._promote_slot(ready_slot, link, video_info.get('title') or 'Sin título')
                 return
             else:
                 self._flow(f"  → Unpause falló, liberando slot y continuando")
-                with self.slot_lock:
-                    ready_slot.cleanup()
+                ready_slot.cleanup('despause falló')
 
         # Verificar si hay un prefetch en curso para ESTE video
         prefetching_slot = self.get_prefetching_slot(link)
-        # También verificar si el prefetch_process actual es para este video
+        # También verificar si el prefetch_job actual es para este video
         if not prefetching_slot and self.prefetch_slot and self.prefetch_slot.video_link == link:
             prefetching_slot = self.prefetch_slot
 
@@ -795,11 +1321,21 @@ class BBBPlayer(QWidget):
             self.progress_bar.setValue(0)
             self.progress_bar.setRange(0, 0)
             self.time_label.setText("Cargando...")
+            self.progress_view.reset()
             self.load_start_time = time.time()
             self.status_label.setText(f"⏳ Esperando: {self.current_title[:40]}...")
-            self.status_label.setStyleSheet("font-size: 18px; color: #c9886a;")
+            self.styles.set(self.status_label, 'waiting')
             self.log(f"⏳ Esperando prefetch: {self.current_title[:30]}...")
             self.waiting_for_prefetch = video_info
+            self.slot_metrics.waits += 1
+            return
+
+        # Sin red solo suena lo guardado: fallar ya, sin cortar lo que suena
+        if not self.network.online and not self._local_media(link):
+            self._flow("  → Sin red y sin audio local")
+            self.status_label.setText("📴 Sin red: solo canciones guardadas (⭐)")
+            self.styles.set(self.status_label, 'waiting')
+            self.log("📴 Sin red: esta canción no está guardada", "WARN")
             return
 
         self._flow("  → Llamando stop_music()")
@@ -812,71 +1348,76 @@ class BBBPlayer(QWidget):
         self.progress_bar.setValue(0)
         self.progress_bar.setRange(0, 0)  # Indeterminate mode
         self.time_label.setText("Cargando...")
+        self.progress_view.reset()
 
         # DEBUG: Start timing
         self.load_start_time = time.time()
 
-        # Obtener URL directa del cache
-        direct_url = self.url_cache.pop(link, None)
+        # Audio local de favoritos, o URL directa del cache
+        media = self._local_media(link) or self._cached_media(link, take=True)
 
-        if direct_url:
+        if media:
             # URL en cache - reproducir inmediatamente
             self._flow("  → Cache HIT! URL directa disponible")
+            if media.get('strategy') == 'speculative':
+                self.speculation.hits += 1
+                self._flow(f"  → Acierto especulativo ({self.speculation.summary()})")
             self.status_label.setText(f"⚡ {self.current_title[:50]}")
-            self.status_label.setStyleSheet("font-size: 18px; color: #6ba36e;")
+            self.styles.set(self.status_label, 'playing')
             self.log(f"⚡ Cache hit: {self.current_title[:30]}...")
-            self._start_mpv_with_url(direct_url)
+            self._start_mpv_with_url(media['url'], media, link, video_info)
         else:
             # Resolver URL con yt-dlp asíncrono (no bloquea UI)
             self._flow("  → Cache MISS - iniciando yt-dlp asíncrono")
             self.status_label.setText(f"⏳ Cargando: {self.current_title[:50]}...")
-            self.status_label.setStyleSheet("font-size: 18px; color: #c9886a;")
+            self.styles.set(self.status_label, 'waiting')
             self.log(f"🔄 yt-dlp: {self.current_title[:30]}...")
 
             self.resolve_video_info = video_info
-            self.resolve_process = QProcess(self)
-            self.resolve_process.finished.connect(self._on_resolve_finished)
-
-            cmd_args = ['-f', 'bestaudio[protocol!=m3u8_native]/bestaudio/best', '-g', '--no-warnings', '--socket-timeout', '10', '--retries', '1', '--fragment-retries', '1']
-            if os.path.exists(COOKIES_FILE):
-                cmd_args.extend(['--cookies', COOKIES_FILE])
-            cmd_args.append(link)
-
             self._flow("  → Ejecutando yt-dlp asíncrono")
-            self.resolve_process.start(YTDLP_PATH, cmd_args)
+            self.resolve_job = self.resolver.resolve(link)
+            self.resolve_job.finished.connect(self._on_resolve_finished)
 
-    def _on_resolve_finished(self):
+    def _on_resolve_finished(self, output, media, error):
         """Callback cuando yt-dlp termina de resolver la URL."""
-        self._flow("_on_resolve_finished()")
+        self._flow(f"_on_resolve_finished() - estrategia {media.get('strategy', 'ninguna')}")
 
-        if not self.resolve_process:
-            self._flow("  → No hay resolve_process, saliendo")
+        if not self.resolve_job:
+            self._flow("  → No hay resolve_job, saliendo")
             return
 
-        output = self.resolve_process.readAllStandardOutput().data().decode('utf-8').strip()
-
-        if output and output.startswith('http'):
+        if output:
             self._flow("  → URL resuelta OK, llamando _start_mpv_with_url()")
-            self._start_mpv_with_url(output)
+            self._start_mpv_with_url(output, media, self.resolve_video_info.get('link'),
+                                     self.resolve_video_info)
         else:
-            stderr = self.resolve_process.readAllStandardError().data().decode('utf-8').strip()
-            self._flow(f"  → yt-dlp falló: {stderr[:60]}")
+            self._flow(f"  → yt-dlp falló: {error[:60]}")
+            self._flow(f"  → Estadísticas: {self.resolver.stats.summary()}")
+            self._flow(f"  → Coalescencia: {self.resolver.coalesce_summary()}")
+            self.network.report_failure()
+            self.cookies.report_failure(error)
             self.log("Error obteniendo URL", "ERROR")
+            self.hw_press_time = None  # La pulsación no terminó en audio
             self.is_loading = False
             self.progress_bar.setRange(0, 100)
 
-        self.resolve_process = None
+        self.resolve_job = None
         self.resolve_video_info = None
 
-    def _start_mpv_with_url(self, direct_url):
-        """Inicia mpv con una URL directa."""
+    def _start_mpv_with_url(self, direct_url, media=None, link=None, video_info=None):
+        """Inicia mpv con una URL directa. La reproducción se registra acá, una vez."""
         self._flow("_start_mpv_with_url()")
 
+        self.play_socket_seq += 1
+        socket_path = f'/tmp/mpv_ytplayer_play_{self.play_socket_seq}'
         mpv_args = [
             '--no-video',
             '--term-osd-bar=no',
             '--msg-level=all=status',
-            direct_url
+            f'--input-ipc-server={socket_path}',
+            *profile_args('playing', self.memory.cache_limits()),
+            *self._gain_args(link),
+            self._proxied_url(link, media, direct_url)
         ]
 
         self._flow("  → Creando QProcess para mpv")
@@ -886,15 +1427,209 @@ class BBBPlayer(QWidget):
         self.current_process.setProcessChannelMode(QProcess.MergedChannels)
         self.current_process.readyReadStandardOutput.connect(self.on_mpv_output)
         self.current_process.start('mpv', mpv_args)
-        self._flow("  → mpv iniciado, llamando prefetch_next()")
+        if video_info:
+            self.library.record_play(video_info)
+        self._begin_transfer(self.current_process, link, media)
+        self._flow("  → mpv iniciado, programando prefetch_next()")
+
+        # Pre-cargar el siguiente en la cola cuando haya caché suficiente
+        self.scheduler.attach(socket_path)
+        self.transitions.attach(socket_path)
+        self.seeker.attach(socket_path)
+        self.scheduler.submit('prefetch', self.prefetch_next, needs_network=False)
+        self._queue_loudness(link, media)
+
+    def _proxied_url(self, link, media, url):
+        """URL local del proxy de rangos para una URL remota (ver stream_proxy.py)."""
+        if not self.proxy or not link or not url.startswith('http'):
+            return url
+        format_id = (media or {}).get('format_id') or 'default'
+        local_url = self.proxy.register(f'{video_id(link)}_{format_id}', url)
+        cached = self.proxy.cached_bytes(f'{video_id(link)}_{format_id}')
+        if cached:
+            self._flow(f"  → Proxy: {cached / 1024:.0f}KB ya en caché")
+        return local_url
+
+    # === Trabajo de fondo (ver prefetch_scheduler.py) ===
+    def _pause_background(self):
+        """Congela prefetch, batch y slots en buffering. Retorna cuántos se pausaron."""
+        count = 0
+        if self.prefetch_job and self.prefetch_job.running:
+            self.prefetch_job.set_paused(True)
+            count += 1
+        if self.batch_job and self.batch_job.process:
+            self.batch_job.set_paused(True)
+            count += 1
+        if self.loudness.job:
+            self.loudness.set_paused(True)
+            count += 1
+        if self.speculation.job:
+            self.speculation.set_paused(True)
+            count += 1
+        if self.favorite_warmer.job:
+            self.favorite_warmer.set_paused(True)
+            count += 1
+        for slot in self.slots:
+            if slot is self.current_slot or not slot.process:
+                continue
+            if slot.state in ('buffering', 'ready'):
+                pid = slot.process.processId()
+                if pid > 0:
+                    os.kill(pid, signal.SIGSTOP)
+                    self.frozen_pids.add(pid)
+                    count += 1
+        if count:
+            self.log("🐢 Red lenta: pausando pre-carga", "WARN")
+        return count
+
+    def _resume_background(self):
+        if self.prefetch_job:
+            self.prefetch_job.set_paused(False)
+        if self.batch_job:
+            self.batch_job.set_paused(False)
+        if self.loudness.paused:
+            self.loudness.set_paused(False)
+        if self.speculation.paused:
+            self.speculation.set_paused(False)
+        if self.favorite_warmer.paused:
+            self.favorite_warmer.set_paused(False)
+        for pid in self.frozen_pids:
+            try:
+                os.kill(pid, signal.SIGCONT)
+            except OSError:
+                pass
+        self.frozen_pids.clear()
+
+    # === Presupuesto de memoria (ver memory_governor.py) ===
+    def _warm_slot_allowed(self, slot):
+        """True si el nivel de memoria permite otro mpv pausado además de slot."""
+        warm = [s for s in self.slots
+                if s is not slot and s is not self.current_slot and s.process
+                and s.state in ('buffering', 'ready')]
+        return len(warm) < self.memory.max_warm_slots()
+
+    def _on_memory_sampled(self, stats):
+        text = self.memory.summary()
+        if stats['level'] != 'normal':
+            text += f" ⚠ {stats['level']}"
+        if self.pool.is_saturated:
+            text += f" ⏳ {self.pool.depth()} en cola"
+        if self.memory_label.text() != text:
+            self.memory_label.setText(text)
+
+    def _on_memory_level(self, level, previous):
+        """Aplica las políticas del nivel nuevo."""
+        if LEVELS_ORDER[level] <= LEVELS_ORDER[previous]:
+            self.log(f"🧠 Memoria {level}")
+            return
 
-        # Pre-cargar el siguiente en la cola
-        self.prefetch_next()
+        # Soltar caches de la UI y devolver el heap al sistema
+        self.thumb_cache.clear()
+        QPixmapCache.clear()
+        release_heap()
+
+        # Achicar la caché del mpv que suena (las opciones demuxer-* son propiedades)
+        if self.scheduler.ipc:
+            max_bytes, back_bytes = self.memory.cache_limits()
+            self.scheduler.ipc.set_property('demuxer-max-bytes', max_bytes)
+            self.scheduler.ipc.set_property('demuxer-max-back-bytes', back_bytes)
+
+        # Liberar slots precargados que excedan el nuevo límite
+        warm = [s for s in self.slots
+                if s is not self.current_slot and s.process and s.state in ('buffering', 'ready')]
+        for slot in warm[self.memory.max_warm_slots():]:
+            self._flow(f"  → Memoria {level}: liberando slot {slot.slot_id}")
+            self.frozen_pids.discard(slot.process.processId())
+            slot.cleanup('memoria')
+        self.log(f"🧠 Memoria {level}: caché reducida", "WARN")
+
+    # === Normalización de volumen (ver loudness.py) ===
+    def _gain_args(self, link):
+        """Argumentos de ganancia para mpv según el índice de sonoridad."""
+        if not link:
+            return []
+        gain = self.loudness.gain_db(video_id(link))
+        if gain is not None:
+            self._flow(f"  → Ganancia {gain:+.1f}dB")
+        return mpv_gain_args(gain)
+
+    def _queue_loudness(self, link, media):
+        """Programa la medición de la canción que suena, como trabajo de fondo.
+
+        Llamar después de scheduler.attach(): con el planificador sin mpv
+        adjunto el trabajo arrancaría ya, compitiendo con el arranque.
+        """
+        if not link or not media or not media.get('url'):
+            return
+        vid = video_id(link)
+        if vid in self.loudness.index:
+            return
+        url = media['url']
+        needs_network = not os.path.exists(url)
+        if needs_network and self.proxy:
+            # Leer del proxy: lo que mpv ya bajó se sirve de disco, no se baja otra vez
+            key = f"{vid}_{media.get('format_id') or 'default'}"
+            url = self.proxy.register(key, url)
+            expected = media.get('expected_bytes')
+            needs_network = not (expected and self.proxy.cached_bytes(key) >= expected)
+        self.scheduler.submit(f'loudness {vid}', lambda: self.loudness.analyze(vid, url),
+                              needs_network=needs_network)
+
+    # === Bytes transferidos por canción ===
+    def _begin_transfer(self, process, link, media):
+        """Empieza a contar bytes del mpv de la canción actual."""
+        self._end_transfer()
+        media = media or {}
+        self.transfer = {
+            'link': link,
+            'title': self.current_title,
+            'format_id': media.get('format_id'),
+            'acodec': media.get('acodec'),
+            'abr': media.get('abr'),
+            'expected_bytes': media.get('expected_bytes'),
+            'pid': process.processId(),
+            'bytes': 0,
+            'sampled_at': 0,
+        }
+
+    def _sample_transfer(self):
+        """Lee /proc/<pid>/io como mucho una vez por segundo."""
+        if not self.transfer:
+            return
+        now = time.time()
+        if now - self.transfer['sampled_at'] < 1.0:
+            return
+        self.transfer['sampled_at'] = now
+        read_bytes = read_process_bytes(self.transfer['pid'])
+        if read_bytes is not None:
+            self.transfer['bytes'] = read_bytes
+
+    def _end_transfer(self):
+        """Registra los bytes de la canción que termina."""
+        if not self.transfer:
+            return
+        self.transfer['sampled_at'] = 0
+        self._sample_transfer()
+        entry = self.transfer
+        self.transfer = None
+        entry.pop('pid')
+        entry.pop('sampled_at')
+
+        expected = entry['expected_bytes']
+        expected_str = f"{expected / 1024:.0f}KB" if expected else "?"
+        print(f"[BYTES] {entry['title'][:30]}: {entry['bytes'] / 1024:.0f}KB "
+              f"(esperado {expected_str}, formato {entry['format_id']} "
+              f"{entry['acodec']} {entry['abr'] or 0:.0f}kbps)", flush=True)
+        self.transfer_log.record(entry)
+        if self.proxy:
+            print(f"[PROXY] {self.proxy.summary()}", flush=True)
 
     def on_mpv_output(self):
         if not self.current_process:
             return
 
+        self._sample_transfer()
+
         data = self.current_process.readAllStandardOutput().data().decode('utf-8', errors='ignore')
 
         # DEBUG: Log timing for key events
@@ -918,6 +1653,7 @@ class BBBPlayer(QWidget):
                 line = line.strip()
                 if line and ('error' in line.lower() or 'failed' in line.lower() or 'bot' in line.lower()):
                     self.log(line[:60], "ERROR")
+                    self.cookies.report_failure(line)
 
         time_match = re.search(r'A[V]?:\s*(\d+:\d+:\d+|\d+:\d+)\s*/\s*(\d+:\d+:\d+|\d+:\d+)', data)
 
@@ -928,32 +1664,23 @@ class BBBPlayer(QWidget):
                     elapsed = time.time() - self.load_start_time
                     print(f"[DEBUG] T+{elapsed:.2f}s: ✅ AUDIO STARTED", flush=True)
                     self.log(f"⏱️ Cargó en {elapsed:.1f}s")
+                self._report_hw_latency("audio")
+                self._report_skip_latency("sin slot")
+                self._report_transition_gap()
 
                 self.is_loading = False
                 self.playback_started = True
                 self.status_label.setText(f"▶ {self.current_title[:50]}")
-                self.status_label.setStyleSheet("font-size: 18px; color: #6ba36e;")
+                self.styles.set(self.status_label, 'playing')
                 self.progress_bar.setRange(0, 100)
 
             current_time = time_match.group(1)
             total_time = time_match.group(2)
 
-            self.time_label.setText(f"{current_time} / {total_time}")
-
-            current_secs = self.time_to_seconds(current_time)
-            total_secs = self.time_to_seconds(total_time)
+            if self.progress_bar.dragging:
+                return  # No pisar la posición que el usuario está eligiendo
 
-            if total_secs > 0:
-                percent = int((current_secs / total_secs) * 100)
-                self.progress_bar.setValue(percent)
-
-    def time_to_seconds(self, time_str):
-        parts = time_str.split(':')
-        if len(parts) == 2:
-            return int(parts[0]) * 60 + int(parts[1])
-        elif len(parts) == 3:
-            return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-        return 0
+            self.progress_view.update(current_time, total_time)
 
     def on_playback_finished(self):
         self._flow("on_playback_finished()")
@@ -961,19 +1688,28 @@ class BBBPlayer(QWidget):
         self._flow(f"  → Cola: {len(self.queue)} items")
         self._log_slots()
 
+        self._end_transfer()
+        self.scheduler.detach()
+        self.transitions.detach()
+        self.seeker.detach()
+        self.transition_end_at = time.time() if self.queue else None
+        self.transition_kind = 'corte'
+
         # Liberar slot actual
         if self.current_slot:
             self._flow(f"  → Liberando slot {self.current_slot.slot_id}")
-            with self.slot_lock:
-                self.current_slot.cleanup()
+            self.current_slot.cleanup('terminó')
             self.current_slot = None
 
+        # Liberar el QProcess terminado (no-op si era el del slot)
+        self.reaper.reap(self.current_process, 'mpv')
         self.current_process = None
         self.is_loading = False
         self.progress_bar.setValue(0)
         self.progress_bar.setRange(0, 100)
         self.time_label.setText("--:-- / --:--")
-        self.status_label.setStyleSheet("font-size: 18px; color: #8b7355;")
+        self.progress_view.reset()
+        self.styles.set(self.status_label, 'idle')
 
         if not self.queue:
             self._flow("  → Cola vacía, reproducción terminada")
@@ -990,42 +1726,20 @@ class BBBPlayer(QWidget):
             self._flow(f"  → Slot {ready_slot.slot_id} está READY, intentando unpause")
             if self.unpause_slot(ready_slot):
                 self._flow(f"  → Unpause exitoso! Usando slot {ready_slot.slot_id}")
-
-                # Reconectar signals
-                ready_slot.process.finished.connect(self.on_playback_finished)
-                ready_slot.process.readyReadStandardOutput.connect(self.on_mpv_output)
-
-                # Actualizar estado del slot
-                with self.slot_lock:
-                    ready_slot.state = 'playing'
-                self.current_slot = ready_slot
-                self.current_process = ready_slot.process
-
-                # Actualizar estado de reproducción
                 self.queue.pop(0)
                 self.update_queue_display()
-                self.current_title = ready_slot.video_info.get('title', 'Sin título')
-                self.load_start_time = time.time()
-                self.playback_started = True
-
-                self.status_label.setText(f"⚡ {self.current_title[:50]}")
-                self.status_label.setStyleSheet("font-size: 18px; color: #6ba36e;")
-                self.log(f"⚡ Instantáneo: {self.current_title[:30]}...")
-
-                # Pre-cargar el siguiente
-                self._flow("  → Llamando prefetch_next() para pre-cargar siguiente")
-                self.prefetch_next()
+                self._promote_slot(ready_slot, next_link,
+                                   ready_slot.video_info.get('title', 'Sin título'))
                 return
             else:
                 self._flow(f"  → Unpause slot {ready_slot.slot_id} falló, liberando y usando fallback")
-                with self.slot_lock:
-                    ready_slot.cleanup()
+                ready_slot.cleanup('despause falló')
         else:
             self._flow("  → No hay slot READY disponible")
 
         # Verificar si hay un prefetch en curso para este video
         prefetching_slot = self.get_prefetching_slot(next_link)
-        # También verificar si el prefetch_process actual es para este video
+        # También verificar si el prefetch_job actual es para este video
         if not prefetching_slot and self.prefetch_slot and self.prefetch_slot.video_link == next_link:
             prefetching_slot = self.prefetch_slot
 
@@ -1033,92 +1747,128 @@ class BBBPlayer(QWidget):
             self._flow(f"  → Slot {prefetching_slot.slot_id} está PREFETCHING, esperando...")
             self.log(f"⏳ Esperando: {next_video.get('title', '')[:30]}...")
             self.status_label.setText(f"⏳ Esperando: {next_video.get('title', '')[:40]}...")
-            self.status_label.setStyleSheet("font-size: 18px; color: #c9886a;")
+            self.styles.set(self.status_label, 'waiting')
             self.progress_bar.setRange(0, 0)  # Indeterminate mode
             self.waiting_for_prefetch = next_video
+            self.slot_metrics.waits += 1
             return
 
         # Fallback: reproducción normal (no hay prefetch en curso)
         self._flow("  → No hay prefetch en curso, usando play_next()")
         self.log(f"Siguiente en cola ({len(self.queue)} restantes)")
         self.play_next()
+        self.skip_pressed_at = None  # Avance automático, no una pulsación de S
 
     def _stop_current_playback_only(self):
         """Detiene solo la reproducción actual, sin tocar el prefetch."""
+        self.scheduler.detach()
+        self.transitions.detach()
+        self.seeker.detach()
+        self.transitions.abort()
         if self.current_process:
-            try:
-                self.current_process.finished.disconnect()
-            except:
-                pass
-            self.current_process.terminate()
-            self.current_process.waitForFinished(1000)
+            self.transition_end_at = None  # Interrumpido: no es una transición
+        self._end_transfer()
+        if self.current_process:
+            self.reaper.reap(self.current_process, 'mpv')
             self.current_process = None
 
         if self.current_slot:
-            with self.slot_lock:
-                self.current_slot.cleanup()
+            self.current_slot.cleanup('reemplazado')
             self.current_slot = None
 
         # Terminar proceso de resolución URL (si hay uno en curso)
-        if self.resolve_process:
-            self.resolve_process.terminate()
-            self.resolve_process = None
+        if self.resolve_job:
+            self.resolve_job.cancel()
+            self.resolve_job = None
             self.resolve_video_info = None
 
     def stop_music(self):
         was_playing = self.current_process is not None
+        self.scheduler.detach()
+        self.transitions.detach()
+        self.seeker.detach()
+        self.transitions.abort()
+        if was_playing:
+            self.transition_end_at = None  # Interrumpido: no es una transición
+        self.scheduler.cancel('prefetch')
 
         # Terminar proceso actual
+        self._end_transfer()
         if self.current_process:
-            try:
-                self.current_process.finished.disconnect()
-            except:
-                pass
-            self.current_process.terminate()
-            self.current_process.waitForFinished(1000)
+            self.reaper.reap(self.current_process, 'mpv')
             self.current_process = None
 
         # Limpiar slot actual
         if self.current_slot:
-            with self.slot_lock:
-                self.current_slot.cleanup()
+            self.current_slot.cleanup('detenido')
             self.current_slot = None
 
         # Terminar proceso de resolución URL
-        if self.resolve_process:
-            self.resolve_process.terminate()
-            self.resolve_process = None
+        if self.resolve_job:
+            self.resolve_job.cancel()
+            self.resolve_job = None
             self.resolve_video_info = None
 
         # Terminar prefetch en curso (desconectar signal primero para evitar callbacks huérfanos)
-        if self.prefetch_process:
-            try:
-                self.prefetch_process.finished.disconnect()
-            except:
-                pass
-            self.prefetch_process.terminate()
-            self.prefetch_process = None
+        if self.prefetch_job:
+            self.prefetch_job.cancel()
+            self.prefetch_job = None
         if self.prefetch_slot:
-            with self.slot_lock:
-                self.prefetch_slot.cleanup()
+            self.prefetch_slot.cleanup('detenido')
         self.prefetch_slot = None
         self.waiting_for_prefetch = None
 
         # Limpiar todos los slots
-        with self.slot_lock:
-            for slot in self.slots:
-                slot.cleanup()
+        for slot in self.slots:
+            slot.cleanup('detenido')
 
         self.is_loading = False
         self.progress_bar.setValue(0)
         self.progress_bar.setRange(0, 100)
         self.time_label.setText("--:-- / --:--")
+        self.progress_view.reset()
         self.status_label.setText("⏸️ Detenido")
-        self.status_label.setStyleSheet("font-size: 18px; color: #8b7355;")
+        self.styles.set(self.status_label, 'idle')
         if was_playing:
             self.log("Detenido por usuario")
 
 
+    # La ventana no se ve: no repintar el progreso
+    def showEvent(self, event):
+        self.progress_view.set_visible(True)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.progress_view.set_visible(False)
+        super().hideEvent(event)
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.WindowStateChange:
+            self.progress_view.set_visible(not self.isMinimized() and self.isVisible())
+        super().changeEvent(event)
+
+    def closeEvent(self, event):
+        print(self.slot_metrics.dump(self.slots), flush=True)
+        print(f"Pool: {self.pool.summary()}", flush=True)
+        print(f"Estilos: {self.styles.summary()}; {self.skin.summary()}", flush=True)
+        if self.search_job:
+            self.search_job.cancel()
+        self.memory.stop()
+        self.network.stop()
+        self.cookies.stop()
+        self.speculation.cancel()
+        self.favorite_warmer.cancel()
+        self.library.close()
+        self.thumb_worker.stop()
+        self.loudness.cancel_all()
+        self.resolver.stats.flush()
+        self.reaper.kill_all()
+        if self.proxy:
+            print(f"Proxy: {self.proxy.summary()}", flush=True)
+            self.proxy.stop()
+        super().closeEvent(event)
+
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     player = BBBPlayer()